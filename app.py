@@ -1,1070 +1,1573 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
-import mysql.connector
-from datetime import date, datetime
-
-
-DB_CONFIG = {
-    "host": "localhost",
-    "user": "your_mysql_user", 
-    "password": "your_mysql_password", 
-    "database": "gym_management"
-}
-
-
-class GymApp:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Gym Management System")
-        self.root.geometry("1200x700")
-
-        # --- Style Configuration ---
-        self.style = ttk.Style()
-        self.style.theme_use('clam')
-        self.style.configure('TNotebook.Tab', padding=[10, 5], font=('Arial', 11, 'bold'))
-        self.style.configure('TButton', padding=5, font=('Arial', 10))
-        self.style.configure('Accent.TButton', padding=5, font=('Arial', 10, 'bold'), background='#0078d4', foreground='white')
-        self.style.map('Accent.TButton', background=[('active', '#005a9e')])
-        self.style.configure('Treeview.Heading', font=('Arial', 10, 'bold'))
-        self.style.configure('Success.TLabel', foreground='green', font=('Arial', 10, 'italic'))
-        self.style.configure('Error.TLabel', foreground='red', font=('Arial', 10, 'italic'))
-
-        # --- Main Notebook (Tabbed Interface) ---
-        self.notebook = ttk.Notebook(root)
-        self.notebook.pack(pady=10, padx=10, expand=True, fill='both')
-
-        # --- Create Tabs ---
-        self.tab_checkin = ttk.Frame(self.notebook, padding="10")
-        self.tab_members = ttk.Frame(self.notebook, padding="10")
-        self.tab_payments = ttk.Frame(self.notebook, padding="10")
-        self.tab_trainers = ttk.Frame(self.notebook, padding="10")
-        self.tab_plans = ttk.Frame(self.notebook, padding="10")
-        self.tab_admin = ttk.Frame(self.notebook, padding="10")
-
-        self.notebook.add(self.tab_checkin, text='Check-in / Out')
-        self.notebook.add(self.tab_members, text='Members')
-        self.notebook.add(self.tab_payments, text='Payments')
-        self.notebook.add(self.tab_trainers, text='Trainers')
-        self.notebook.add(self.tab_plans, text='Workout Plans')
-        self.notebook.add(self.tab_admin, text='Admin')
-
-        # --- Populate Tabs ---
-        self.setup_checkin_tab()
-        self.setup_members_tab()
-        self.setup_payments_tab()
-        self.setup_trainers_tab()
-        self.setup_plans_tab()
-        self.setup_admin_tab()
-
-        # --- Data Maps for Comboboxes ---
-        self.member_map = {}
-        self.trainer_map = {}
-        self.exercise_map = {}
-
-        # --- Initial Data Load ---
-        self.load_members_data()
-        self.load_payments_data()
-        self.load_trainers_data()
-        self.load_attendance_data()
-        self.load_workout_plans()
-        self.load_member_and_trainer_combos()
-        self.load_all_exercises_map()
-
-    def db_connect(self):
-        """Establishes a connection to the database."""
-        try:
-            conn = mysql.connector.connect(**DB_CONFIG)
-            return conn
-        except mysql.connector.Error as err:
-            messagebox.showerror("Database Connection Error", f"Failed to connect to MySQL:\n{err}\n\nPlease check your credentials in DB_CONFIG.")
-            return None
-
-    # ==================================================================
-    # TAB 1: CHECK-IN / OUT
-    # ==================================================================
-    def setup_checkin_tab(self):
-        main_frame = ttk.Frame(self.tab_checkin)
-        main_frame.pack(fill='both', expand=True, padx=10, pady=10)
-
-        # --- Check-in/Out Frame ---
-        checkin_frame = ttk.LabelFrame(main_frame, text="Member Actions", padding=15)
-        checkin_frame.pack(fill='x', pady=10)
-
-        ttk.Label(checkin_frame, text="Member ID:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
-        self.checkin_mem_id_entry = ttk.Entry(checkin_frame, width=30)
-        self.checkin_mem_id_entry.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
-
-        checkin_btn = ttk.Button(checkin_frame, text="Check-in", command=self.handle_checkin, style='Accent.TButton')
-        checkin_btn.grid(row=0, column=2, padx=10, pady=5)
-
-        checkout_btn = ttk.Button(checkin_frame, text="Check-out", command=self.handle_checkout)
-        checkout_btn.grid(row=0, column=3, padx=5, pady=5)
-
-        checkin_frame.grid_columnconfigure(1, weight=1)
-
-        self.checkin_status_label = ttk.Label(checkin_frame, text="")
-        self.checkin_status_label.grid(row=1, column=0, columnspan=4, pady=5)
-
-        # --- Currently In Frame ---
-        attendance_frame = ttk.LabelFrame(main_frame, text="Members Currently Checked In", padding=15)
-        attendance_frame.pack(fill='both', expand=True, pady=10)
-
-        self.attendance_tree = self.create_treeview(attendance_frame, 
-            columns=('Mem_ID', 'Name', 'Check_In_Time'),
-            headings={'Mem_ID': 'Member ID', 'Name': 'Name', 'Check_In_Time': 'Check-in Time'}
-        )
-        ttk.Button(main_frame, text="Refresh List", command=self.load_attendance_data).pack(pady=5)
-
-    def handle_checkin(self):
-        mem_id = self.checkin_mem_id_entry.get()
-        if not mem_id:
-            messagebox.showwarning("Input Error", "Please enter a Member ID.")
-            return
-
-        conn = self.db_connect()
-        if not conn:
-            return
-        
-        cursor = conn.cursor()
-        try:
-            query = "INSERT INTO Attendance (Mem_ID, check_in) VALUES (%s, %s)"
-            cursor.execute(query, (mem_id, datetime.now()))
-            conn.commit()
-
-            self.checkin_status_label.config(text=f"Member {mem_id} checked in successfully.", style='Success.TLabel')
-            self.load_attendance_data() # Refresh "currently in" list
-
-        except mysql.connector.Error as err:
-            conn.rollback()
-            # THIS IS THE TRIGGER DEMONSTRATION
-            if err.sqlstate == '45000':
-                messagebox.showerror("Check-in Failed", "Check-in failed: Membership is expired. Please make a payment.")
-                self.checkin_status_label.config(text="Check-in failed: Membership expired.", style='Error.TLabel')
-            else:
-                messagebox.showerror("Database Error", f"Failed to check in:\n{err}")
-                self.checkin_status_label.config(text="An error occurred.", style='Error.TLabel')
-        finally:
-            cursor.close()
-            conn.close()
-
-    def handle_checkout(self):
-        mem_id = self.checkin_mem_id_entry.get()
-        if not mem_id:
-            messagebox.showwarning("Input Error", "Please enter a Member ID.")
-            return
-
-        conn = self.db_connect()
-        if not conn:
-            return
-        
-        cursor = conn.cursor()
-        try:
-            # Find the latest open check-in for this member
-            query = """
-                UPDATE Attendance 
-                SET check_out = %s 
-                WHERE Mem_ID = %s AND check_out IS NULL 
-                ORDER BY check_in DESC 
-                LIMIT 1
-            """
-            cursor.execute(query, (datetime.now(), mem_id))
-            
-            if cursor.rowcount == 0:
-                messagebox.showinfo("Check-out Info", f"No active check-in found for Member {mem_id} to check out.")
-                self.checkin_status_label.config(text=f"No active check-in found for {mem_id}.", style='Error.TLabel')
-            else:
-                conn.commit()
-                self.checkin_status_label.config(text=f"Member {mem_id} checked out successfully.", style='Success.TLabel')
-                self.load_attendance_data() # Refresh "currently in" list
-        
-        except mysql.connector.Error as err:
-            conn.rollback()
-            messagebox.showerror("Database Error", f"Failed to check out:\n{err}")
-        finally:
-            cursor.close()
-            conn.close()
-
-    def load_attendance_data(self):
-        self.clear_treeview(self.attendance_tree)
-        conn = self.db_connect()
-        if not conn:
-            return
-        
-        cursor = conn.cursor()
-        query = """
-            SELECT a.Mem_ID, m.Name, a.check_in 
-            FROM Attendance a
-            JOIN Member m ON a.Mem_ID = m.Mem_ID
-            WHERE a.check_out IS NULL
-        """
-        try:
-            cursor.execute(query)
-            for (mem_id, name, check_in) in cursor:
-                self.attendance_tree.insert('', 'end', values=(mem_id, name, check_in.strftime('%Y-%m-%d %H:%M:%S')))
-        except mysql.connector.Error as err:
-            messagebox.showerror("Data Error", f"Failed to load attendance data:\n{err}")
-        finally:
-            cursor.close()
-            conn.close()
-
-    # ==================================================================
-    # TAB 2: MEMBERS
-    # ==================================================================
-    def setup_members_tab(self):
-        main_frame = ttk.Frame(self.tab_members)
-        main_frame.pack(fill='both', expand=True)
-
-        button_frame = ttk.Frame(main_frame)
-        button_frame.pack(fill='x', pady=5)
-
-        ttk.Button(button_frame, text="Refresh List", command=self.load_members_data).pack(side='left', padx=5)
-        ttk.Button(button_frame, text="Add New Member", command=self.open_add_member_window).pack(side='left', padx=5)
-        ttk.Button(button_frame, text="View Selected Member Details", command=self.open_member_details).pack(side='left', padx=5)
-        ttk.Button(button_frame, text="Delete Selected Member", command=self.delete_member).pack(side='left', padx=5)
-
-        self.member_tree = self.create_treeview(main_frame,
-            columns=('ID', 'Name', 'Phone', 'Join_Date', 'Age', 'Status'),
-            headings={'ID': 'Member ID', 'Name': 'Name', 'Phone': 'Phone', 'Join_Date': 'Join Date', 'Age': 'Age', 'Status': 'Status'}
-        )
-        
-        # Add tags for status coloring
-        self.member_tree.tag_configure('Active', background='#e8f8e8', foreground='#006400')
-        self.member_tree.tag_configure('Inactive', background='#f8e8e8', foreground='#a00000')
-
-    def load_members_data(self):
-        self.clear_treeview(self.member_tree)
-        conn = self.db_connect()
-        if not conn:
-            return
-        
-        cursor = conn.cursor()
-        query = "SELECT Mem_ID, Name, Phone_no, Join_date, Age, Member_Status FROM Member"
-        try:
-            cursor.execute(query)
-            for (mem_id, name, phone, join_date, age, status) in cursor:
-                tag = status if status in ('Active', 'Inactive') else 'Inactive'
-                self.member_tree.insert('', 'end', values=(mem_id, name, phone, join_date.strftime('%Y-%m-%d'), age, status), tags=(tag,))
-        except mysql.connector.Error as err:
-            messagebox.showerror("Data Error", f"Failed to load member data:\n{err}")
-        finally:
-            cursor.close()
-            conn.close()
-            # Refresh combos in case of new member
-            self.load_member_and_trainer_combos()
-
-    def open_add_member_window(self):
-        window = tk.Toplevel(self.root)
-        window.title("Add New Member")
-        
-        form_frame = ttk.Frame(window, padding=10)
-        form_frame.pack()
-
-        fields = ['Mem_ID', 'Name', 'Phone_no', 'Age']
-        entries = {}
-        for i, field in enumerate(fields):
-            ttk.Label(form_frame, text=f"{field}:").grid(row=i, column=0, padx=5, pady=5, sticky='w')
-            entry = ttk.Entry(form_frame, width=30)
-            entry.grid(row=i, column=1, padx=5, pady=5)
-            entries[field] = entry
-
-        # Add Join Date (auto-populated)
-        ttk.Label(form_frame, text="Join_date:").grid(row=len(fields), column=0, padx=5, pady=5, sticky='w')
-        join_date_entry = ttk.Entry(form_frame, width=30)
-        join_date_entry.insert(0, date.today().strftime('%Y-%m-%d'))
-        join_date_entry.grid(row=len(fields), column=1, padx=5, pady=5)
-        entries['Join_date'] = join_date_entry
-        
-        def save():
-            conn = self.db_connect()
-            if not conn:
-                return
-            cursor = conn.cursor()
-            try:
-                query = "INSERT INTO Member (Mem_ID, Name, Phone_no, Age, Join_date) VALUES (%s, %s, %s, %s, %s)"
-                data = (
-                    entries['Mem_ID'].get(),
-                    entries['Name'].get(),
-                    entries['Phone_no'].get(),
-                    int(entries['Age'].get()),
-                    entries['Join_date'].get()
-                )
-                cursor.execute(query, data)
-                conn.commit()
-                messagebox.showinfo("Success", "Member added successfully.", parent=window)
-                self.load_members_data()
-                window.destroy()
-            except mysql.connector.Error as err:
-                messagebox.showerror("Database Error", f"Failed to add member:\n{err}", parent=window)
-            except ValueError:
-                messagebox.showerror("Input Error", "Age must be a number.", parent=window)
-            finally:
-                cursor.close()
-                conn.close()
-
-        ttk.Button(form_frame, text="Save Member", command=save, style='Accent.TButton').grid(row=len(fields)+1, column=0, columnspan=2, pady=10)
-
-    def delete_member(self):
-        selected_item = self.member_tree.focus()
-        if not selected_item:
-            messagebox.showwarning("No Selection", "Please select a member from the list to delete.")
-            return
-        
-        member_data = self.member_tree.item(selected_item)['values']
-        mem_id = member_data[0]
-        mem_name = member_data[1]
-
-        if not messagebox.askyesno("Confirm Deletion", f"Are you sure you want to delete {mem_name} ({mem_id})?\n\nWARNING: This will permanently delete all their associated payments, attendance records, and workout plans."):
-            return
-
-        conn = self.db_connect()
-        if not conn:
-            return
-        
-        cursor = conn.cursor()
-        try:
-            query = "DELETE FROM Member WHERE Mem_ID = %s"
-            cursor.execute(query, (mem_id,))
-            conn.commit()
-            
-            messagebox.showinfo("Success", f"Member {mem_name} was deleted successfully.")
-            
-            # Refresh all related data
-            self.load_members_data()
-            self.load_payments_data()
-            self.load_attendance_data()
-            self.load_workout_plans()
-
-        except mysql.connector.Error as err:
-            conn.rollback()
-            messagebox.showerror("Database Error", f"Failed to delete member:\n{err}")
-        finally:
-            cursor.close()
-            conn.close()
-
-    def open_member_details(self):
-        selected_item = self.member_tree.focus()
-        if not selected_item:
-            messagebox.showwarning("No Selection", "Please select a member from the list to view details.")
-            return
-        
-        member_data = self.member_tree.item(selected_item)['values']
-        mem_id = member_data[0]
-        mem_name = member_data[1]
-
-        window = tk.Toplevel(self.root)
-        window.title(f"Details for {mem_name} ({mem_id})")
-        window.geometry("800x600")
-
-        conn = self.db_connect()
-        if not conn:
-            return
-        cursor = conn.cursor()
-
-        try:
-            # --- General Info & Total Payments (FUNCTION 1) ---
-            info_frame = ttk.LabelFrame(window, text="Member Summary", padding=10)
-            info_frame.pack(pady=10, padx=10, fill='x')
-            
-            # Call GetTotalMemberPayments function
-            cursor.execute("SELECT GetTotalMemberPayments(%s)", (mem_id,))
-            total_payments = cursor.fetchone()[0]
-            
-            ttk.Label(info_frame, text=f"Name: {mem_name}").pack(anchor='w')
-            ttk.Label(info_frame, text=f"Member ID: {mem_id}").pack(anchor='w')
-            ttk.Label(info_frame, text=f"Total Payments Made: ₹{total_payments:.2f}").pack(anchor='w')
-
-            # --- Attendance History (FUNCTION 2) ---
-            attendance_frame = ttk.LabelFrame(window, text="Attendance History", padding=10)
-            attendance_frame.pack(pady=10, padx=10, fill='both', expand=True)
-            
-            att_tree = self.create_treeview(attendance_frame, 
-                columns=('ID', 'Check_In', 'Check_Out', 'Duration'),
-                headings={'ID': 'Att. ID', 'Check_In': 'Check-in', 'Check_Out': 'Check-out', 'Duration': 'Duration (min)'}
-            )
-            
-            cursor.execute("SELECT Attendance_ID, check_in, check_out FROM Attendance WHERE Mem_ID = %s", (mem_id,))
-            for (att_id, check_in, check_out) in cursor:
-                # Call CalculateWorkoutDuration function
-                cursor.execute("SELECT CalculateWorkoutDuration(%s)", (att_id,))
-                duration = cursor.fetchone()[0]
-                duration_str = str(duration) if duration is not None else "N/A"
-                att_tree.insert('', 'end', values=(att_id, check_in.strftime('%Y-%m-%d %H:%M'), check_out.strftime('%Y-%m-%d %H:%M') if check_out else "N/A", duration_str))
-
-            # --- Workout Plan ---
-            plan_frame = ttk.LabelFrame(window, text="Workout Plan", padding=10)
-            plan_frame.pack(pady=10, padx=10, fill='both', expand=True)
-
-            plan_tree = self.create_treeview(plan_frame,
-                columns=('Trainer', 'Exercise', 'Reps/Sets'),
-                headings={'Trainer': 'Trainer', 'Exercise': 'Exercise', 'Reps/Sets': 'Reps/Sets Info'}
-            )
-
-            plan_query = """
-                SELECT t.Name, e.Exercise_name, pe.reps_sets_info
-                FROM Workout_Plan w
-                LEFT JOIN Trainers t ON w.Trainer_ID = t.Trainer_ID
-                LEFT JOIN Plan_Exercises pe ON w.Plan_ID = pe.Plan_ID
-                LEFT JOIN Exercises e ON pe.Exercise_ID = e.Exercise_ID
-                WHERE w.Mem_ID = %s
-            """
-            cursor.execute(plan_query, (mem_id,))
-            results = cursor.fetchall()
-            
-            if not results or results[0][1] is None:
-                plan_tree.insert('', 'end', values=("No trainer assigned", "No exercises added", ""))
-            else:
-                for (trainer, exercise, reps) in results:
-                    trainer_name = trainer if trainer else "N/A"
-                    exercise_name = exercise if exercise else "N/A"
-                    reps_info = reps if reps else "N/A"
-                    plan_tree.insert('', 'end', values=(trainer_name, exercise_name, reps_info))
-
-        except mysql.connector.Error as err:
-            messagebox.showerror("Error", f"Failed to load member details:\n{err}", parent=window)
-        finally:
-            cursor.close()
-            conn.close()
-
-    # ==================================================================
-    # TAB 3: PAYMENTS
-    # ==================================================================
-    def setup_payments_tab(self):
-        main_frame = ttk.Frame(self.tab_payments)
-        main_frame.pack(fill='both', expand=True)
-
-        # --- Add Payment Frame ---
-        add_payment_frame = ttk.LabelFrame(main_frame, text="Add New Payment", padding=15)
-        add_payment_frame.pack(fill='x', pady=10)
-
-        ttk.Label(add_payment_frame, text="Member ID:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
-        self.payment_mem_id_entry = ttk.Entry(add_payment_frame, width=30)
-        self.payment_mem_id_entry.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
-
-        ttk.Label(add_payment_frame, text="Amount (₹):").grid(row=1, column=0, padx=5, pady=5, sticky='w')
-        self.payment_amount_entry = ttk.Entry(add_payment_frame, width=30)
-        self.payment_amount_entry.grid(row=1, column=1, padx=5, pady=5, sticky='ew')
-        
-        add_payment_btn = ttk.Button(add_payment_frame, text="Submit Payment", command=self.handle_add_payment, style='Accent.TButton')
-        add_payment_btn.grid(row=0, column=2, rowspan=2, padx=10, pady=5, sticky='ns')
-
-        add_payment_frame.grid_columnconfigure(1, weight=1)
-
-        # --- Payment History Frame ---
-        history_frame = ttk.LabelFrame(main_frame, text="All Payments", padding=15)
-        history_frame.pack(fill='both', expand=True, pady=10)
-
-        self.payments_tree = self.create_treeview(history_frame,
-            columns=('Payment_ID', 'Mem_ID', 'Amount', 'Date', 'Status'),
-            headings={'Payment_ID': 'Payment ID', 'Mem_ID': 'Member ID', 'Amount': 'Amount (₹)', 'Date': 'Date', 'Status': 'Status'}
-        )
-        ttk.Button(main_frame, text="Refresh Payment List", command=self.load_payments_data).pack(pady=5)
-
-    def handle_add_payment(self):
-        mem_id = self.payment_mem_id_entry.get()
-        amount_str = self.payment_amount_entry.get()
-
-        if not mem_id or not amount_str:
-            messagebox.showwarning("Input Error", "Please enter both Member ID and Amount.")
-            return
-
-        try:
-            amount = float(amount_str)
-        except ValueError:
-            messagebox.showwarning("Input Error", "Amount must be a valid number.")
-            return
-
-        conn = self.db_connect()
-        if not conn:
-            return
-        
-        cursor = conn.cursor()
-        try:
-            query = "INSERT INTO Payment (Mem_ID, amount, Payment_date) VALUES (%s, %s, %s)"
-            cursor.execute(query, (mem_id, amount, date.today()))
-            conn.commit()
-
-            messagebox.showinfo("Success", f"Payment of ₹{amount:.2f} for {mem_id} recorded.")
-            
-            # Clear entries
-            self.payment_mem_id_entry.delete(0, 'end')
-            self.payment_amount_entry.delete(0, 'end')
-            
-            # THIS IS THE TRIGGER DEMONSTRATION
-            # The AfterPaymentInsert trigger has fired. Now we refresh the lists
-            # to *show* its effect.
-            self.load_payments_data()
-            self.load_members_data() # This will show the member's status update
-
-        except mysql.connector.Error as err:
-            conn.rollback()
-            messagebox.showerror("Database Error", f"Failed to add payment:\n{err}")
-        finally:
-            cursor.close()
-            conn.close()
-
-    def load_payments_data(self):
-        self.clear_treeview(self.payments_tree)
-        conn = self.db_connect()
-        if not conn:
-            return
-        
-        cursor = conn.cursor()
-        query = "SELECT Payment_ID, Mem_ID, amount, Payment_date, Payment_status FROM Payment"
-        try:
-            cursor.execute(query)
-            for (pid, mid, amount, pdate, status) in cursor:
-                self.payments_tree.insert('', 'end', values=(pid, mid, f"₹{amount:.2f}", pdate.strftime('%Y-%m-%d'), status))
-        except mysql.connector.Error as err:
-            messagebox.showerror("Data Error", f"Failed to load payment data:\n{err}")
-        finally:
-            cursor.close()
-            conn.close()
-
-    # ==================================================================
-    # TAB 4: TRAINERS
-    # ==================================================================
-    def setup_trainers_tab(self):
-        main_frame = ttk.Frame(self.tab_trainers)
-        main_frame.pack(fill='both', expand=True)
-
-        button_frame = ttk.Frame(main_frame)
-        button_frame.pack(fill='x', pady=5)
-
-        ttk.Button(button_frame, text="Add New Trainer", command=self.open_add_trainer_window).pack(side='left', padx=5)
-        ttk.Button(button_frame, text="Delete Selected Trainer", command=self.delete_trainer).pack(side='left', padx=5)
-
-        self.trainers_tree = self.create_treeview(main_frame,
-            columns=('ID', 'Name', 'Salary', 'Date_Hired'),
-            headings={'ID': 'Trainer ID', 'Name': 'Name', 'Salary': 'Salary (₹)', 'Date_Hired': 'Date Hired'}
-        )
-        # self.load_trainers_data() # Initial load <-- REMOVED: This call is premature and redundant.
-        # Data will be loaded by the __init__ method after all tabs are created.
-
-    def load_trainers_data(self):
-        self.clear_treeview(self.trainers_tree)
-        conn = self.db_connect()
-        if not conn:
-            return
-        
-        cursor = conn.cursor()
-        query = "SELECT Trainer_ID, Name, Salary, Date_hired FROM Trainers"
-        try:
-            cursor.execute(query)
-            for (tid, name, salary, hired) in cursor:
-                self.trainers_tree.insert('', 'end', values=(tid, name, f"₹{salary:.2f}", hired.strftime('%Y-%m-%d')))
-        except mysql.connector.Error as err:
-            messagebox.showerror("Data Error", f"Failed to load trainer data:\n{err}")
-        finally:
-            cursor.close()
-            conn.close()
-            # Refresh combos in case of new trainer
-            self.load_member_and_trainer_combos()
-
-    def open_add_trainer_window(self):
-        window = tk.Toplevel(self.root)
-        window.title("Add New Trainer")
-        
-        form_frame = ttk.Frame(window, padding=10)
-        form_frame.pack()
-
-        fields = ['Name', 'Salary']
-        entries = {}
-        for i, field in enumerate(fields):
-            label_text = f"{field} (₹):" if field == 'Salary' else f"{field}:"
-            ttk.Label(form_frame, text=label_text).grid(row=i, column=0, padx=5, pady=5, sticky='w')
-            entry = ttk.Entry(form_frame, width=30)
-            entry.grid(row=i, column=1, padx=5, pady=5)
-            entries[field] = entry
-
-        ttk.Label(form_frame, text="Date_hired:").grid(row=len(fields), column=0, padx=5, pady=5, sticky='w')
-        hired_date_entry = ttk.Entry(form_frame, width=30)
-        hired_date_entry.insert(0, date.today().strftime('%Y-%m-%d'))
-        hired_date_entry.grid(row=len(fields), column=1, padx=5, pady=5)
-        entries['Date_hired'] = hired_date_entry
-        
-        def save():
-            conn = self.db_connect()
-            if not conn:
-                return
-            cursor = conn.cursor()
-            try:
-                query = "INSERT INTO Trainers (Name, Salary, Date_hired) VALUES (%s, %s, %s)"
-                data = (
-                    entries['Name'].get(),
-                    float(entries['Salary'].get()),
-                    entries['Date_hired'].get()
-                )
-                cursor.execute(query, data)
-                conn.commit()
-                messagebox.showinfo("Success", "Trainer added successfully.", parent=window)
-                self.load_trainers_data()
-                window.destroy()
-            except mysql.connector.Error as err:
-                messagebox.showerror("Database Error", f"Failed to add trainer:\n{err}", parent=window)
-            except ValueError:
-                messagebox.showerror("Input Error", "Salary must be a number.", parent=window)
-            finally:
-                cursor.close()
-                conn.close()
-
-        ttk.Button(form_frame, text="Save Trainer", command=save, style='Accent.TButton').grid(row=len(fields)+1, column=0, columnspan=2, pady=10)
-
-    def delete_trainer(self):
-        selected_item = self.trainers_tree.focus()
-        if not selected_item:
-            messagebox.showwarning("No Selection", "Please select a trainer from the list to delete.")
-            return
-        
-        trainer_data = self.trainers_tree.item(selected_item)['values']
-        trainer_id = trainer_data[0]
-        trainer_name = trainer_data[1]
-
-        if not messagebox.askyesno("Confirm Deletion", f"Are you sure you want to delete {trainer_name} (ID: {trainer_id})?\n\nWARNING: This will permanently delete all workout plans assigned to this trainer."):
-            return
-
-        conn = self.db_connect()
-        if not conn:
-            return
-        
-        cursor = conn.cursor()
-        try:
-            query = "DELETE FROM Trainers WHERE Trainer_ID = %s"
-            cursor.execute(query, (trainer_id,))
-            conn.commit()
-            
-            messagebox.showinfo("Success", f"Trainer {trainer_name} was deleted successfully.")
-            
-            # Refresh related data
-            self.load_trainers_data()
-            self.load_workout_plans()
-
-        except mysql.connector.Error as err:
-            conn.rollback()
-            messagebox.showerror("Database Error", f"Failed to delete trainer:\n{err}")
-        finally:
-            cursor.close()
-            conn.close()
-
-    # ==================================================================
-    # TAB 5: WORKOUT PLANS
-    # ==================================================================
-    def setup_plans_tab(self):
-        main_frame = ttk.Frame(self.tab_plans)
-        main_frame.pack(fill='both', expand=True)
-
-        # --- Create New Plan Frame ---
-        create_plan_frame = ttk.LabelFrame(main_frame, text="Create New Workout Plan", padding=15)
-        create_plan_frame.pack(fill='x', pady=10)
-
-        ttk.Label(create_plan_frame, text="Select Member:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
-        self.plan_member_combo = ttk.Combobox(create_plan_frame, state='readonly', width=30)
-        self.plan_member_combo.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
-
-        ttk.Label(create_plan_frame, text="Select Trainer:").grid(row=1, column=0, padx=5, pady=5, sticky='w')
-        self.plan_trainer_combo = ttk.Combobox(create_plan_frame, state='readonly', width=30)
-        self.plan_trainer_combo.grid(row=1, column=1, padx=5, pady=5, sticky='ew')
-        
-        ttk.Label(create_plan_frame, text="Start Date (YYYY-MM-DD):").grid(row=2, column=0, padx=5, pady=5, sticky='w')
-        self.plan_start_entry = ttk.Entry(create_plan_frame, width=30)
-        self.plan_start_entry.insert(0, date.today().strftime('%Y-%m-%d'))
-        self.plan_start_entry.grid(row=2, column=1, padx=5, pady=5, sticky='ew')
-
-        ttk.Label(create_plan_frame, text="End Date (YYYY-MM-DD):").grid(row=3, column=0, padx=5, pady=5, sticky='w')
-        self.plan_end_entry = ttk.Entry(create_plan_frame, width=30)
-        self.plan_end_entry.grid(row=3, column=1, padx=5, pady=5, sticky='ew')
-
-        create_plan_btn = ttk.Button(create_plan_frame, text="Create Plan", command=self.handle_create_plan, style='Accent.TButton')
-        create_plan_btn.grid(row=1, column=2, rowspan=2, padx=10, pady=5, sticky='ns')
-
-        create_plan_frame.grid_columnconfigure(1, weight=1)
-
-        # --- Existing Plans Frame ---
-        plans_frame = ttk.LabelFrame(main_frame, text="Existing Workout Plans", padding=15)
-        plans_frame.pack(fill='both', expand=True, pady=10)
-
-        self.plans_tree = self.create_treeview(plans_frame,
-            columns=('Plan_ID', 'Member', 'Trainer', 'Start', 'End'),
-            headings={'Plan_ID': 'Plan ID', 'Member': 'Member Name', 'Trainer': 'Trainer Name', 'Start': 'Start Date', 'End': 'End Date'}
-        )
-        
-        button_frame = ttk.Frame(main_frame)
-        button_frame.pack(pady=5)
-        ttk.Button(button_frame, text="Refresh Plan List", command=self.load_workout_plans).pack(side='left', padx=5)
-        ttk.Button(button_frame, text="Manage Exercises for Selected Plan", command=self.open_manage_exercises_window).pack(side='left', padx=5)
-
-    def load_workout_plans(self):
-        self.clear_treeview(self.plans_tree)
-        conn = self.db_connect()
-        if not conn:
-            return
-        
-        cursor = conn.cursor()
-        query = """
-            SELECT w.Plan_ID, m.Name, t.Name, w.Start_date, w.End_date 
-            FROM Workout_Plan w
-            JOIN Member m ON w.Mem_ID = m.Mem_ID
-            JOIN Trainers t ON w.Trainer_ID = t.Trainer_ID
-        """
-        try:
-            cursor.execute(query)
-            for (pid, mem_name, trainer_name, start, end) in cursor:
-                end_date_str = end.strftime('%Y-%m-%d') if end else "N/A"
-                self.plans_tree.insert('', 'end', values=(pid, mem_name, trainer_name, start.strftime('%Y-%m-%d'), end_date_str))
-        except mysql.connector.Error as err:
-            messagebox.showerror("Data Error", f"Failed to load workout plans:\n{err}")
-        finally:
-            cursor.close()
-            conn.close()
-
-    def load_member_and_trainer_combos(self):
-        conn = self.db_connect()
-        if not conn:
-            return
-        
-        cursor = conn.cursor()
-        try:
-            # Load members
-            cursor.execute("SELECT Mem_ID, Name FROM Member")
-            members = cursor.fetchall()
-            self.member_map = {name: mem_id for (mem_id, name) in members}
-            self.plan_member_combo['values'] = sorted(self.member_map.keys())
-
-            # Load trainers
-            cursor.execute("SELECT Trainer_ID, Name FROM Trainers")
-            trainers = cursor.fetchall()
-            self.trainer_map = {name: trainer_id for (trainer_id, name) in trainers}
-            self.plan_trainer_combo['values'] = sorted(self.trainer_map.keys())
-
-        except mysql.connector.Error as err:
-            messagebox.showerror("Data Error", f"Failed to load member/trainer lists for combos:\n{err}")
-        finally:
-            cursor.close()
-            conn.close()
-
-    def load_all_exercises_map(self):
-        """Loads all exercises from DB into the self.exercise_map."""
-        conn = self.db_connect()
-        if not conn:
-            return
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT Exercise_ID, Exercise_name FROM Exercises")
-            exercises = cursor.fetchall()
-            self.exercise_map = {name: ex_id for (ex_id, name) in exercises}
-        except mysql.connector.Error as err:
-            messagebox.showerror("Data Error", f"Failed to load exercises list:\n{err}")
-        finally:
-            cursor.close()
-            conn.close()
-
-    def handle_create_plan(self):
-        member_name = self.plan_member_combo.get()
-        trainer_name = self.plan_trainer_combo.get()
-        start_date_str = self.plan_start_entry.get()
-        end_date_str = self.plan_end_entry.get()
-
-        if not member_name or not trainer_name or not start_date_str:
-            messagebox.showwarning("Input Error", "Please select a Member, a Trainer, and enter a Start Date.")
-            return
-
-        try:
-            mem_id = self.member_map[member_name]
-            trainer_id = self.trainer_map[trainer_name]
-            
-            # Validate dates
-            datetime.strptime(start_date_str, '%Y-%m-%d')
-            end_date = None
-            if end_date_str:
-                end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-            
-        except KeyError:
-            messagebox.showerror("Internal Error", "Could not find ID for selected member or trainer.")
-            return
-        except ValueError:
-            messagebox.showwarning("Input Error", "Dates must be in YYYY-MM-DD format.")
-            return
-
-        conn = self.db_connect()
-        if not conn:
-            return
-        
-        cursor = conn.cursor()
-        try:
-            query = """
-                INSERT INTO Workout_Plan (Mem_ID, Trainer_ID, Start_date, End_date) 
-                VALUES (%s, %s, %s, %s)
-            """
-            cursor.execute(query, (mem_id, trainer_id, start_date_str, end_date))
-            conn.commit()
-            
-            messagebox.showinfo("Success", f"Workout plan created for {member_name}.")
-            self.load_workout_plans() # Refresh the list
-
-        except mysql.connector.Error as err:
-            conn.rollback()
-            messagebox.showerror("Database Error", f"Failed to create plan:\n{err}")
-        finally:
-            cursor.close()
-            conn.close()
-
-    def open_manage_exercises_window(self):
-        selected_item = self.plans_tree.focus()
-        if not selected_item:
-            messagebox.showwarning("No Selection", "Please select a workout plan from the list to manage its exercises.")
-            return
-        
-        plan_data = self.plans_tree.item(selected_item)['values']
-        plan_id = plan_data[0]
-        member_name = plan_data[1]
-        window_title = f"Exercises for {member_name} (Plan ID: {plan_id})"
-
-        # Pass the pre-loaded exercise map to the new window
-        ManageExercisesWindow(self.root, plan_id, window_title, self.exercise_map)
-
-    # ==================================================================
-    # TAB 6: ADMIN (Renumbered)
-    # ==================================================================
-    def setup_admin_tab(self):
-        admin_frame = ttk.LabelFrame(self.tab_admin, text="Administrative Tasks", padding=20)
-        admin_frame.pack(pady=50, padx=50)
-
-        ttk.Label(admin_frame, text="Update all member statuses based on last payment (31-day check).").pack(pady=10)
-        
-        ttk.Button(admin_frame, text="Run 'UpdateAllMemberStatuses' Procedure", 
-                   command=self.run_status_update_procedure, 
-                   style='Accent.TButton').pack(pady=10)
-                   
-        self.admin_status_label = ttk.Label(admin_frame, text="")
-        self.admin_status_label.pack(pady=5)
-
-    def run_status_update_procedure(self):
-        if not messagebox.askyesno("Confirm", "Are you sure you want to update all member statuses? This will run the 'UpdateAllMemberStatuses' procedure."):
-            return
-
-        conn = self.db_connect()
-        if not conn:
-            return
-        
-        cursor = conn.cursor()
-        try:
-            self.admin_status_label.config(text="Executing procedure...", style='Success.TLabel')
-            cursor.callproc('UpdateAllMemberStatuses')
-            conn.commit()
-            
-            self.admin_status_label.config(text="All member statuses updated successfully.", style='Success.TLabel')
-            messagebox.showinfo("Success", "Procedure 'UpdateAllMemberStatuses' executed successfully.")
-            
-            # Refresh members to show changes
-            self.load_members_data()
-
-        except mysql.connector.Error as err:
-            conn.rollback()
-            messagebox.showerror("Procedure Error", f"Failed to run procedure:\n{err}")
-            self.admin_status_label.config(text="An error occurred.", style='Error.TLabel')
-        finally:
-            cursor.close()
-            conn.close()
-
-    # ==================================================================
-    # HELPER/UTILITY FUNCTIONS
-    # ==================================================================
-    def create_treeview(self, parent, columns, headings):
-        """Helper function to create a styled Treeview with scrollbar."""
-        tree_frame = ttk.Frame(parent)
-        tree_frame.pack(fill='both', expand=True, pady=5)
-        
-        scrollbar = ttk.Scrollbar(tree_frame)
-        scrollbar.pack(side='right', fill='y')
-        
-        tree = ttk.Treeview(
-            tree_frame, 
-            columns=columns, 
-            show='headings', 
-            yscrollcommand=scrollbar.set
-        )
-        tree.pack(fill='both', expand=True)
-        scrollbar.config(command=tree.yview)
-        
-        for col_id, text in headings.items():
-            tree.heading(col_id, text=text, anchor='w')
-            tree.column(col_id, anchor='w', width=100) # Default width
-            
-        return tree
-
-    def clear_treeview(self, tree):
-        """Removes all items from a Treeview."""
-        for item in tree.get_children():
-            tree.delete(item)
-
-# ==================================================================
-# NEW Toplevel Window Class for Managing Exercises
-# ==================================================================
-class ManageExercisesWindow:
-    def __init__(self, parent, plan_id, title, exercise_map):
-        self.window = tk.Toplevel(parent)
-        self.window.title(title)
-        self.window.geometry("600x500")
-        
-        self.plan_id = plan_id
-        self.exercise_map = exercise_map # {name: id}
-
-        self.setup_ui()
-        self.load_plan_exercises()
-
-    def db_connect(self):
-        """Establishes a connection to the database."""
-        try:
-            conn = mysql.connector.connect(**DB_CONFIG)
-            return conn
-        except mysql.connector.Error as err:
-            messagebox.showerror("Database Connection Error", f"Failed to connect to MySQL:\n{err}", parent=self.window)
-            return None
-
-    def setup_ui(self):
-        # --- Top Frame: Add Exercise ---
-        add_frame = ttk.LabelFrame(self.window, text="Add Exercise to Plan", padding=10)
-        add_frame.pack(fill='x', padx=10, pady=10)
-
-        ttk.Label(add_frame, text="Exercise:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
-        self.exercise_combo = ttk.Combobox(add_frame, state='readonly', width=30)
-        self.exercise_combo['values'] = sorted(self.exercise_map.keys())
-        self.exercise_combo.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
-
-        ttk.Label(add_frame, text="Reps/Sets Info:").grid(row=1, column=0, padx=5, pady=5, sticky='w')
-        self.reps_entry = ttk.Entry(add_frame, width=30)
-        self.reps_entry.grid(row=1, column=1, padx=5, pady=5, sticky='ew')
-        
-        ttk.Button(add_frame, text="Add Exercise", command=self.add_exercise_to_plan, style='Accent.TButton').grid(row=0, column=2, rowspan=2, padx=10, sticky='ns')
-        add_frame.grid_columnconfigure(1, weight=1)
-
-        # --- Bottom Frame: Current Exercises ---
-        current_frame = ttk.LabelFrame(self.window, text="Current Exercises in Plan", padding=10)
-        current_frame.pack(fill='both', expand=True, padx=10, pady=10)
-
-        # Note: We include Exercise_ID in columns but hide it, to retrieve it for deletion
-        self.plan_exercises_tree = self.create_treeview(
-            current_frame,
-            columns=('Name', 'Reps', 'Exercise_ID'),
-            headings={'Name': 'Exercise', 'Reps': 'Reps/Sets Info', 'Exercise_ID': 'ID'}
-        )
-        self.plan_exercises_tree['displaycolumns'] = ('Name', 'Reps')
-
-        ttk.Button(current_frame, text="Remove Selected Exercise", command=self.remove_exercise_from_plan).pack(pady=5)
-
-    def load_plan_exercises(self):
-        self.clear_treeview(self.plan_exercises_tree)
-        conn = self.db_connect()
-        if not conn:
-            return
-        
-        cursor = conn.cursor()
-        query = """
-            SELECT e.Exercise_name, pe.reps_sets_info, e.Exercise_ID 
-            FROM Plan_Exercises pe 
-            JOIN Exercises e ON pe.Exercise_ID = e.Exercise_ID 
-            WHERE pe.Plan_ID = %s
-        """
-        try:
-            cursor.execute(query, (self.plan_id,))
-            for (name, reps, ex_id) in cursor:
-                self.plan_exercises_tree.insert('', 'end', values=(name, reps, ex_id))
-        except mysql.connector.Error as err:
-            messagebox.showerror("Data Error", f"Failed to load plan exercises:\n{err}", parent=self.window)
-        finally:
-            cursor.close()
-            conn.close()
-
-    def add_exercise_to_plan(self):
-        exercise_name = self.exercise_combo.get()
-        reps_info = self.reps_entry.get()
-
-        if not exercise_name or not reps_info:
-            messagebox.showwarning("Input Error", "Please select an exercise and enter reps/sets info.", parent=self.window)
-            return
-
-        try:
-            exercise_id = self.exercise_map[exercise_name]
-        except KeyError:
-            messagebox.showerror("Internal Error", "Could not find selected exercise ID.", parent=self.window)
-            return
-
-        conn = self.db_connect()
-        if not conn:
-            return
-        
-        cursor = conn.cursor()
-        query = "INSERT INTO Plan_Exercises (Plan_ID, Exercise_ID, reps_sets_info) VALUES (%s, %s, %s)"
-        try:
-            cursor.execute(query, (self.plan_id, exercise_id, reps_info))
-            conn.commit()
-            
-            # Refresh list and clear entries
-            self.load_plan_exercises()
-            self.reps_entry.delete(0, 'end')
-            self.exercise_combo.set('')
-
-        except mysql.connector.Error as err:
-            conn.rollback()
-            if err.errno == 1062: # Duplicate entry
-                messagebox.showerror("Database Error", "This exercise is already in the plan.", parent=self.window)
-            else:
-                messagebox.showerror("Database Error", f"Failed to add exercise:\n{err}", parent=self.window)
-        finally:
-            cursor.close()
-            conn.close()
-
-    def remove_exercise_from_plan(self):
-        selected_item = self.plan_exercises_tree.focus()
-        if not selected_item:
-            messagebox.showwarning("No Selection", "Please select an exercise from the list to remove.", parent=self.window)
-            return
-
-        item_data = self.plan_exercises_tree.item(selected_item)['values']
-        exercise_name = item_data[0]
-        exercise_id = item_data[2] # Get the hidden Exercise_ID
-
-        if not messagebox.askyesno("Confirm Deletion", f"Are you sure you want to remove '{exercise_name}' from this plan?", parent=self.window):
-            return
-
-        conn = self.db_connect()
-        if not conn:
-            return
-        
-        cursor = conn.cursor()
-        query = "DELETE FROM Plan_Exercises WHERE Plan_ID = %s AND Exercise_ID = %s"
-        try:
-            cursor.execute(query, (self.plan_id, exercise_id))
-            conn.commit()
-            self.load_plan_exercises() # Refresh list
-        except mysql.connector.Error as err:
-            conn.rollback()
-            messagebox.showerror("Database Error", f"Failed to remove exercise:\n{err}", parent=self.window)
-        finally:
-            cursor.close()
-            conn.close()
-
-    # --- Helper methods copied from GymApp ---
-    def create_treeview(self, parent, columns, headings):
-        tree_frame = ttk.Frame(parent)
-        tree_frame.pack(fill='both', expand=True, pady=5)
-        scrollbar = ttk.Scrollbar(tree_frame)
-        scrollbar.pack(side='right', fill='y')
-        tree = ttk.Treeview(tree_frame, columns=columns, show='headings', yscrollcommand=scrollbar.set)
-        tree.pack(fill='both', expand=True)
-        scrollbar.config(command=tree.yview)
-        for col_id, text in headings.items():
-            tree.heading(col_id, text=text, anchor='w')
-            tree.column(col_id, anchor='w', width=100)
-        return tree
-
-    def clear_treeview(self, tree):
-        for item in tree.get_children():
-            tree.delete(item)
-
-
-if __name__ == '__main__':
-    root = tk.Tk()
-    app = GymApp(root)
-
-    root.mainloop()
-
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import mysql.connector
+import time
+from datetime import date, datetime, timedelta
+
+from changefeed import ChangeFeed, changed_keys, latest_change_id
+from db import ConnectionPool, configured_backend
+from jobs import JobExecutor
+from list_view import KeyedListView
+from paged_table import PagedTable
+from refcache import ReferenceCache
+from payment_import import import_payments, write_rejects
+from export import export_table, format_for
+from querystats import InstrumentedCursor, QueryStats, call_site
+from checkin import CheckInError, check_in, check_out
+from maintenance import (AUTO_CHECKOUT_AFTER_HOURS, OCCUPANCY_ROLLUP_INTERVAL, STATUS_SYNC_INTERVAL,
+                         MaintenanceScheduler, default_tasks, recent_runs, run_task)
+from occupancy import hour_of_day_profile
+import repository as repo
+
+
+# Shared pool of long-lived connections used by every window in the app.
+# POOL_SIZE bounds how many connections the app will ever hold open at once.
+# The database (MySQL server or local SQLite file) is chosen in config.py.
+POOL_SIZE = 4
+db_connect, db_settings = configured_backend()
+db_pool = ConnectionPool(db_settings, size=POOL_SIZE, connect=db_connect)
+
+# Every statement run on a pooled connection is timed and counted per call site
+# (the job that ran it, see submit_db_job); shown in the Admin tab.
+query_stats = QueryStats()
+db_pool.cursor_wrapper = lambda cursor: InstrumentedCursor(cursor, query_stats)
+QUERY_STATS_TOP_N = 25
+
+# How often the open lists pick up changes made at other desks (see changefeed.py).
+CHANGE_FEED_POLL_MS = 2000
+
+# Searches run once typing has paused for this long.
+SEARCH_DEBOUNCE_MS = 250
+
+# Scheduled maintenance (status sync, auto check-out; see maintenance.py): first
+# check shortly after startup, then every tick for whichever tasks are due.
+MAINTENANCE_FIRST_MS = 5000
+MAINTENANCE_TICK_MS = 30000
+
+
+def submit_db_job(jobs, work, on_success=None, error_title="Database Error", error_msg="Database operation failed",
+                  on_error=None, key=None, parent=None, label=None, quiet=False):
+    """
+    Runs work(conn) on a pooled connection in the background.
+
+    on_success(result) runs on the Tk thread once the work is done. Database
+    errors go to on_error(err) if given, otherwise they are shown in a messagebox.
+    Jobs sharing a `key` are coalesced (used for list refreshes); `quiet` ones
+    (background polling) do not show the busy indicator. The queries are
+    counted in query_stats under `label`, by default where `work` was defined.
+    """
+    label = label or call_site(work)
+
+    def job():
+        with query_stats.label(label):
+            conn = db_pool.connect()
+            try:
+                return work(conn)
+            finally:
+                conn.close()  # Returning to the pool rolls back anything left uncommitted
+
+    def failed(err):
+        if not isinstance(err, mysql.connector.Error):
+            raise err
+        if on_error:
+            on_error(err)
+        else:
+            messagebox.showerror(error_title, f"{error_msg}:\n{err}", parent=parent)
+
+    jobs.submit(job, on_success, failed, key=key, quiet=quiet)
+
+
+# Reference data (name -> id maps) shared by the combos and plan windows. The
+# app invalidates an entry after its own inserts/deletes; changes made at other
+# desks are picked up by the cheap signature query every REFERENCE_CHECK_SECONDS.
+REFERENCE_CHECK_SECONDS = 30
+ref_cache = ReferenceCache(check_after=REFERENCE_CHECK_SECONDS)
+ref_cache.register('members', load=repo.member_names, signature=repo.member_signature)
+ref_cache.register('trainers', load=repo.trainer_names, signature=repo.trainer_signature)
+ref_cache.register('exercises', load=repo.exercise_names, signature=repo.exercise_signature)
+
+
+class GymApp:
+    def __init__(self, root):
+        self.started_at = time.perf_counter()
+        self.load_timings = {} # name -> (seconds the load took, seconds since startup)
+        self.root = root
+        self.root.title("Gym Management System")
+        self.root.geometry("1200x700")
+
+        # --- Style Configuration ---
+        self.style = ttk.Style()
+        self.style.theme_use('clam')
+        self.style.configure('TNotebook.Tab', padding=[10, 5], font=('Arial', 11, 'bold'))
+        self.style.configure('TButton', padding=5, font=('Arial', 10))
+        self.style.configure('Accent.TButton', padding=5, font=('Arial', 10, 'bold'), background='#0078d4', foreground='white')
+        self.style.map('Accent.TButton', background=[('active', '#005a9e')])
+        self.style.configure('Treeview.Heading', font=('Arial', 10, 'bold'))
+        self.style.configure('Success.TLabel', foreground='green', font=('Arial', 10, 'italic'))
+        self.style.configure('Error.TLabel', foreground='red', font=('Arial', 10, 'italic'))
+
+        # --- Background Database Jobs + Busy Indicator ---
+        status_bar = ttk.Frame(root)
+        status_bar.pack(side='bottom', fill='x', padx=10, pady=(0, 5))
+        self.busy_label = ttk.Label(status_bar, text="")
+        self.busy_label.pack(side='left')
+        self.busy_bar = ttk.Progressbar(status_bar, mode='indeterminate', length=120)
+
+        self.jobs = JobExecutor(root, workers=POOL_SIZE, on_busy_change=self.set_busy)
+        self.debounce_timers = {} # name -> pending after() id, see debounce
+
+        # --- Main Notebook (Tabbed Interface) ---
+        self.notebook = ttk.Notebook(root)
+        self.notebook.pack(pady=10, padx=10, expand=True, fill='both')
+
+        # --- Create Tabs ---
+        self.tab_checkin = ttk.Frame(self.notebook, padding="10")
+        self.tab_members = ttk.Frame(self.notebook, padding="10")
+        self.tab_payments = ttk.Frame(self.notebook, padding="10")
+        self.tab_trainers = ttk.Frame(self.notebook, padding="10")
+        self.tab_plans = ttk.Frame(self.notebook, padding="10")
+        self.tab_occupancy = ttk.Frame(self.notebook, padding="10")
+        self.tab_admin = ttk.Frame(self.notebook, padding="10")
+
+        self.notebook.add(self.tab_checkin, text='Check-in / Out')
+        self.notebook.add(self.tab_members, text='Members')
+        self.notebook.add(self.tab_payments, text='Payments')
+        self.notebook.add(self.tab_trainers, text='Trainers')
+        self.notebook.add(self.tab_plans, text='Workout Plans')
+        self.notebook.add(self.tab_occupancy, text='Occupancy')
+        self.notebook.add(self.tab_admin, text='Admin')
+
+        # --- Populate Tabs ---
+        self.setup_checkin_tab()
+        self.setup_members_tab()
+        self.setup_payments_tab()
+        self.setup_trainers_tab()
+        self.setup_plans_tab()
+        self.setup_occupancy_tab()
+        self.setup_admin_tab()
+
+        # --- Data Maps for Comboboxes ---
+        self.member_map = {}
+        self.trainer_map = {}
+        self.change_feed = None # Started with the first "currently in" load, see poll_changes
+
+        # --- Lazy Tab Loading ---
+        # Only the check-in tab loads at startup; every other tab loads on its first visit.
+        self.loaded_tabs = {self.tab_checkin}
+        self.tab_loaders = {
+            self.tab_members: [self.load_members_data],
+            self.tab_payments: [self.load_payments_data],
+            self.tab_trainers: [self.load_trainers_data],
+            self.tab_plans: [self.load_workout_plans, self.load_member_and_trainer_combos, self.load_all_exercises_map],
+            self.tab_occupancy: [self.load_occupancy_dashboard],
+            self.tab_admin: [self.load_maintenance_history, self.show_query_stats],
+        }
+        self.combos_stale = False # Set when members/trainers reload; combos refresh on the next plans visit
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+
+        # --- Initial Data Load ---
+        self.load_attendance_data()
+        self.root.after_idle(self.record_timing, 'UI built', None)
+        self.maintenance = MaintenanceScheduler(default_tasks())
+        self.root.after(MAINTENANCE_FIRST_MS, self.maintenance_tick)
+
+    def on_tab_changed(self, event=None):
+        tab = self.notebook.nametowidget(self.notebook.select())
+        if tab not in self.loaded_tabs:
+            self.loaded_tabs.add(tab)
+            for loader in self.tab_loaders.get(tab, ()):
+                loader()
+        elif tab is self.tab_plans and self.combos_stale:
+            self.load_member_and_trainer_combos()
+
+    def timed(self, name, callback):
+        """Wraps a loader's success callback so its first completion lands in the startup report."""
+        started = time.perf_counter()
+
+        def wrapper(result):
+            self.record_timing(name, started)
+            callback(result)
+        return wrapper
+
+    def record_timing(self, name, started):
+        if name in self.load_timings:
+            return
+        now = time.perf_counter()
+        self.load_timings[name] = (now - started if started else None, now - self.started_at)
+        self.update_timing_report()
+
+    def set_busy(self, busy):
+        """Shows or hides the busy indicator while background jobs are running."""
+        if busy:
+            self.busy_label.config(text="Working...")
+            self.busy_bar.pack(side='left', padx=5)
+            self.busy_bar.start(10)
+        else:
+            self.busy_bar.stop()
+            self.busy_bar.pack_forget()
+            self.busy_label.config(text="")
+
+    # ==================================================================
+    # TAB 1: CHECK-IN / OUT
+    # ==================================================================
+    def setup_checkin_tab(self):
+        main_frame = ttk.Frame(self.tab_checkin)
+        main_frame.pack(fill='both', expand=True, padx=10, pady=10)
+
+        # --- Check-in/Out Frame ---
+        checkin_frame = ttk.LabelFrame(main_frame, text="Member Actions", padding=15)
+        checkin_frame.pack(fill='x', pady=10)
+
+        ttk.Label(checkin_frame, text="Member ID:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
+        self.checkin_mem_id_entry = ttk.Entry(checkin_frame, width=30)
+        self.checkin_mem_id_entry.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
+
+        checkin_btn = ttk.Button(checkin_frame, text="Check-in", command=self.handle_checkin, style='Accent.TButton')
+        checkin_btn.grid(row=0, column=2, padx=10, pady=5)
+
+        checkout_btn = ttk.Button(checkin_frame, text="Check-out", command=self.handle_checkout)
+        checkout_btn.grid(row=0, column=3, padx=5, pady=5)
+
+        checkin_frame.grid_columnconfigure(1, weight=1)
+
+        self.checkin_status_label = ttk.Label(checkin_frame, text="")
+        self.checkin_status_label.grid(row=1, column=0, columnspan=4, pady=5)
+
+        # --- Currently In Frame ---
+        attendance_frame = ttk.LabelFrame(main_frame, text="Members Currently Checked In", padding=15)
+        attendance_frame.pack(fill='both', expand=True, pady=10)
+
+        self.attendance_tree = self.create_treeview(attendance_frame, 
+            columns=('Mem_ID', 'Name', 'Check_In_Time'),
+            headings={'Mem_ID': 'Member ID', 'Name': 'Name', 'Check_In_Time': 'Check-in Time'}
+        )
+        # Rows are keyed by Attendance_ID so a member with a forgotten open session
+        # and a new one does not collide.
+        self.attendance_view = KeyedListView(self.attendance_tree, lambda session: (
+            (session.mem_id, session.name, session.check_in.strftime('%Y-%m-%d %H:%M:%S')), ()))
+        ttk.Button(main_frame, text="Refresh List", command=self.load_attendance_data).pack(pady=5)
+
+    def handle_checkin(self):
+        mem_id = self.checkin_mem_id_entry.get()
+        if not mem_id:
+            messagebox.showwarning("Input Error", "Please enter a Member ID.")
+            return
+
+        def work(conn):
+            try:
+                return check_in(conn, mem_id)
+            except CheckInError as err:
+                return err # Refused scans are shown, not treated as database errors
+
+        def done(result):
+            if isinstance(result, CheckInError):
+                # THIS IS THE TRIGGER DEMONSTRATION (reason 'membership_expired')
+                messagebox.showerror("Check-in Failed", str(result))
+                status = "Check-in failed: Membership expired." if result.reason == 'membership_expired' else str(result)
+                self.checkin_status_label.config(text=status, style='Error.TLabel')
+                return
+            att_id, name, check_in_time = result
+            self.checkin_status_label.config(text=f"Member {mem_id} checked in successfully.", style='Success.TLabel')
+            self.attendance_view.upsert(repo.OpenSession(att_id, mem_id, name, check_in_time)) # Update "currently in" list
+
+        def failed(err):
+            messagebox.showerror("Database Error", f"Failed to check in:\n{err}")
+            self.checkin_status_label.config(text="An error occurred.", style='Error.TLabel')
+
+        self.checkin_status_label.config(text=f"Checking in {mem_id}...", style='TLabel')
+        submit_db_job(self.jobs, work, done, on_error=failed)
+
+    def handle_checkout(self):
+        mem_id = self.checkin_mem_id_entry.get()
+        if not mem_id:
+            messagebox.showwarning("Input Error", "Please enter a Member ID.")
+            return
+
+        def work(conn):
+            try:
+                return check_out(conn, mem_id)
+            except CheckInError as err:
+                return err
+
+        def done(result):
+            if isinstance(result, CheckInError):
+                messagebox.showinfo("Check-out Info", str(result))
+                self.checkin_status_label.config(text=f"No active check-in found for {mem_id}.", style='Error.TLabel')
+            else:
+                self.checkin_status_label.config(text=f"Member {mem_id} checked out successfully.", style='Success.TLabel')
+                self.attendance_view.remove(result) # Update "currently in" list
+
+        self.checkin_status_label.config(text=f"Checking out {mem_id}...", style='TLabel')
+        submit_db_job(self.jobs, work, done, error_msg="Failed to check out")
+
+    def load_attendance_data(self):
+        """Full reload of the "currently in" list; check-ins/outs afterwards arrive through the change feed."""
+        start_feed = self.change_feed is None
+
+        def work(conn):
+            # Read the log position first so a check-in landing in between comes through the feed
+            feed = ChangeFeed(latest_change_id(conn)) if start_feed else None
+            return repo.open_sessions(conn), feed
+
+        def show(data):
+            rows, feed = data
+            self.attendance_view.set_rows(rows)
+            if feed and self.change_feed is None:
+                self.change_feed = feed
+                self.root.after(CHANGE_FEED_POLL_MS, self.poll_changes)
+
+        submit_db_job(self.jobs, work, self.timed('Check-in list', show),
+                      error_title="Data Error", error_msg="Failed to load attendance data", key='attendance')
+
+    def refresh_sessions(self, attendance_ids):
+        """Re-reads these sessions: open ones are shown (or updated), closed or deleted ones dropped."""
+        def work(conn):
+            return repo.open_sessions_by_id(conn, attendance_ids)
+
+        def show(sessions):
+            still_open = {str(session.attendance_id) for session in sessions}
+            for att_id in attendance_ids:
+                if att_id not in still_open:
+                    self.attendance_view.remove(att_id)
+            for session in sessions:
+                self.attendance_view.upsert(session)
+
+        def failed(err):
+            self.checkin_status_label.config(text=f"Could not sync attendance list: {err}", style='Error.TLabel')
+
+        submit_db_job(self.jobs, work, show, on_error=failed, quiet=True)
+
+    # ==================================================================
+    # CHANGES MADE AT OTHER DESKS
+    # ==================================================================
+    def poll_changes(self):
+        """
+        Brings the loaded lists up to date with the changes made since the last
+        poll, at any desk: one read of the change log past the last entry seen,
+        then a lookup of just the rows it names. Lists not loaded yet are
+        skipped; they are read fresh on their first visit.
+        """
+        def apply(changes):
+            if changes is None:
+                # Too far behind to tell what changed: reload instead
+                self.load_attendance_data()
+                self.load_members_data()
+                self.load_payments_data()
+                self.load_workout_plans()
+                return
+            keys = changed_keys(changes)
+            if 'Attendance' in keys:
+                self.refresh_sessions(keys['Attendance'])
+            if 'Member' in keys:
+                self.members_table.apply_changes(keys['Member'])
+                if any(change.table == 'Member' and change.operation != 'U' for change in changes):
+                    ref_cache.invalidate('members')
+                    self.combos_stale = True
+            if 'Payment' in keys:
+                self.payments_table.apply_changes(keys['Payment'])
+            if 'Workout_Plan' in keys and self.tab_plans in self.loaded_tabs:
+                self.refresh_plans(keys['Workout_Plan'])
+
+        def failed(err):
+            # Transient errors are retried on the next tick instead of popping up a dialog
+            self.checkin_status_label.config(text=f"Could not sync with other desks: {err}", style='Error.TLabel')
+
+        # The next tick is set up before this one runs, so nothing a poll (or applying
+        # its changes) raises can stop the feed; being keyed, polls still run one at a time.
+        self.root.after(CHANGE_FEED_POLL_MS, self.poll_changes)
+        submit_db_job(self.jobs, self.change_feed.poll, apply, on_error=failed, key='change_feed', quiet=True,
+                      label="Change feed")
+
+    # ==================================================================
+    # TAB 2: MEMBERS
+    # ==================================================================
+    def setup_members_tab(self):
+        main_frame = ttk.Frame(self.tab_members)
+        main_frame.pack(fill='both', expand=True)
+
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill='x', pady=5)
+
+        ttk.Button(button_frame, text="Refresh List", command=self.load_members_data).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="Add New Member", command=self.open_add_member_window).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="View Selected Member Details", command=self.open_member_details).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="Delete Selected Member", command=self.delete_member).pack(side='left', padx=5)
+
+        # Search as you type: ID, name or phone prefix, filtered on the server
+        self.member_search_var = tk.StringVar()
+        ttk.Entry(button_frame, textvariable=self.member_search_var, width=25).pack(side='right', padx=5)
+        ttk.Label(button_frame, text="Search (ID, name or phone):").pack(side='right')
+        self.member_search_var.trace_add('write', lambda *_: self.debounce('member_search', self.apply_member_search))
+
+        self.member_tree = self.create_treeview(main_frame,
+            columns=('ID', 'Name', 'Phone', 'Join_Date', 'Age', 'Valid_Until', 'Total_Paid', 'Status'),
+            headings={'ID': 'Member ID', 'Name': 'Name', 'Phone': 'Phone', 'Join_Date': 'Join Date', 'Age': 'Age', 'Valid_Until': 'Valid Until',
+                      'Total_Paid': 'Total Paid (₹)', 'Status': 'Status'}
+        )
+        
+        # Add tags for status coloring (by Valid_until, so it is right even before the status procedure runs)
+        self.member_tree.tag_configure('Active', background='#e8f8e8', foreground='#006400')
+        self.member_tree.tag_configure('Inactive', background='#f8e8e8', foreground='#a00000')
+
+        # Only a window of pages is kept in the tree; more are fetched on scroll.
+        # Total Paid is the ledger summary the Payment triggers keep on the Member row.
+        self.members_table = PagedTable(self.member_tree, self.run_table_job('Members', "Failed to load member data"),
+            run_background_job=self.run_background_table_job('Members'),
+            table='Member',
+            columns=[('ID', 'Mem_ID'), ('Name', 'Name'), ('Phone', 'Phone_no'), ('Join_Date', 'Join_date'), ('Age', 'Age'), ('Valid_Until', 'Valid_until'),
+                     ('Total_Paid', 'Total_paid')],
+            key_column='Mem_ID',
+            format_row=self.format_member_row,
+            sortable=('ID', 'Name', 'Join_Date', 'Total_Paid')
+        )
+
+    def load_members_data(self):
+        if self.tab_members not in self.loaded_tabs:
+            return # Loaded on first visit to the tab
+        self.members_table.reload()
+        # Refresh combos in case of new member
+        self.combos_stale = True
+
+    def apply_member_search(self):
+        self.members_table.set_filter(repo.member_search_filter(self.member_search_var.get()))
+
+    def format_member_row(self, row):
+        (mem_id, name, phone, join_date, age, valid_until, total_paid) = row
+        status = 'Active' if valid_until is not None and valid_until >= date.today() else 'Inactive'
+        valid_text = valid_until.strftime('%Y-%m-%d') if valid_until else 'Never paid'
+        return (mem_id, name, phone, join_date.strftime('%Y-%m-%d'), age, valid_text, f"{total_paid:.2f}", status), (status,)
+
+    def open_add_member_window(self):
+        window = tk.Toplevel(self.root)
+        window.title("Add New Member")
+        
+        form_frame = ttk.Frame(window, padding=10)
+        form_frame.pack()
+
+        fields = ['Mem_ID', 'Name', 'Phone_no', 'Age']
+        entries = {}
+        for i, field in enumerate(fields):
+            ttk.Label(form_frame, text=f"{field}:").grid(row=i, column=0, padx=5, pady=5, sticky='w')
+            entry = ttk.Entry(form_frame, width=30)
+            entry.grid(row=i, column=1, padx=5, pady=5)
+            entries[field] = entry
+
+        # Add Join Date (auto-populated)
+        ttk.Label(form_frame, text="Join_date:").grid(row=len(fields), column=0, padx=5, pady=5, sticky='w')
+        join_date_entry = ttk.Entry(form_frame, width=30)
+        join_date_entry.insert(0, date.today().strftime('%Y-%m-%d'))
+        join_date_entry.grid(row=len(fields), column=1, padx=5, pady=5)
+        entries['Join_date'] = join_date_entry
+        
+        def save():
+            try:
+                data = (
+                    entries['Mem_ID'].get(),
+                    entries['Name'].get(),
+                    entries['Phone_no'].get(),
+                    int(entries['Age'].get()),
+                    entries['Join_date'].get()
+                )
+            except ValueError:
+                messagebox.showerror("Input Error", "Age must be a number.", parent=window)
+                return
+
+            def work(conn):
+                repo.add_member(conn, *data)
+                ref_cache.invalidate('members')
+
+            def done(_):
+                messagebox.showinfo("Success", "Member added successfully.", parent=window)
+                self.load_members_data()
+                window.destroy()
+
+            submit_db_job(self.jobs, work, done, error_msg="Failed to add member", parent=window)
+
+        ttk.Button(form_frame, text="Save Member", command=save, style='Accent.TButton').grid(row=len(fields)+1, column=0, columnspan=2, pady=10)
+
+    def delete_member(self):
+        selected_item = self.member_tree.focus()
+        if not selected_item:
+            messagebox.showwarning("No Selection", "Please select a member from the list to delete.")
+            return
+        
+        member_data = self.member_tree.item(selected_item)['values']
+        mem_id = member_data[0]
+        mem_name = member_data[1]
+
+        if not messagebox.askyesno("Confirm Deletion", f"Are you sure you want to delete {mem_name} ({mem_id})?\n\nWARNING: This will permanently delete all their associated payments, attendance records, and workout plans."):
+            return
+
+        def work(conn):
+            repo.delete_member(conn, mem_id)
+            ref_cache.invalidate('members')
+        
+        def done(_):
+            messagebox.showinfo("Success", f"Member {mem_name} was deleted successfully.")
+            
+            # Refresh all related data
+            self.load_members_data()
+            self.load_payments_data()
+            self.load_attendance_data()
+            self.load_workout_plans()
+
+        submit_db_job(self.jobs, work, done, error_msg="Failed to delete member")
+
+    def open_member_details(self):
+        selected_item = self.member_tree.focus()
+        if not selected_item:
+            messagebox.showwarning("No Selection", "Please select a member from the list to view details.")
+            return
+        
+        member_data = self.member_tree.item(selected_item)['values']
+        mem_id = member_data[0]
+        mem_name = member_data[1]
+
+        window = tk.Toplevel(self.root)
+        window.title(f"Details for {mem_name} ({mem_id})")
+        window.geometry("800x600")
+
+        # --- General Info & Payment Summary ---
+        info_frame = ttk.LabelFrame(window, text="Member Summary", padding=10)
+        info_frame.pack(pady=10, padx=10, fill='x')
+
+        ttk.Label(info_frame, text=f"Name: {mem_name}").pack(anchor='w')
+        ttk.Label(info_frame, text=f"Member ID: {mem_id}").pack(anchor='w')
+        total_label = ttk.Label(info_frame, text="Total Payments Made: loading...")
+        total_label.pack(anchor='w')
+        payments_label = ttk.Label(info_frame, text="")
+        payments_label.pack(anchor='w')
+            
+        # --- Attendance History ---
+        attendance_frame = ttk.LabelFrame(window, text="Attendance History", padding=10)
+        attendance_frame.pack(pady=10, padx=10, fill='both', expand=True)
+            
+        att_tree = self.create_treeview(attendance_frame,
+            columns=('ID', 'Check_In', 'Check_Out', 'Duration'),
+            headings={'ID': 'Att. ID', 'Check_In': 'Check-in', 'Check_Out': 'Check-out', 'Duration': 'Duration (min)'}
+        )
+
+        # --- Workout Plan ---
+        plan_frame = ttk.LabelFrame(window, text="Workout Plan", padding=10)
+        plan_frame.pack(pady=10, padx=10, fill='both', expand=True)
+            
+        plan_tree = self.create_treeview(plan_frame,
+            columns=('Trainer', 'Exercise', 'Reps/Sets'),
+            headings={'Trainer': 'Trainer', 'Exercise': 'Exercise', 'Reps/Sets': 'Reps/Sets Info'}
+        )
+            
+        def show(data):
+            if not window.winfo_exists():
+                return
+            payments, attendance, results = data
+            total_label.config(text=f"Total Payments Made: ₹{payments.total_paid:.2f}")
+            if payments.payment_count:
+                payments_label.config(text=f"Payments: {payments.payment_count} (first {payments.first_payment:%Y-%m-%d}, "
+                                           f"last {payments.last_payment:%Y-%m-%d})")
+            else:
+                payments_label.config(text="Payments: none yet")
+
+            for (att_id, check_in, check_out, duration) in attendance:
+                duration_str = str(duration) if duration is not None else "N/A"
+                att_tree.insert('', 'end', values=(att_id, check_in.strftime('%Y-%m-%d %H:%M'), check_out.strftime('%Y-%m-%d %H:%M') if check_out else "N/A", duration_str))
+            
+            if not results or results[0][1] is None:
+                plan_tree.insert('', 'end', values=("No trainer assigned", "No exercises added", ""))
+            else:
+                for (trainer, exercise, reps) in results:
+                    trainer_name = trainer if trainer else "N/A"
+                    exercise_name = exercise if exercise else "N/A"
+                    reps_info = reps if reps else "N/A"
+                    plan_tree.insert('', 'end', values=(trainer_name, exercise_name, reps_info))
+
+        # The payment summary is read off the Member row; durations are computed inline (same rule as
+        # CalculateWorkoutDuration) so the whole history comes back in one round-trip.
+        submit_db_job(self.jobs, lambda conn: repo.member_details(conn, mem_id), show,
+                      error_title="Error", error_msg="Failed to load member details", parent=window)
+
+    # ==================================================================
+    # TAB 3: PAYMENTS
+    # ==================================================================
+    def setup_payments_tab(self):
+        main_frame = ttk.Frame(self.tab_payments)
+        main_frame.pack(fill='both', expand=True)
+
+        # --- Add Payment Frame ---
+        add_payment_frame = ttk.LabelFrame(main_frame, text="Add New Payment", padding=15)
+        add_payment_frame.pack(fill='x', pady=10)
+
+        ttk.Label(add_payment_frame, text="Member ID:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
+        self.payment_mem_id_entry = ttk.Entry(add_payment_frame, width=30)
+        self.payment_mem_id_entry.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
+
+        ttk.Label(add_payment_frame, text="Amount (₹):").grid(row=1, column=0, padx=5, pady=5, sticky='w')
+        self.payment_amount_entry = ttk.Entry(add_payment_frame, width=30)
+        self.payment_amount_entry.grid(row=1, column=1, padx=5, pady=5, sticky='ew')
+        
+        add_payment_btn = ttk.Button(add_payment_frame, text="Submit Payment", command=self.handle_add_payment, style='Accent.TButton')
+        add_payment_btn.grid(row=0, column=2, rowspan=2, padx=10, pady=5, sticky='ns')
+
+        add_payment_frame.grid_columnconfigure(1, weight=1)
+
+        # --- Payment History Frame ---
+        history_frame = ttk.LabelFrame(main_frame, text="All Payments", padding=15)
+        history_frame.pack(fill='both', expand=True, pady=10)
+
+        # Filters apply as you type (on the server); dates as YYYY-MM-DD
+        filter_frame = ttk.Frame(history_frame)
+        filter_frame.pack(fill='x', pady=(0, 5))
+        self.payment_filter_vars = {}
+        for field, text, width in (('member', "Member (ID or name):", 20), ('date_from', "From:", 11), ('date_to', "To:", 11),
+                                   ('amount_min', "Min ₹:", 9), ('amount_max', "Max ₹:", 9)):
+            ttk.Label(filter_frame, text=text).pack(side='left', padx=(5, 2))
+            var = self.payment_filter_vars[field] = tk.StringVar()
+            ttk.Entry(filter_frame, textvariable=var, width=width).pack(side='left')
+            var.trace_add('write', lambda *_: self.debounce('payment_filter', self.apply_payment_filter))
+        ttk.Button(filter_frame, text="Clear", command=self.clear_payment_filter).pack(side='left', padx=5)
+        self.payment_filter_label = ttk.Label(filter_frame, text="", style='Error.TLabel')
+        self.payment_filter_label.pack(side='left', padx=5)
+
+        self.payments_tree = self.create_treeview(history_frame,
+            columns=('Payment_ID', 'Mem_ID', 'Amount', 'Date', 'Status'),
+            headings={'Payment_ID': 'Payment ID', 'Mem_ID': 'Member ID', 'Amount': 'Amount (₹)', 'Date': 'Date', 'Status': 'Status'}
+        )
+        self.payments_table = PagedTable(self.payments_tree, self.run_table_job('Payments', "Failed to load payment data"),
+            run_background_job=self.run_background_table_job('Payments'),
+            table='Payment',
+            columns=[('Payment_ID', 'Payment_ID'), ('Mem_ID', 'Mem_ID'), ('Amount', 'amount'), ('Date', 'Payment_date'), ('Status', 'Payment_status')],
+            key_column='Payment_ID',
+            format_row=self.format_payment_row,
+            sortable=('Payment_ID', 'Mem_ID', 'Amount', 'Date')
+        )
+        payment_buttons = ttk.Frame(main_frame)
+        payment_buttons.pack(pady=5)
+        ttk.Button(payment_buttons, text="Refresh Payment List", command=self.load_payments_data).pack(side='left', padx=5)
+        ttk.Button(payment_buttons, text="Import Payments from CSV...", command=self.handle_import_payments).pack(side='left', padx=5)
+
+    def apply_payment_filter(self):
+        values = {field: var.get().strip() for field, var in self.payment_filter_vars.items()}
+        try:
+            dates = {field: datetime.strptime(values[field], '%Y-%m-%d').date() if values[field] else None
+                     for field in ('date_from', 'date_to')}
+        except ValueError:
+            self.payment_filter_label.config(text="Dates must be YYYY-MM-DD")
+            return
+        try:
+            amounts = {field: float(values[field]) if values[field] else None for field in ('amount_min', 'amount_max')}
+        except ValueError:
+            self.payment_filter_label.config(text="Amounts must be numbers")
+            return
+        self.payment_filter_label.config(text="")
+        self.payments_table.set_filter(repo.payment_search_filter(values['member'], **dates, **amounts))
+
+    def clear_payment_filter(self):
+        for var in self.payment_filter_vars.values():
+            var.set('')
+
+    def handle_add_payment(self):
+        mem_id = self.payment_mem_id_entry.get()
+        amount_str = self.payment_amount_entry.get()
+
+        if not mem_id or not amount_str:
+            messagebox.showwarning("Input Error", "Please enter both Member ID and Amount.")
+            return
+
+        try:
+            amount = float(amount_str)
+        except ValueError:
+            messagebox.showwarning("Input Error", "Amount must be a valid number.")
+            return
+
+        def work(conn):
+            repo.add_payment(conn, mem_id, amount, date.today())
+        
+        def done(_):
+            messagebox.showinfo("Success", f"Payment of ₹{amount:.2f} for {mem_id} recorded.")
+            
+            # Clear entries
+            self.payment_mem_id_entry.delete(0, 'end')
+            self.payment_amount_entry.delete(0, 'end')
+            
+            # THIS IS THE TRIGGER DEMONSTRATION
+            # The AfterPaymentInsert trigger has fired. Now we refresh the lists
+            # to *show* its effect.
+            self.load_payments_data()
+            self.load_members_data() # This will show the member's status update
+
+        submit_db_job(self.jobs, work, done, error_msg="Failed to add payment")
+
+    def handle_import_payments(self):
+        path = filedialog.askopenfilename(title="Import Payments", filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+
+        def work(conn):
+            try:
+                with open(path, newline='', encoding='utf-8-sig') as f:
+                    return import_payments(conn, f)
+            except (OSError, ValueError) as err:
+                return err # Unreadable file or bad header; nothing was imported
+
+        def done(result):
+            if isinstance(result, Exception):
+                messagebox.showerror("Import Error", f"Could not import {path}:\n{result}")
+                return
+
+            # Refresh once for the whole import rather than per payment
+            self.load_payments_data()
+            self.load_members_data()
+
+            if not result.rejected:
+                messagebox.showinfo("Import Complete", result.summary())
+                return
+            if messagebox.askyesno("Import Complete", f"{result.summary()}\n\nSave the rejected rows (with reasons) to a file?"):
+                rejects_path = filedialog.asksaveasfilename(title="Save Rejected Rows", defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+                if rejects_path:
+                    write_rejects(result, rejects_path)
+
+        def failed(err):
+            messagebox.showerror("Import Error", f"Payment import stopped:\n{err}\n\nBatches committed before the error were kept.")
+            self.load_payments_data()
+            self.load_members_data()
+
+        submit_db_job(self.jobs, work, done, on_error=failed)
+
+    def load_payments_data(self):
+        if self.tab_payments not in self.loaded_tabs:
+            return # Loaded on first visit to the tab
+        self.payments_table.reload()
+
+    def format_payment_row(self, row):
+        (pid, mid, amount, pdate, status) = row
+        return (pid, mid, f"₹{amount:.2f}", pdate.strftime('%Y-%m-%d'), status), ()
+
+    # ==================================================================
+    # TAB 4: TRAINERS
+    # ==================================================================
+    def setup_trainers_tab(self):
+        main_frame = ttk.Frame(self.tab_trainers)
+        main_frame.pack(fill='both', expand=True)
+
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill='x', pady=5)
+
+        ttk.Button(button_frame, text="Add New Trainer", command=self.open_add_trainer_window).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="Delete Selected Trainer", command=self.delete_trainer).pack(side='left', padx=5)
+
+        self.trainers_tree = self.create_treeview(main_frame,
+            columns=('ID', 'Name', 'Salary', 'Date_Hired'),
+            headings={'ID': 'Trainer ID', 'Name': 'Name', 'Salary': 'Salary (₹)', 'Date_Hired': 'Date Hired'}
+        )
+        self.trainers_view = KeyedListView(self.trainers_tree, lambda trainer: (
+            (trainer.trainer_id, trainer.name, f"₹{trainer.salary:.2f}", trainer.date_hired.strftime('%Y-%m-%d')), ()))
+        # self.load_trainers_data() # Initial load <-- REMOVED: This call is premature and redundant.
+        # Data will be loaded by the __init__ method after all tabs are created.
+
+    def load_trainers_data(self):
+        if self.tab_trainers not in self.loaded_tabs:
+            return # Loaded on first visit to the tab
+        def show(rows):
+            self.trainers_view.set_rows(rows)
+            # Refresh combos in case of new trainer
+            self.combos_stale = True
+
+        submit_db_job(self.jobs, repo.list_trainers, self.timed('Trainers', show),
+                      error_title="Data Error", error_msg="Failed to load trainer data", key='trainers')
+
+    def open_add_trainer_window(self):
+        window = tk.Toplevel(self.root)
+        window.title("Add New Trainer")
+        
+        form_frame = ttk.Frame(window, padding=10)
+        form_frame.pack()
+
+        fields = ['Name', 'Salary']
+        entries = {}
+        for i, field in enumerate(fields):
+            label_text = f"{field} (₹):" if field == 'Salary' else f"{field}:"
+            ttk.Label(form_frame, text=label_text).grid(row=i, column=0, padx=5, pady=5, sticky='w')
+            entry = ttk.Entry(form_frame, width=30)
+            entry.grid(row=i, column=1, padx=5, pady=5)
+            entries[field] = entry
+
+        ttk.Label(form_frame, text="Date_hired:").grid(row=len(fields), column=0, padx=5, pady=5, sticky='w')
+        hired_date_entry = ttk.Entry(form_frame, width=30)
+        hired_date_entry.insert(0, date.today().strftime('%Y-%m-%d'))
+        hired_date_entry.grid(row=len(fields), column=1, padx=5, pady=5)
+        entries['Date_hired'] = hired_date_entry
+        
+        def save():
+            try:
+                data = (
+                    entries['Name'].get(),
+                    float(entries['Salary'].get()),
+                    entries['Date_hired'].get()
+                )
+            except ValueError:
+                messagebox.showerror("Input Error", "Salary must be a number.", parent=window)
+                return
+
+            def work(conn):
+                repo.add_trainer(conn, *data)
+                ref_cache.invalidate('trainers')
+
+            def done(_):
+                messagebox.showinfo("Success", "Trainer added successfully.", parent=window)
+                self.load_trainers_data()
+                window.destroy()
+
+            submit_db_job(self.jobs, work, done, error_msg="Failed to add trainer", parent=window)
+
+        ttk.Button(form_frame, text="Save Trainer", command=save, style='Accent.TButton').grid(row=len(fields)+1, column=0, columnspan=2, pady=10)
+
+    def delete_trainer(self):
+        selected_item = self.trainers_tree.focus()
+        if not selected_item:
+            messagebox.showwarning("No Selection", "Please select a trainer from the list to delete.")
+            return
+        
+        trainer_data = self.trainers_tree.item(selected_item)['values']
+        trainer_id = trainer_data[0]
+        trainer_name = trainer_data[1]
+
+        if not messagebox.askyesno("Confirm Deletion", f"Are you sure you want to delete {trainer_name} (ID: {trainer_id})?\n\nWARNING: This will permanently delete all workout plans assigned to this trainer."):
+            return
+
+        def work(conn):
+            repo.delete_trainer(conn, trainer_id)
+            ref_cache.invalidate('trainers')
+        
+        def done(_):
+            messagebox.showinfo("Success", f"Trainer {trainer_name} was deleted successfully.")
+            
+            # Refresh related data
+            self.load_trainers_data()
+            self.load_workout_plans()
+
+        submit_db_job(self.jobs, work, done, error_msg="Failed to delete trainer")
+
+    # ==================================================================
+    # TAB 5: WORKOUT PLANS
+    # ==================================================================
+    def setup_plans_tab(self):
+        main_frame = ttk.Frame(self.tab_plans)
+        main_frame.pack(fill='both', expand=True)
+
+        # --- Create New Plan Frame ---
+        create_plan_frame = ttk.LabelFrame(main_frame, text="Create New Workout Plan", padding=15)
+        create_plan_frame.pack(fill='x', pady=10)
+
+        ttk.Label(create_plan_frame, text="Select Member:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
+        self.plan_member_combo = ttk.Combobox(create_plan_frame, state='readonly', width=30)
+        self.plan_member_combo.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
+
+        ttk.Label(create_plan_frame, text="Select Trainer:").grid(row=1, column=0, padx=5, pady=5, sticky='w')
+        self.plan_trainer_combo = ttk.Combobox(create_plan_frame, state='readonly', width=30)
+        self.plan_trainer_combo.grid(row=1, column=1, padx=5, pady=5, sticky='ew')
+        
+        ttk.Label(create_plan_frame, text="Start Date (YYYY-MM-DD):").grid(row=2, column=0, padx=5, pady=5, sticky='w')
+        self.plan_start_entry = ttk.Entry(create_plan_frame, width=30)
+        self.plan_start_entry.insert(0, date.today().strftime('%Y-%m-%d'))
+        self.plan_start_entry.grid(row=2, column=1, padx=5, pady=5, sticky='ew')
+
+        ttk.Label(create_plan_frame, text="End Date (YYYY-MM-DD):").grid(row=3, column=0, padx=5, pady=5, sticky='w')
+        self.plan_end_entry = ttk.Entry(create_plan_frame, width=30)
+        self.plan_end_entry.grid(row=3, column=1, padx=5, pady=5, sticky='ew')
+
+        create_plan_btn = ttk.Button(create_plan_frame, text="Create Plan", command=self.handle_create_plan, style='Accent.TButton')
+        create_plan_btn.grid(row=1, column=2, rowspan=2, padx=10, pady=5, sticky='ns')
+
+        create_plan_frame.grid_columnconfigure(1, weight=1)
+
+        # --- Existing Plans Frame ---
+        plans_frame = ttk.LabelFrame(main_frame, text="Existing Workout Plans", padding=15)
+        plans_frame.pack(fill='both', expand=True, pady=10)
+
+        self.plans_tree = self.create_treeview(plans_frame,
+            columns=('Plan_ID', 'Member', 'Trainer', 'Start', 'End'),
+            headings={'Plan_ID': 'Plan ID', 'Member': 'Member Name', 'Trainer': 'Trainer Name', 'Start': 'Start Date', 'End': 'End Date'}
+        )
+        self.plans_view = KeyedListView(self.plans_tree, lambda plan: (
+            (plan.plan_id, plan.member_name, plan.trainer_name, plan.start_date.strftime('%Y-%m-%d'),
+             plan.end_date.strftime('%Y-%m-%d') if plan.end_date else "N/A"), ()))
+        
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(pady=5)
+        ttk.Button(button_frame, text="Refresh Plan List", command=self.load_workout_plans).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="Manage Exercises for Selected Plan", command=self.open_manage_exercises_window).pack(side='left', padx=5)
+
+    def load_workout_plans(self):
+        if self.tab_plans not in self.loaded_tabs:
+            return # Loaded on first visit to the tab
+        submit_db_job(self.jobs, repo.list_workout_plans, self.timed('Workout plans', self.plans_view.set_rows),
+                      error_title="Data Error", error_msg="Failed to load workout plans", key='plans')
+
+    def refresh_plans(self, plan_ids):
+        """Re-reads these plans: existing ones are shown (or updated), deleted ones dropped."""
+        def work(conn):
+            return repo.list_workout_plans(conn, plan_ids)
+
+        def show(plans):
+            found = {str(plan.plan_id) for plan in plans}
+            for plan_id in plan_ids:
+                if plan_id not in found:
+                    self.plans_view.remove(plan_id)
+            for plan in plans:
+                self.plans_view.upsert(plan)
+
+        # A failed lookup leaves the rows as they were until the next "Refresh Plan List"
+        submit_db_job(self.jobs, work, show, on_error=lambda err: None, quiet=True)
+
+    def load_member_and_trainer_combos(self):
+        self.combos_stale = False
+
+        def show(data):
+            members, trainers = data
+            # Load members
+            self.member_map = members
+            self.plan_member_combo['values'] = sorted(self.member_map.keys())
+
+            # Load trainers
+            self.trainer_map = trainers
+            self.plan_trainer_combo['values'] = sorted(self.trainer_map.keys())
+
+        # Served straight from memory while the cached maps are fresh
+        members, trainers = ref_cache.peek('members'), ref_cache.peek('trainers')
+        if members is not None and trainers is not None:
+            show((members, trainers))
+            return
+
+        def work(conn):
+            return ref_cache.get('members', conn), ref_cache.get('trainers', conn)
+
+        submit_db_job(self.jobs, work, self.timed('Member/trainer combos', show),
+                      error_title="Data Error", error_msg="Failed to load member/trainer lists for combos", key='combos')
+
+    def load_all_exercises_map(self):
+        """Warms the exercises entry of the reference cache used by ManageExercisesWindow."""
+        if ref_cache.peek('exercises') is not None:
+            return
+        submit_db_job(self.jobs, lambda conn: ref_cache.get('exercises', conn), self.timed('Exercises', lambda _: None),
+                      error_title="Data Error", error_msg="Failed to load exercises list", key='exercises')
+
+    def handle_create_plan(self):
+        member_name = self.plan_member_combo.get()
+        trainer_name = self.plan_trainer_combo.get()
+        start_date_str = self.plan_start_entry.get()
+        end_date_str = self.plan_end_entry.get()
+
+        if not member_name or not trainer_name or not start_date_str:
+            messagebox.showwarning("Input Error", "Please select a Member, a Trainer, and enter a Start Date.")
+            return
+
+        try:
+            mem_id = self.member_map[member_name]
+            trainer_id = self.trainer_map[trainer_name]
+            
+            # Validate dates
+            datetime.strptime(start_date_str, '%Y-%m-%d')
+            end_date = None
+            if end_date_str:
+                end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
+            
+        except KeyError:
+            messagebox.showerror("Internal Error", "Could not find ID for selected member or trainer.")
+            return
+        except ValueError:
+            messagebox.showwarning("Input Error", "Dates must be in YYYY-MM-DD format.")
+            return
+
+        def work(conn):
+            repo.create_workout_plan(conn, mem_id, trainer_id, start_date_str, end_date)
+            
+        def done(_):
+            messagebox.showinfo("Success", f"Workout plan created for {member_name}.")
+            self.load_workout_plans() # Refresh the list
+
+        submit_db_job(self.jobs, work, done, error_msg="Failed to create plan")
+
+    def open_manage_exercises_window(self):
+        selected_item = self.plans_tree.focus()
+        if not selected_item:
+            messagebox.showwarning("No Selection", "Please select a workout plan from the list to manage its exercises.")
+            return
+        
+        plan_data = self.plans_tree.item(selected_item)['values']
+        plan_id = plan_data[0]
+        member_name = plan_data[1]
+        window_title = f"Exercises for {member_name} (Plan ID: {plan_id})"
+
+        ManageExercisesWindow(self.root, plan_id, window_title, self.jobs)
+
+    # ==================================================================
+    # TAB 6: OCCUPANCY (reads the rollups from occupancy.py, never raw Attendance)
+    # ==================================================================
+    OCCUPANCY_PERIODS = {'Last 7 days': 7, 'Last 30 days': 30, 'Last 90 days': 90, 'Last 365 days': 365}
+
+    def setup_occupancy_tab(self):
+        controls = ttk.Frame(self.tab_occupancy)
+        controls.pack(fill='x', pady=5)
+        ttk.Label(controls, text="Period:").pack(side='left', padx=5)
+        self.occupancy_period_var = tk.StringVar(value='Last 30 days')
+        period_combo = ttk.Combobox(controls, textvariable=self.occupancy_period_var, values=list(self.OCCUPANCY_PERIODS),
+                                    state='readonly', width=14)
+        period_combo.pack(side='left')
+        period_combo.bind('<<ComboboxSelected>>', lambda _: self.load_occupancy_dashboard())
+        ttk.Button(controls, text="Refresh", command=self.load_occupancy_dashboard).pack(side='left', padx=5)
+        ttk.Button(controls, text="Update Rollups Now",
+                   command=lambda: self.run_maintenance_task('occupancy_rollup', manual=True)).pack(side='left', padx=5)
+        ttk.Label(controls, text=f"Visits count once checked out; rollups update every {OCCUPANCY_ROLLUP_INTERVAL // 60} minutes.").pack(side='right', padx=5)
+
+        chart_frame = ttk.LabelFrame(self.tab_occupancy, text="Average People on the Floor by Hour of Day", padding=10)
+        chart_frame.pack(fill='x', pady=5)
+        self.occupancy_canvas = tk.Canvas(chart_frame, height=220, background='white', highlightthickness=0)
+        self.occupancy_canvas.pack(fill='x')
+        self.occupancy_canvas.bind('<Configure>', lambda _: self.draw_occupancy_chart())
+        self.occupancy_profile = [0.0] * 24
+        self.occupancy_summary_label = ttk.Label(chart_frame, text="")
+        self.occupancy_summary_label.pack(anchor='w', pady=(5, 0))
+
+        daily_frame = ttk.LabelFrame(self.tab_occupancy, text="Per Day", padding=10)
+        daily_frame.pack(fill='both', expand=True, pady=5)
+        self.occupancy_tree = self.create_treeview(daily_frame,
+            columns=('Day', 'Check_ins', 'Hours', 'Busiest', 'Busiest_Avg'),
+            headings={'Day': 'Day', 'Check_ins': 'Check-ins', 'Hours': 'Member Hours', 'Busiest': 'Busiest Hour',
+                      'Busiest_Avg': 'Avg on Floor (Busiest Hour)'}
+        )
+        self.occupancy_view = KeyedListView(self.occupancy_tree, self.format_occupancy_day,
+                                            key=lambda row: row[0].day)
+
+    def load_occupancy_dashboard(self):
+        if self.tab_occupancy not in self.loaded_tabs:
+            return # Loaded on first visit to the tab
+        days = self.OCCUPANCY_PERIODS[self.occupancy_period_var.get()]
+        until = date.today() + timedelta(days=1)
+        since = until - timedelta(days=days)
+
+        def work(conn):
+            return repo.hourly_occupancy(conn, since, until), repo.daily_occupancy(conn, since, until)
+
+        def show(result):
+            hourly, daily = result
+            self.occupancy_profile = hour_of_day_profile(hourly, days)
+            self.draw_occupancy_chart()
+
+            busiest = {} # day -> busiest HourlyOccupancy
+            for hour in hourly:
+                best = busiest.get(hour.hour_start.date())
+                if best is None or hour.occupied_seconds > best.occupied_seconds:
+                    busiest[hour.hour_start.date()] = hour
+            self.occupancy_view.set_rows((day, busiest.get(day.day)) for day in daily)
+
+            peaks = sorted(range(24), key=lambda h: self.occupancy_profile[h], reverse=True)[:3]
+            if daily:
+                self.occupancy_summary_label.config(text=(
+                    f"{sum(d.check_ins for d in daily):,} check-ins over {days} days. Peak hours: " +
+                    ", ".join(f"{h:02d}:00 ({self.occupancy_profile[h]:.1f} on average)" for h in peaks)))
+            else:
+                self.occupancy_summary_label.config(text="No visits rolled up for this period yet.")
+
+        submit_db_job(self.jobs, work, self.timed('Occupancy', show),
+                      error_title="Data Error", error_msg="Failed to load occupancy", key='occupancy')
+
+    def format_occupancy_day(self, row):
+        day, peak = row # DailyOccupancy, busiest HourlyOccupancy of the day (None without visits)
+        return (day.day.strftime('%Y-%m-%d'), day.check_ins, f"{day.occupied_seconds / 3600:.1f}",
+                f"{peak.hour_start:%H:00}" if peak else "-", f"{peak.occupied_seconds / 3600:.1f}" if peak else "-"), ()
+
+    def draw_occupancy_chart(self):
+        """Bar chart of self.occupancy_profile (24 hourly averages) scaled to the canvas."""
+        canvas = self.occupancy_canvas
+        canvas.delete('all')
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        if width < 50:
+            return # Not laid out yet; <Configure> redraws
+        top, bottom, left = 20, height - 20, 10
+        slot = (width - 2 * left) / 24
+        peak = max(self.occupancy_profile) or 1
+        for hour, value in enumerate(self.occupancy_profile):
+            x0 = left + hour * slot + 2
+            bar_top = bottom - (bottom - top) * value / peak
+            canvas.create_rectangle(x0, bar_top, x0 + slot - 4, bottom, fill='#e8743b' if value == peak else '#0078d4', width=0)
+            if value:
+                canvas.create_text(x0 + (slot - 4) / 2, bar_top - 8, text=f"{value:.1f}", font=('Arial', 8))
+            canvas.create_text(x0 + (slot - 4) / 2, bottom + 10, text=f"{hour:02d}", font=('Arial', 8))
+
+    # ==================================================================
+    # TAB 7: ADMIN (Renumbered)
+    # ==================================================================
+    def setup_admin_tab(self):
+        admin_frame = ttk.LabelFrame(self.tab_admin, text="Administrative Tasks", padding=20)
+        admin_frame.pack(pady=50, padx=50)
+
+        ttk.Label(admin_frame, text="Update member statuses based on last payment (31-day check).").pack(pady=10)
+        ttk.Label(admin_frame, text=f"Expired memberships are synced automatically every {STATUS_SYNC_INTERVAL // 60} minutes.").pack()
+
+        ttk.Button(admin_frame, text="Sync Member Statuses Now",
+                   command=lambda: self.run_maintenance_task('status_sync', manual=True),
+                   style='Accent.TButton').pack(pady=10)
+        ttk.Button(admin_frame, text="Full Resync ('UpdateAllMemberStatuses')", 
+                   command=self.run_status_update_procedure).pack(pady=(0, 10))
+                   
+        self.admin_status_label = ttk.Label(admin_frame, text="")
+        self.admin_status_label.pack(pady=5)
+
+        maintenance_frame = ttk.LabelFrame(self.tab_admin, text="Scheduled Maintenance", padding=20)
+        maintenance_frame.pack(padx=50, pady=(0, 10), fill='x')
+
+        ttk.Label(maintenance_frame, text=f"Sessions still open after {AUTO_CHECKOUT_AFTER_HOURS} hours are checked out automatically.").pack()
+        maintenance_buttons = ttk.Frame(maintenance_frame)
+        maintenance_buttons.pack(pady=5)
+        ttk.Button(maintenance_buttons, text="Close Forgotten Sessions Now",
+                   command=lambda: self.run_maintenance_task('auto_checkout', manual=True)).pack(side='left', padx=5)
+        ttk.Button(maintenance_buttons, text="Check Payment Ledger Now",
+                   command=lambda: self.run_maintenance_task('ledger_check', manual=True)).pack(side='left', padx=5)
+        ttk.Button(maintenance_buttons, text="Archive Closed Periods Now",
+                   command=lambda: self.run_maintenance_task('archive', manual=True)).pack(side='left', padx=5)
+        ttk.Button(maintenance_buttons, text="Refresh History", command=self.load_maintenance_history).pack(side='left', padx=5)
+
+        self.maintenance_tree = ttk.Treeview(maintenance_frame, columns=('Task', 'Started', 'Duration', 'Rows', 'Status'),
+                                             show='headings', height=5)
+        for col, text, width in (('Task', 'Task', 140), ('Started', 'Started', 150), ('Duration', 'Duration (ms)', 100),
+                                 ('Rows', 'Rows', 70), ('Status', 'Status', 250)):
+            self.maintenance_tree.heading(col, text=text)
+            self.maintenance_tree.column(col, width=width, anchor='center')
+        self.maintenance_tree.pack(fill='x')
+        self.maintenance_view = KeyedListView(self.maintenance_tree, self.format_maintenance_run)
+
+        export_frame = ttk.LabelFrame(self.tab_admin, text="Data Export", padding=20)
+        export_frame.pack(padx=50, pady=(0, 10), fill='x')
+
+        # Streams the rows straight to a CSV or Parquet file (see export.py); dates as YYYY-MM-DD, both optional
+        export_inputs = ttk.Frame(export_frame)
+        export_inputs.pack()
+        self.export_source_var = tk.StringVar(value='payments')
+        ttk.Combobox(export_inputs, textvariable=self.export_source_var, values=['payments', 'attendance'],
+                     state='readonly', width=12).pack(side='left', padx=5)
+        ttk.Label(export_inputs, text="From:").pack(side='left', padx=(5, 2))
+        self.export_from_entry = ttk.Entry(export_inputs, width=11)
+        self.export_from_entry.pack(side='left')
+        ttk.Label(export_inputs, text="To:").pack(side='left', padx=(5, 2))
+        self.export_to_entry = ttk.Entry(export_inputs, width=11)
+        self.export_to_entry.pack(side='left')
+        self.export_button = ttk.Button(export_inputs, text="Export to File...", command=self.handle_export)
+        self.export_button.pack(side='left', padx=10)
+        self.export_status_label = ttk.Label(export_frame, text="")
+        self.export_status_label.pack(pady=(5, 0))
+
+        pool_frame = ttk.LabelFrame(self.tab_admin, text="Connection Pool", padding=20)
+        pool_frame.pack(padx=50, fill='x')
+
+        self.pool_stats_label = ttk.Label(pool_frame, text="")
+        self.pool_stats_label.pack(pady=5)
+        ttk.Button(pool_frame, text="Refresh Pool Stats", command=self.show_pool_stats).pack(pady=5)
+
+        cache_frame = ttk.LabelFrame(self.tab_admin, text="Reference Data Cache", padding=20)
+        cache_frame.pack(padx=50, pady=(10, 0), fill='x')
+
+        self.cache_stats_label = ttk.Label(cache_frame, text="")
+        self.cache_stats_label.pack(pady=5)
+        ttk.Button(cache_frame, text="Refresh Cache Stats", command=self.show_cache_stats).pack(pady=5)
+
+        timing_frame = ttk.LabelFrame(self.tab_admin, text="Startup Timing", padding=20)
+        timing_frame.pack(padx=50, pady=10, fill='x')
+
+        self.timing_label = ttk.Label(timing_frame, text="", justify='left')
+        self.timing_label.pack(anchor='w')
+
+        query_frame = ttk.LabelFrame(self.tab_admin, text="Query Statistics", padding=20)
+        query_frame.pack(padx=50, pady=(0, 10), fill='both', expand=True)
+
+        query_buttons = ttk.Frame(query_frame)
+        query_buttons.pack(fill='x', pady=(0, 5))
+        ttk.Label(query_buttons, text=f"Top {QUERY_STATS_TOP_N} by:").pack(side='left')
+        self.query_sort_var = tk.StringVar(value='Slowest (p95)')
+        sort_combo = ttk.Combobox(query_buttons, textvariable=self.query_sort_var, state='readonly', width=16,
+                                  values=list(self.QUERY_SORTS))
+        sort_combo.pack(side='left', padx=5)
+        sort_combo.bind('<<ComboboxSelected>>', lambda _: self.show_query_stats())
+        ttk.Button(query_buttons, text="Refresh", command=self.show_query_stats).pack(side='left', padx=5)
+        ttk.Button(query_buttons, text="Reset", command=self.reset_query_stats).pack(side='left', padx=5)
+        ttk.Button(query_buttons, text="Dump to File...", command=self.dump_query_stats).pack(side='left', padx=5)
+        self.query_stats_label = ttk.Label(query_buttons, text="")
+        self.query_stats_label.pack(side='right')
+
+        columns = ('Label', 'Statement', 'Calls', 'Total', 'Mean', 'p95', 'Max', 'Rows', 'Errors')
+        self.query_tree = ttk.Treeview(query_frame, columns=columns, show='headings', height=8)
+        for col, text, width, anchor in (('Label', 'Call Site', 180, 'w'), ('Statement', 'Statement', 360, 'w'),
+                                         ('Calls', 'Calls', 60, 'e'), ('Total', 'Total (ms)', 80, 'e'),
+                                         ('Mean', 'Mean (ms)', 80, 'e'), ('p95', 'p95 (ms)', 70, 'e'),
+                                         ('Max', 'Max (ms)', 70, 'e'), ('Rows', 'Rows', 70, 'e'), ('Errors', 'Errors', 55, 'e')):
+            self.query_tree.heading(col, text=text)
+            self.query_tree.column(col, width=width, anchor=anchor)
+        self.query_tree.pack(fill='both', expand=True)
+        self.query_view = KeyedListView(self.query_tree, lambda entry: ((
+            entry['label'], entry['statement'], entry['calls'], f"{entry['total_ms']:.1f}", f"{entry['mean_ms']:.2f}",
+            f"{entry['p95_ms']:.1f}", f"{entry['max_ms']:.1f}", entry['rows'], entry['errors']), ()),
+            key=lambda entry: (entry['label'], entry['statement']))
+
+    def handle_export(self):
+        source = self.export_source_var.get()
+        try:
+            date_from, date_to = (datetime.strptime(entry.get().strip(), '%Y-%m-%d').date() if entry.get().strip() else None
+                                  for entry in (self.export_from_entry, self.export_to_entry))
+        except ValueError:
+            messagebox.showwarning("Input Error", "Dates must be in YYYY-MM-DD format (or left empty).")
+            return
+        path = filedialog.asksaveasfilename(title=f"Export {source.capitalize()}", defaultextension=".csv",
+                                            initialfile=f"{source}.csv",
+                                            filetypes=[("CSV files", "*.csv"), ("Parquet files", "*.parquet")])
+        if not path:
+            return
+
+        progress = {'rows': 0} # Written by the worker, read by the poll below
+        exporting = True
+
+        def work(conn):
+            try:
+                return export_table(conn, source, path, format_for(path), date_from, date_to,
+                                    progress=lambda rows: progress.update(rows=rows))
+            except mysql.connector.Error:
+                raise # Reported by failed() below
+            except Exception as err:
+                return err # Unwritable file, pyarrow missing or a value it cannot convert
+
+        def poll():
+            if exporting:
+                self.export_status_label.config(text=f"Exporting {source}: {progress['rows']:,} rows written...")
+                self.root.after(500, poll)
+
+        def finish(text):
+            nonlocal exporting
+            exporting = False
+            self.export_button.config(state='normal')
+            self.export_status_label.config(text=text)
+
+        def done(result):
+            if isinstance(result, Exception):
+                finish("")
+                messagebox.showerror("Export Error", f"Could not export to {path}:\n{result}")
+                return
+            finish(result.summary())
+
+        def failed(err):
+            finish("")
+            messagebox.showerror("Export Error", f"Export stopped:\n{err}\n\nNothing was written to {path}.")
+
+        self.export_button.config(state='disabled')
+        poll()
+        submit_db_job(self.jobs, work, done, on_error=failed)
+
+    def show_pool_stats(self):
+        stats = db_pool.stats()
+        self.pool_stats_label.config(text=(
+            f"Open: {stats['open']}/{db_pool.size}   Idle: {stats['idle']}   Checkouts: {stats['checkouts']}   "
+            f"Hits: {stats['hits']}   Waits: {stats['waits']}   Reconnects: {stats['reconnects']}"
+        ))
+
+    def show_cache_stats(self):
+        stats = ref_cache.stats()
+        versions = ", ".join(f"{name} v{version}" for name, version in sorted(stats['versions'].items()))
+        self.cache_stats_label.config(text=(
+            f"Hits: {stats['hits']}   Misses: {stats['misses']}   Revalidations: {stats['revalidations']}   "
+            f"Invalidations: {stats['invalidations']}   ({versions})"
+        ))
+
+    # Query Statistics sort choices -> QueryStats.top() key
+    QUERY_SORTS = {'Slowest (p95)': 'p95_ms', 'Total time': 'total_ms', 'Most frequent': 'calls'}
+
+    def show_query_stats(self):
+        self.query_view.set_rows(query_stats.top(QUERY_STATS_TOP_N, by=self.QUERY_SORTS[self.query_sort_var.get()]))
+        self.query_stats_label.config(text=f"Since {query_stats.since:%Y-%m-%d %H:%M:%S}")
+
+    def reset_query_stats(self):
+        query_stats.reset()
+        self.show_query_stats()
+
+    def dump_query_stats(self):
+        path = filedialog.asksaveasfilename(title="Dump Query Statistics", defaultextension=".json",
+                                            initialfile=f"query_stats_{datetime.now():%Y%m%d_%H%M%S}.json",
+                                            filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            query_stats.dump(path)
+        except OSError as err:
+            messagebox.showerror("Dump Failed", f"Could not write {path}:\n{err}")
+            return
+        messagebox.showinfo("Query Statistics", f"Statistics for {len(query_stats.summaries())} statements written to {path}.")
+
+    def update_timing_report(self):
+        lines = []
+        if 'UI built' in self.load_timings and 'Check-in list' in self.load_timings:
+            ttfi = max(self.load_timings['UI built'][1], self.load_timings['Check-in list'][1])
+            lines.append(f"Time to first interactive: {ttfi * 1000:.0f} ms")
+        for name, (took, since_start) in self.load_timings.items():
+            took_str = f"{took * 1000:.0f} ms" if took is not None else "-"
+            lines.append(f"{name}: {took_str} (done {since_start * 1000:.0f} ms after launch)")
+        self.timing_label.config(text="\n".join(lines))
+
+    def maintenance_tick(self):
+        """Runs whichever maintenance tasks are due on the job executor, then reschedules itself."""
+        for task in self.maintenance.due():
+            self.run_maintenance_task(task.name)
+        self.root.after(MAINTENANCE_TICK_MS, self.maintenance_tick)
+
+    def run_maintenance_task(self, name, manual=False):
+        """
+        Runs one maintenance task; every run is recorded in Maintenance_Run.
+        Scheduled runs report in the Admin tab only; manual runs also show a dialog.
+        """
+        task = next(task for task in self.maintenance.tasks if task.name == name)
+
+        def done(record):
+            (_, started_at, _, duration_ms, rows, status, message) = record
+            if status == 'OK':
+                text = f"{task.label} at {started_at:%H:%M}: {rows} row(s) changed ({duration_ms} ms)."
+                self.admin_status_label.config(text=text, style='Success.TLabel')
+            else:
+                text = f"{task.label} failed at {started_at:%H:%M}: {message}"
+                self.admin_status_label.config(text=text, style='Error.TLabel')
+            self.load_maintenance_history()
+            if name == 'occupancy_rollup' and rows:
+                self.load_occupancy_dashboard()
+            if name == 'ledger_check' and rows:
+                self.load_members_data() # Repaired totals
+            if name == 'archive' and rows:
+                self.load_attendance_data() # Archived rows leave the lists
+                self.load_payments_data()
+            if manual:
+                (messagebox.showinfo if status == 'OK' else messagebox.showerror)("Maintenance", text)
+
+        def failed(err):
+            self.admin_status_label.config(text=f"{task.label} failed: {err}", style='Error.TLabel')
+            if manual:
+                messagebox.showerror("Maintenance Error", f"Failed to run {task.label}:\n{err}")
+
+        if manual:
+            self.admin_status_label.config(text=f"Running {task.label}...", style='Success.TLabel')
+        submit_db_job(self.jobs, lambda conn: run_task(conn, task), done, on_error=failed, key=('maintenance', name))
+
+    def format_maintenance_run(self, row):
+        (_, task, started_at, duration_ms, rows_affected, status, message) = row
+        status_text = f"{status}: {message}" if message else status
+        return (task, started_at.strftime('%Y-%m-%d %H:%M:%S'), duration_ms, rows_affected, status_text), ()
+
+    def load_maintenance_history(self):
+        if self.tab_admin not in self.loaded_tabs:
+            return # Loaded on first visit to the tab
+
+        submit_db_job(self.jobs, recent_runs, self.maintenance_view.set_rows,
+                      error_title="Data Error", error_msg="Failed to load maintenance history", key='maintenance_history')
+
+    def run_status_update_procedure(self):
+        if not messagebox.askyesno("Confirm", "Are you sure you want to update all member statuses? This will run the 'UpdateAllMemberStatuses' procedure."):
+            return
+
+        def done(_):
+            self.admin_status_label.config(text="All member statuses updated successfully.", style='Success.TLabel')
+            messagebox.showinfo("Success", "Procedure 'UpdateAllMemberStatuses' executed successfully.")
+            
+            # Refresh members to show changes
+            self.load_members_data()
+
+        def failed(err):
+            messagebox.showerror("Procedure Error", f"Failed to run procedure:\n{err}")
+            self.admin_status_label.config(text="An error occurred.", style='Error.TLabel')
+
+        self.admin_status_label.config(text="Executing procedure...", style='Success.TLabel')
+        submit_db_job(self.jobs, repo.resync_all_member_statuses, done, on_error=failed, key='status_update')
+
+    # ==================================================================
+    # HELPER/UTILITY FUNCTIONS
+    # ==================================================================
+    def create_treeview(self, parent, columns, headings):
+        """Helper function to create a styled Treeview with scrollbar."""
+        tree_frame = ttk.Frame(parent)
+        tree_frame.pack(fill='both', expand=True, pady=5)
+        
+        scrollbar = ttk.Scrollbar(tree_frame)
+        scrollbar.pack(side='right', fill='y')
+        
+        tree = ttk.Treeview(
+            tree_frame, 
+            columns=columns, 
+            show='headings', 
+            yscrollcommand=scrollbar.set
+        )
+        tree.pack(fill='both', expand=True)
+        scrollbar.config(command=tree.yview)
+        tree.scrollbar = scrollbar # Lets PagedTable hook the scroll position
+        
+        for col_id, text in headings.items():
+            tree.heading(col_id, text=text, anchor='w')
+            tree.column(col_id, anchor='w', width=100) # Default width
+            
+        return tree
+
+    def run_table_job(self, name, error_msg):
+        """Returns the run_job callback a PagedTable uses to fetch pages in the background."""
+        def run(work, on_success, on_failure):
+            def failed(err):
+                on_failure()
+                messagebox.showerror("Data Error", f"{error_msg}:\n{err}")
+            # Keyed, so a burst of searches runs at most one query behind the one in flight
+            submit_db_job(self.jobs, work, self.timed(name, on_success), on_error=failed,
+                          key=('table', name), label=f"{name} list")
+        return run
+
+    def run_background_table_job(self, name):
+        """The run_job callback for a PagedTable's change feed lookups: quiet, never coalesced, errors left to the next poll."""
+        def run(work, on_success, on_failure):
+            submit_db_job(self.jobs, work, on_success, on_error=lambda err: on_failure(), label=f"{name} list", quiet=True)
+        return run
+
+    def debounce(self, name, callback, delay_ms=SEARCH_DEBOUNCE_MS):
+        """Runs callback once no further debounce(name, ...) call has come for delay_ms."""
+        pending = self.debounce_timers.pop(name, None)
+        if pending is not None:
+            self.root.after_cancel(pending)
+
+        def fire():
+            del self.debounce_timers[name]
+            callback()
+        self.debounce_timers[name] = self.root.after(delay_ms, fire)
+
+# ==================================================================
+# NEW Toplevel Window Class for Managing Exercises
+# ==================================================================
+class ManageExercisesWindow:
+    def __init__(self, parent, plan_id, title, jobs):
+        self.window = tk.Toplevel(parent)
+        self.window.title(title)
+        self.window.geometry("600x500")
+        
+        self.plan_id = plan_id
+        self.exercise_map = {} # {name: id}, read from the shared reference cache
+        self.jobs = jobs
+
+        self.setup_ui()
+        self.load_exercise_choices()
+        self.load_plan_exercises()
+
+    def load_exercise_choices(self):
+        def show(exercises):
+            if not self.window.winfo_exists():
+                return
+            self.exercise_map = exercises
+            self.exercise_combo['values'] = sorted(self.exercise_map.keys())
+
+        exercises = ref_cache.peek('exercises')
+        if exercises is not None:
+            show(exercises)
+        else:
+            submit_db_job(self.jobs, lambda conn: ref_cache.get('exercises', conn), show,
+                          error_title="Data Error", error_msg="Failed to load exercises list", parent=self.window)
+
+    def setup_ui(self):
+        # --- Top Frame: Add Exercise ---
+        add_frame = ttk.LabelFrame(self.window, text="Add Exercise to Plan", padding=10)
+        add_frame.pack(fill='x', padx=10, pady=10)
+
+        ttk.Label(add_frame, text="Exercise:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
+        self.exercise_combo = ttk.Combobox(add_frame, state='readonly', width=30)
+        self.exercise_combo.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
+
+        ttk.Label(add_frame, text="Reps/Sets Info:").grid(row=1, column=0, padx=5, pady=5, sticky='w')
+        self.reps_entry = ttk.Entry(add_frame, width=30)
+        self.reps_entry.grid(row=1, column=1, padx=5, pady=5, sticky='ew')
+        
+        ttk.Button(add_frame, text="Add Exercise", command=self.add_exercise_to_plan, style='Accent.TButton').grid(row=0, column=2, rowspan=2, padx=10, sticky='ns')
+        add_frame.grid_columnconfigure(1, weight=1)
+
+        # --- Bottom Frame: Current Exercises ---
+        current_frame = ttk.LabelFrame(self.window, text="Current Exercises in Plan", padding=10)
+        current_frame.pack(fill='both', expand=True, padx=10, pady=10)
+
+        # Note: We include Exercise_ID in columns but hide it, to retrieve it for deletion
+        self.plan_exercises_tree = self.create_treeview(
+            current_frame,
+            columns=('Name', 'Reps', 'Exercise_ID'),
+            headings={'Name': 'Exercise', 'Reps': 'Reps/Sets Info', 'Exercise_ID': 'ID'}
+        )
+        self.plan_exercises_tree['displaycolumns'] = ('Name', 'Reps')
+        self.plan_exercises_view = KeyedListView(self.plan_exercises_tree, lambda exercise: (exercise, ()),
+                                                 key=lambda exercise: exercise.exercise_id)
+
+        ttk.Button(current_frame, text="Remove Selected Exercise", command=self.remove_exercise_from_plan).pack(pady=5)
+
+    def load_plan_exercises(self):
+        submit_db_job(self.jobs, lambda conn: repo.plan_exercises(conn, self.plan_id), self.plan_exercises_view.set_rows,
+                      error_title="Data Error", error_msg="Failed to load plan exercises", parent=self.window,
+                      key=('plan_exercises', self.plan_id))
+
+    def add_exercise_to_plan(self):
+        exercise_name = self.exercise_combo.get()
+        reps_info = self.reps_entry.get()
+
+        if not exercise_name or not reps_info:
+            messagebox.showwarning("Input Error", "Please select an exercise and enter reps/sets info.", parent=self.window)
+            return
+
+        try:
+            exercise_id = self.exercise_map[exercise_name]
+        except KeyError:
+            messagebox.showerror("Internal Error", "Could not find selected exercise ID.", parent=self.window)
+            return
+
+        def work(conn):
+            repo.add_plan_exercise(conn, self.plan_id, exercise_id, reps_info)
+        
+        def done(_):
+            # Refresh list and clear entries
+            self.load_plan_exercises()
+            self.reps_entry.delete(0, 'end')
+            self.exercise_combo.set('')
+
+        def failed(err):
+            if err.errno == 1062: # Duplicate entry
+                messagebox.showerror("Database Error", "This exercise is already in the plan.", parent=self.window)
+            else:
+                messagebox.showerror("Database Error", f"Failed to add exercise:\n{err}", parent=self.window)
+
+        submit_db_job(self.jobs, work, done, on_error=failed)
+
+    def remove_exercise_from_plan(self):
+        selected_item = self.plan_exercises_tree.focus()
+        if not selected_item:
+            messagebox.showwarning("No Selection", "Please select an exercise from the list to remove.", parent=self.window)
+            return
+
+        item_data = self.plan_exercises_tree.item(selected_item)['values']
+        exercise_name = item_data[0]
+        exercise_id = item_data[2] # Get the hidden Exercise_ID
+
+        if not messagebox.askyesno("Confirm Deletion", f"Are you sure you want to remove '{exercise_name}' from this plan?", parent=self.window):
+            return
+
+        submit_db_job(self.jobs, lambda conn: repo.remove_plan_exercise(conn, self.plan_id, exercise_id),
+                      lambda _: self.load_plan_exercises(), # Refresh list
+                      error_msg="Failed to remove exercise", parent=self.window)
+
+    # --- Helper methods copied from GymApp ---
+    def create_treeview(self, parent, columns, headings):
+        tree_frame = ttk.Frame(parent)
+        tree_frame.pack(fill='both', expand=True, pady=5)
+        scrollbar = ttk.Scrollbar(tree_frame)
+        scrollbar.pack(side='right', fill='y')
+        tree = ttk.Treeview(tree_frame, columns=columns, show='headings', yscrollcommand=scrollbar.set)
+        tree.pack(fill='both', expand=True)
+        scrollbar.config(command=tree.yview)
+        for col_id, text in headings.items():
+            tree.heading(col_id, text=text, anchor='w')
+            tree.column(col_id, anchor='w', width=100)
+        return tree
+
+
+if __name__ == '__main__':
+    root = tk.Tk()
+    app = GymApp(root)
+
+    root.mainloop()
+    app.jobs.shutdown()
+    db_pool.close_all()
@@ -0,0 +1,131 @@
+"""
+Archival of closed periods: payments and finished visits older than
+ARCHIVE_AFTER_MONTHS whole months are moved from Payment and Attendance to
+Payment_Archive and Attendance_Archive, so the tables the door check, the lists
+and the Payment triggers work on only hold recent history.
+
+Rows keep their IDs. Member history (the details window, the ledger check,
+RecomputeMemberLedger, the occupancy rollups, exports) reads both tables, via
+the Payment_History / Attendance_History views or an explicit UNION ALL; the
+Payments and Attendance lists show the recent rows only. The members' ledger
+summaries do not change when their payments are archived: AfterPaymentDelete
+skips the recompute while @archiving is set.
+
+Each batch is moved in its own transaction (copy, then delete, by primary key).
+Runs as a daily maintenance task (see maintenance.py); `python archive.py`
+archives everything due in one go.
+"""
+import argparse
+import sys
+import time
+from datetime import date
+
+import mysql.connector
+
+ARCHIVE_AFTER_MONTHS = 12
+# Each batch is its own transaction, so check-ins and payments never wait long on row locks
+ARCHIVE_BATCH_SIZE = 2000
+ARCHIVE_MAX_BATCHES = 50 # per table per run; anything left is picked up by the next run
+
+# Oldest payments first, straight off idx_payment_date
+DUE_PAYMENTS_QUERY = """
+    SELECT Payment_ID FROM Payment
+    WHERE Payment_date < %s
+    ORDER BY Payment_date, Payment_ID
+    LIMIT %s
+    FOR UPDATE
+"""
+
+ARCHIVE_PAYMENTS = """
+    INSERT INTO Payment_Archive (Payment_ID, Mem_ID, amount, Payment_date, Payment_status)
+    SELECT Payment_ID, Mem_ID, amount, Payment_date, Payment_status FROM Payment
+    WHERE Payment_ID IN ({ids})
+"""
+
+# Visits that ended before the cutoff, oldest first, straight off idx_attendance_open.
+# Ones the occupancy rollup is still waiting on stay until it has counted them.
+DUE_ATTENDANCE_QUERY = """
+    SELECT Attendance_ID FROM Attendance
+    WHERE check_out < %s
+      AND NOT EXISTS (SELECT 1 FROM Rollup_Open_Session r WHERE r.Attendance_ID = Attendance.Attendance_ID)
+    ORDER BY check_out, Attendance_ID
+    LIMIT %s
+    FOR UPDATE
+"""
+
+ARCHIVE_ATTENDANCE = """
+    INSERT INTO Attendance_Archive (Attendance_ID, Mem_ID, check_in, check_out)
+    SELECT Attendance_ID, Mem_ID, check_in, check_out FROM Attendance
+    WHERE Attendance_ID IN ({ids})
+"""
+
+
+def archive_cutoff(today=None, months=ARCHIVE_AFTER_MONTHS):
+    """The first day of the month `months` months before today's; everything before it is archived."""
+    today = today or date.today()
+    month_index = today.year * 12 + today.month - 1 - months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def archive_closed_periods(conn, months=ARCHIVE_AFTER_MONTHS, batch_size=ARCHIVE_BATCH_SIZE,
+                           max_batches=ARCHIVE_MAX_BATCHES):
+    """Moves payments and finished visits from before archive_cutoff() to the archive tables; returns how many rows moved."""
+    cutoff = archive_cutoff(months=months)
+    cursor = conn.cursor()
+    cursor.execute("SET @archiving = 1")
+    try:
+        moved = _archive(conn, cursor, DUE_PAYMENTS_QUERY, ARCHIVE_PAYMENTS, 'Payment', 'Payment_ID',
+                         cutoff, batch_size, max_batches)
+        moved += _archive(conn, cursor, DUE_ATTENDANCE_QUERY, ARCHIVE_ATTENDANCE, 'Attendance', 'Attendance_ID',
+                          cutoff, batch_size, max_batches)
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        # Pooled connections are reused: never leave the ledger recompute switched off.
+        # If this fails the connection is broken and its session goes with it.
+        try:
+            cursor.execute("SET @archiving = NULL")
+        except mysql.connector.Error:
+            pass
+        cursor.close()
+    return moved
+
+
+def _archive(conn, cursor, due_query, archive_query, table, key, cutoff, batch_size, max_batches):
+    moved = 0
+    for _ in range(max_batches):
+        cursor.execute(due_query, (cutoff, batch_size))
+        ids = [row_id for (row_id,) in cursor.fetchall()]
+        if ids:
+            placeholders = ', '.join(['%s'] * len(ids))
+            cursor.execute(archive_query.format(ids=placeholders), ids)
+            cursor.execute(f"DELETE FROM {table} WHERE {key} IN ({placeholders})", ids)
+        conn.commit()
+        moved += len(ids)
+        if len(ids) < batch_size:
+            break
+    return moved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move closed periods of payments and attendance to the archive tables.")
+    parser.add_argument('--months', type=int, default=ARCHIVE_AFTER_MONTHS,
+                        help="Keep this many whole months before the current one (default %(default)s)")
+    parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    from db import open_connection
+
+    conn = open_connection()
+    started = time.perf_counter()
+    try:
+        total = archive_closed_periods(conn, months=args.months, batch_size=args.batch_size, max_batches=sys.maxsize)
+    finally:
+        conn.close()
+    print(f"Archived {total} rows from before {archive_cutoff(months=args.months)} in {time.perf_counter() - started:.1f}s.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Load generator for checkin_service.py: an opening-time burst of barcode scans.
+
+Seeds throwaway members with a current payment, then fires scans at a fixed
+rate (check-in, and check-out for members already inside) against a running
+service and reports p50/p99 latency. Latency is measured from when each scan
+was due, so a backed-up service shows up as queueing time rather than being
+hidden by the generator slowing down. Members are removed again afterwards.
+Start the service first, then run from the repository root:
+
+    python checkin_service.py &
+    python benchmarks/checkin_load.py [--rate 50] [--seconds 30]
+"""
+import argparse
+import http.client
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+
+from checkin_service import percentile
+from config import DB_CONFIG
+
+MEMBER_PREFIX = 'BENCH_SCAN_'
+P99_TARGET_MS = 100
+
+
+def seed_members(count):
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM Member WHERE Mem_ID LIKE %s", (MEMBER_PREFIX + '%',))
+    mem_ids = [f"{MEMBER_PREFIX}{i}" for i in range(count)]
+    cursor.executemany("INSERT INTO Member (Mem_ID, Name, Join_date) VALUES (%s, %s, %s)",
+                       [(mem_id, f"Scan Member {i}", date.today()) for i, mem_id in enumerate(mem_ids)])
+    # A current payment lets PreventInactiveMemberCheckin through
+    cursor.executemany("INSERT INTO Payment (Mem_ID, amount, Payment_date) VALUES (%s, %s, %s)",
+                       [(mem_id, 1500.00, date.today()) for mem_id in mem_ids])
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return mem_ids
+
+
+def remove_members():
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM Member WHERE Mem_ID LIKE %s", (MEMBER_PREFIX + '%',))
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def worker(host, port, scans, results):
+    """Sends queued scans over one keep-alive connection, like a single kiosk."""
+    client = http.client.HTTPConnection(host, port, timeout=10)
+    while True:
+        item = scans.get()
+        if item is None:
+            break
+        due, path = item
+        try:
+            client.request('POST', path)
+            response = client.getresponse()
+            body = json.loads(response.read() or b'{}')
+            status = response.status
+        except (OSError, http.client.HTTPException, ValueError):
+            client.close()
+            client = http.client.HTTPConnection(host, port, timeout=10)
+            status, body = 0, {}
+        results.append((path.split('/')[1], status, (time.perf_counter() - due) * 1000, body.get('error')))
+    client.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Burst-load the check-in service.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--rate', type=float, default=50, help="Scans per second")
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--kiosks', type=int, default=16, help="Concurrent client connections")
+    parser.add_argument('--members', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    mem_ids = seed_members(args.members)
+    scans, results = queue.Queue(), []
+    workers = [threading.Thread(target=worker, args=(args.host, args.port, scans, results)) for _ in range(args.kiosks)]
+    for thread in workers:
+        thread.start()
+
+    try:
+        inside = set()
+        total = int(args.rate * args.seconds)
+        started = time.perf_counter()
+        for n in range(total):
+            due = started + n / args.rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            mem_id = mem_ids[n % len(mem_ids)]
+            action = 'checkout' if mem_id in inside else 'checkin'
+            (inside.discard if action == 'checkout' else inside.add)(mem_id)
+            scans.put((due, f"/{action}/{mem_id}"))
+    finally:
+        for _ in workers:
+            scans.put(None)
+        for thread in workers:
+            thread.join()
+        remove_members()
+
+    print(f"{len(results)} scans at {args.rate:g}/s over {args.seconds:g}s with {args.kiosks} kiosks")
+    print(f"{'action':<10} {'ok':>6} {'refused':>8} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    worst_p99 = 0.0
+    for action in ('checkin', 'checkout'):
+        rows = [r for r in results if r[0] == action]
+        latencies = sorted(r[2] for r in rows)
+        ok = sum(1 for r in rows if r[1] == 200)
+        refused = sum(1 for r in rows if r[1] in (403, 404))
+        p99 = percentile(latencies, 0.99)
+        worst_p99 = max(worst_p99, p99)
+        print(f"{action:<10} {ok:>6} {refused:>8} {len(rows) - ok - refused:>7} "
+              f"{percentile(latencies, 0.50):>8.1f} {p99:>8.1f} {latencies[-1] if latencies else 0:>8.1f}")
+    print(f"p99 target {P99_TARGET_MS} ms: {'met' if worst_p99 <= P99_TARGET_MS else 'MISSED'}")
+    return 0 if worst_p99 <= P99_TARGET_MS else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+EXPLAIN check for the hot queries: fails (exit status 1) if any of them falls
+back to a full table scan instead of using an index.
+
+Plans depend on table statistics, and on a handful of sample rows MySQL may
+decide a scan is cheaper anyway, so run this against a realistically sized
+database. Run from the repository root:
+
+    python benchmarks/explain_hot_queries.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+
+from checkin import OPEN_CHECKIN_QUERY
+from config import DB_CONFIG
+from repository import CURRENTLY_IN_QUERY, MEMBER_ATTENDANCE_QUERY, member_search_filter
+
+# The lookup PreventInactiveMemberCheckin runs on every check-in
+VALID_UNTIL_QUERY = "SELECT Valid_until FROM Member WHERE Mem_ID = %s"
+# Latest payment per member, used by AfterPaymentDelete and the bulk import's member sync
+LAST_PAYMENT_QUERY = "SELECT MAX(Payment_date) FROM Payment WHERE Mem_ID = %s"
+# Members tab search (an index merge over the three prefix lookups)
+MEMBER_SEARCH_QUERY = "SELECT Mem_ID, Name FROM Member WHERE " + member_search_filter('x')[0]
+
+# (name, query, table alias as EXPLAIN reports it, expected index)
+HOT_QUERIES = (
+    ('check-in expiry check', VALID_UNTIL_QUERY, 'Member', 'PRIMARY'),
+    ('last payment lookup', LAST_PAYMENT_QUERY, 'Payment', 'idx_payment_member_date'),
+    ('check-out lookup', OPEN_CHECKIN_QUERY, 'Attendance', 'idx_attendance_member_open'),
+    ('currently-in list', CURRENTLY_IN_QUERY, 'a', 'idx_attendance_open'),
+    ('member attendance history', MEMBER_ATTENDANCE_QUERY, 'Attendance', None),
+    ('member archived visits', MEMBER_ATTENDANCE_QUERY, 'Attendance_Archive', 'idx_attendance_archive_member'),
+    ('member search', MEMBER_SEARCH_QUERY, 'Member', None),
+)
+
+
+def explain(conn, query, params):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("EXPLAIN " + query.strip(), params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def check_plan(plan, table, expected_index):
+    """Returns None if the plan reads `table` through an index, else the reason it does not."""
+    rows = [row for row in plan if row['table'] == table]
+    if not rows:
+        # MIN/MAX answered straight from the index
+        if any('optimized away' in (row['Extra'] or '') for row in plan):
+            return None
+        return f"no plan row for table {table}"
+    for row in rows:
+        if row['type'] == 'ALL' or row['key'] is None:
+            return f"full scan of {table} (type={row['type']}, possible_keys={row['possible_keys']})"
+        if expected_index and row['key'] != expected_index:
+            return f"uses {row['key']} instead of {expected_index}"
+    return None
+
+
+def main():
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT Mem_ID FROM Member LIMIT 1")
+        row = cursor.fetchone()
+        cursor.close()
+        sample_mem_id = row[0] if row else 'M001'
+
+        failures = 0
+        for name, query, table, expected_index in HOT_QUERIES:
+            params = (sample_mem_id,) * query.count('%s')
+            problem = check_plan(explain(conn, query, params), table, expected_index)
+            print(f"{'FAIL' if problem else 'ok':>4}  {name}" + (f": {problem}" if problem else ""))
+            failures += bool(problem)
+    finally:
+        conn.close()
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
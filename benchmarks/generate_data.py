@@ -0,0 +1,234 @@
+"""
+Seeded generator for realistic data volumes, to exercise the list loaders,
+triggers and status procedures at scale (see load_benchmark.py).
+
+Members join over the last few years and pay monthly for an unbroken streak of
+months, which for most members runs up to today (so they are active). Visits
+fall on paid days, a few members are checked in right now, and about a third
+have a workout plan with a handful of exercises. The same --seed always
+produces the same data.
+
+Generated rows are prefixed (Mem_ID "GEN...", trainers and exercises "GEN ...")
+and any previous generated data is removed first, so it can be re-run, and
+--clear removes it again. Meant for a benchmark database, not the live one.
+Run from the repository root:
+
+    python benchmarks/generate_data.py [--members 100000] [--payments 2000000] [--attendance 5000000]
+    python benchmarks/generate_data.py --sqlite bench.db --members 10000 --payments 200000 --attendance 500000
+    python benchmarks/generate_data.py --clear
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import repository as repo
+import sqlite_backend
+from db import open_connection
+
+PREFIX = 'GEN'
+HISTORY_DAYS = 5 * 365
+PAYMENT_DAYS = 30 # One payment per month of membership
+ACTIVE_SHARE = 0.6 # Members whose streak of payments runs up to today
+CHECKED_IN_SHARE = 0.02 # Of the active members, checked in right now
+PLAN_SHARE = 0.3
+TRAINERS = 40
+EXERCISES = 60
+BATCH_SIZE = 10000
+DELETE_BATCH = 1000
+FAR_FUTURE = date(9999, 12, 31)
+
+FIRST_NAMES = ('Aarav', 'Vivaan', 'Aditya', 'Arjun', 'Sai', 'Reyansh', 'Krishna', 'Ishaan', 'Rohan', 'Kabir',
+               'Ananya', 'Diya', 'Aadhya', 'Saanvi', 'Pari', 'Anika', 'Navya', 'Myra', 'Sara', 'Priya',
+               'Vikram', 'Deepak', 'Fatima', 'Aisha', 'Sneha', 'Rahul', 'Neha', 'Imran', 'Meera', 'Karan')
+LAST_NAMES = ('Sharma', 'Verma', 'Gupta', 'Singh', 'Kumar', 'Patel', 'Khan', 'Rathore', 'Sheikh', 'Reddy',
+              'Iyer', 'Nair', 'Das', 'Bose', 'Mehta', 'Joshi', 'Chopra', 'Malhotra', 'Kapoor', 'Rao')
+REPS = ('3 sets of 10 reps', '4 sets of 8 reps', '5 sets of 5 reps', '3 sets of 12 reps', '30 minutes', '3 sets of 60s')
+
+INSERT_MEMBER = "INSERT INTO Member (Mem_ID, Name, Phone_no, Join_date, Age, Valid_until) VALUES (%s, %s, %s, %s, %s, %s)"
+INSERT_PAYMENT = "INSERT INTO Payment (Mem_ID, amount, Payment_date) VALUES (%s, %s, %s)"
+INSERT_ATTENDANCE = "INSERT INTO Attendance (Mem_ID, check_in, check_out) VALUES (%s, %s, %s)"
+
+# Ledger summary and Valid_until from each generated member's payments (they are
+# loaded with the per-row trigger deferred), served by idx_payment_member_date
+BACKFILL_MEMBERS = """
+    UPDATE Member
+    SET Total_paid = (SELECT COALESCE(ROUND(SUM(p.amount), 2), 0) FROM Payment p WHERE p.Mem_ID = Member.Mem_ID),
+        Payment_count = (SELECT COUNT(*) FROM Payment p WHERE p.Mem_ID = Member.Mem_ID),
+        First_payment = (SELECT MIN(p.Payment_date) FROM Payment p WHERE p.Mem_ID = Member.Mem_ID),
+        Last_payment = (SELECT MAX(p.Payment_date) FROM Payment p WHERE p.Mem_ID = Member.Mem_ID),
+        Valid_until = (SELECT MembershipValidUntil(MAX(p.Payment_date)) FROM Payment p WHERE p.Mem_ID = Member.Mem_ID)
+    WHERE Mem_ID LIKE %s
+"""
+
+
+class MemberPlan:
+    """What gets generated for one member: join date and the months they paid for."""
+
+    def __init__(self, index, rng, today, mean_months, visits_per_month):
+        self.mem_id = f"{PREFIX}{index:07d}"
+        self.join_date = today - timedelta(days=rng.randrange(HISTORY_DAYS))
+        tenure = (today - self.join_date).days // PAYMENT_DAYS + 1
+        self.months = max(1, min(tenure, int(rng.gauss(mean_months, mean_months / 2))))
+        if rng.random() < ACTIVE_SHARE:
+            first_month = tenure - self.months # Paid up to now
+        else:
+            first_month = rng.randrange(tenure - self.months + 1)
+        self.first_payment = self.join_date + timedelta(days=first_month * PAYMENT_DAYS)
+        self.paid_until = min(today, self.first_payment + timedelta(days=self.months * PAYMENT_DAYS - 1))
+        self.visits = max(0, int(rng.gauss(self.months * visits_per_month, self.months)))
+        self.active = self.first_payment + timedelta(days=(self.months - 1) * PAYMENT_DAYS) + timedelta(days=31) >= today
+
+
+def member_plans(args, today):
+    rng = random.Random(args.seed)
+    mean_months = args.payments / args.members
+    visits_per_month = args.attendance / args.payments
+    return [MemberPlan(i, rng, today, mean_months, visits_per_month) for i in range(args.members)]
+
+
+def generate(conn, args, progress):
+    today = date.today()
+    now = datetime.now().replace(microsecond=0)
+    rng = random.Random(args.seed + 1)
+    plans = member_plans(args, today)
+    cursor = conn.cursor()
+    counts = {}
+
+    try:
+        progress("members")
+        # Valid far into the future for now, so PreventInactiveMemberCheckin accepts the
+        # historical visits; the real Valid_until is backfilled from the payments below.
+        rows = ((p.mem_id, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"8{i:09d}", p.join_date,
+                 rng.randint(16, 70), FAR_FUTURE) for i, p in enumerate(plans))
+        counts['members'] = _insert_batches(conn, cursor, INSERT_MEMBER, rows)
+
+        progress("attendance")
+        counts['attendance'] = _insert_batches(conn, cursor, INSERT_ATTENDANCE, _visits(plans, rng, now))
+
+        progress("payments")
+        cursor.execute("SET @defer_member_status = 1")
+        rows = ((p.mem_id, rng.choice((1500, 1500, 1500, 1200, 2000)), p.first_payment + timedelta(days=m * PAYMENT_DAYS))
+                for p in plans for m in range(p.months))
+        counts['payments'] = _insert_batches(conn, cursor, INSERT_PAYMENT, rows)
+        cursor.execute(BACKFILL_MEMBERS, (PREFIX + '%',))
+        conn.commit()
+        repo.resync_all_member_statuses(conn)
+
+        progress("trainers, exercises and workout plans")
+        counts.update(_generate_plans(conn, cursor, plans, rng, today))
+    finally:
+        cursor.execute("SET @defer_member_status = NULL")
+        cursor.close()
+    return counts
+
+
+def _visits(plans, rng, now):
+    for p in plans:
+        span = (p.paid_until - p.first_payment).days + 1
+        for _ in range(p.visits):
+            check_in = datetime.combine(p.first_payment + timedelta(days=rng.randrange(span)), datetime.min.time())
+            check_in += timedelta(hours=rng.randint(6, 20), minutes=rng.randrange(60))
+            check_out = check_in + timedelta(minutes=rng.randint(30, 120))
+            if check_out < now:
+                yield p.mem_id, check_in, check_out
+        if p.active and rng.random() < CHECKED_IN_SHARE:
+            yield p.mem_id, now - timedelta(minutes=rng.randint(5, 90)), None
+
+
+def _generate_plans(conn, cursor, plans, rng, today):
+    trainer_ids, exercise_ids = [], []
+    for i in range(TRAINERS):
+        cursor.execute("INSERT INTO Trainers (Name, Salary, Date_hired) VALUES (%s, %s, %s)",
+                       (f"{PREFIX} Trainer {i:02d}", rng.randrange(30000, 60000, 1000), today - timedelta(days=rng.randrange(HISTORY_DAYS))))
+        trainer_ids.append(cursor.lastrowid)
+    for i in range(EXERCISES):
+        cursor.execute("INSERT INTO Exercises (Exercise_name, equipment) VALUES (%s, %s)", (f"{PREFIX} Exercise {i:02d}", 'Various'))
+        exercise_ids.append(cursor.lastrowid)
+    conn.commit()
+
+    plan_count = link_count = 0
+    links = []
+    for p in plans:
+        if rng.random() >= PLAN_SHARE:
+            continue
+        cursor.execute("INSERT INTO Workout_Plan (Mem_ID, Trainer_ID, Start_date, End_date) VALUES (%s, %s, %s, %s)",
+                       (p.mem_id, rng.choice(trainer_ids), p.first_payment, None if p.active else p.paid_until))
+        plan_count += 1
+        links.extend((cursor.lastrowid, ex_id, rng.choice(REPS)) for ex_id in rng.sample(exercise_ids, rng.randint(3, 6)))
+        if len(links) >= BATCH_SIZE:
+            link_count += _flush(conn, cursor, "INSERT INTO Plan_Exercises (Plan_ID, Exercise_ID, reps_sets_info) VALUES (%s, %s, %s)", links)
+            links = []
+    link_count += _flush(conn, cursor, "INSERT INTO Plan_Exercises (Plan_ID, Exercise_ID, reps_sets_info) VALUES (%s, %s, %s)", links)
+    return {'trainers': TRAINERS, 'exercises': EXERCISES, 'workout plans': plan_count, 'plan exercises': link_count}
+
+
+def _insert_batches(conn, cursor, statement, rows):
+    total, batch = 0, []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            total += _flush(conn, cursor, statement, batch)
+            batch = []
+    return total + _flush(conn, cursor, statement, batch)
+
+
+def _flush(conn, cursor, statement, batch):
+    if batch:
+        cursor.executemany(statement, batch)
+        conn.commit()
+    return len(batch)
+
+
+def clear(conn):
+    """Removes all generated data; payments, visits and plans go with their members."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT Mem_ID FROM Member WHERE Mem_ID LIKE %s", (PREFIX + '%',))
+        mem_ids = [mem_id for (mem_id,) in cursor.fetchall()]
+        for i in range(0, len(mem_ids), DELETE_BATCH):
+            chunk = mem_ids[i:i + DELETE_BATCH]
+            cursor.execute(f"DELETE FROM Member WHERE Mem_ID IN ({', '.join(['%s'] * len(chunk))})", chunk)
+            conn.commit()
+        cursor.execute("DELETE FROM Trainers WHERE Name LIKE %s", (PREFIX + ' %',))
+        cursor.execute("DELETE FROM Exercises WHERE Exercise_name LIKE %s", (PREFIX + ' %',))
+        conn.commit()
+    finally:
+        cursor.close()
+    return len(mem_ids)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate realistic volumes of seeded test data.")
+    parser.add_argument('--members', type=int, default=100000)
+    parser.add_argument('--payments', type=int, default=2000000, help="Roughly; capped by each member's tenure")
+    parser.add_argument('--attendance', type=int, default=5000000, help="Roughly")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--clear', action='store_true', help="Only remove previously generated data")
+    parser.add_argument('--sqlite', metavar='PATH', help="Use an embedded SQLite database instead of config.py's")
+    args = parser.parse_args(argv)
+
+    conn = sqlite_backend.connect(args.sqlite) if args.sqlite else open_connection()
+    started = time.perf_counter()
+    try:
+        removed = clear(conn)
+        if removed:
+            print(f"Removed {removed} previously generated members", file=sys.stderr)
+        if args.clear:
+            return 0
+        counts = generate(conn, args, progress=lambda step: print(f"  {time.perf_counter() - started:7.1f}s  {step}", file=sys.stderr))
+    finally:
+        conn.close()
+
+    print(f"Generated in {time.perf_counter() - started:.1f}s (seed {args.seed}):")
+    for name, count in counts.items():
+        print(f"  {name:<16} {count:>10,}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+Times every query path the GUI and the kiosk service use, against data made by
+generate_data.py: check-in (with its trigger), check-out, member details, the
+list loads and searches, the change feed poll, reference data, recording a payment
+and the status procedures.
+
+Each operation runs --repeats times on randomly chosen generated members (same
+--seed, same members). The report gives best/p50/p95/max per operation. It
+can be saved as JSON with --output and compared against an earlier run with
+--compare. Check-ins, check-outs and payments made by the benchmark are
+removed again afterwards. Run from the repository root:
+
+    python benchmarks/generate_data.py
+    python benchmarks/load_benchmark.py --output before.json
+    python benchmarks/load_benchmark.py --compare before.json
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import maintenance
+import repository as repo
+import sqlite_backend
+from changefeed import ChangeFeed, changed_keys, latest_change_id
+from checkin import CheckInError, check_in, check_out
+from checkin_service import percentile
+from db import dialect, open_connection
+from generate_data import FIRST_NAMES, PREFIX
+from paged_table import keyset_page_query
+
+PAGE_SIZE = 200 # PagedTable default
+# Same columns as the Members and Payments tabs
+MEMBER_COLUMNS = ['Mem_ID', 'Name', 'Phone_no', 'Join_date', 'Age', 'Valid_until', 'Total_paid']
+PAYMENT_COLUMNS = ['Payment_ID', 'Mem_ID', 'amount', 'Payment_date', 'Payment_status']
+
+
+class Workload:
+    """Generated members to draw from, and the rows the run adds (removed by cleanup)."""
+
+    def __init__(self, conn, seed):
+        self.rng = random.Random(seed)
+        pattern = PREFIX + '%'
+        self.active = [m for (m,) in repo.fetch_all(conn, """
+            SELECT Mem_ID FROM Member m
+            WHERE Mem_ID LIKE %s AND Valid_until >= %s
+              AND NOT EXISTS (SELECT 1 FROM Attendance a WHERE a.Mem_ID = m.Mem_ID AND a.check_out IS NULL)
+        """, (pattern, date.today()))]
+        self.expired = [m for (m,) in repo.fetch_all(conn, "SELECT Mem_ID FROM Member WHERE Mem_ID LIKE %s AND Valid_until < %s",
+                                                     (pattern, date.today()))]
+        if not self.active or not self.expired:
+            raise SystemExit("No generated data found: run benchmarks/generate_data.py first.")
+        self.rng.shuffle(self.active)
+        self.members = self.active + self.expired
+        self.plan_ids = [p for (p,) in repo.fetch_all(conn, "SELECT Plan_ID FROM Workout_Plan WHERE Mem_ID LIKE %s", (pattern,))]
+        self.payment_mark = repo.fetch_all(conn, "SELECT COALESCE(MAX(Payment_ID), 0) FROM Payment")[0][0]
+        self.attendance_mark = repo.fetch_all(conn, "SELECT COALESCE(MAX(Attendance_ID), 0) FROM Attendance")[0][0]
+        self.inside = deque()
+
+    def member(self):
+        return self.rng.choice(self.members)
+
+    def member_row(self, conn, columns):
+        """A random generated member as a keyset boundary row."""
+        return repo.fetch_all(conn, f"SELECT {', '.join(columns)} FROM Member WHERE Mem_ID = %s", (self.member(),))[0]
+
+    def cleanup(self, conn):
+        pattern = PREFIX + '%'
+        repo.execute_and_commit(conn, "DELETE FROM Attendance WHERE Attendance_ID > %s AND Mem_ID LIKE %s", (self.attendance_mark, pattern))
+        # AfterPaymentDelete moves Valid_until back
+        repo.execute_and_commit(conn, "DELETE FROM Payment WHERE Payment_ID > %s AND Mem_ID LIKE %s", (self.payment_mark, pattern))
+
+
+def operations(work):
+    """(name, callable(conn)) in the order they run; check-outs close the sessions the check-ins opened."""
+    def do_check_in(conn):
+        mem_id = work.active.pop()
+        check_in(conn, mem_id)
+        work.inside.append(mem_id)
+
+    def do_check_out(conn):
+        mem_id = work.inside.popleft()
+        check_out(conn, mem_id)
+        work.active.insert(0, mem_id)
+
+    def refused_check_in(conn):
+        try:
+            check_in(conn, work.rng.choice(work.expired))
+        except CheckInError:
+            pass
+
+    def page(table, columns, key, sort, descending, boundary=None, row_filter=None):
+        query, params = keyset_page_query(table, columns, key, sort, descending, boundary, True, PAGE_SIZE, row_filter)
+        return lambda conn: repo.fetch_all(conn, query, params)
+
+    def member_page_by_total_paid(conn):
+        boundary = work.member_row(conn, MEMBER_COLUMNS)
+        page('Member', MEMBER_COLUMNS, 'Mem_ID', 'Total_paid', True, boundary)(conn)
+
+    def member_search(conn):
+        # What the Members tab runs after a few typed letters of a first name
+        row_filter = repo.member_search_filter(work.rng.choice(FIRST_NAMES)[:3])
+        page('Member', MEMBER_COLUMNS, 'Mem_ID', 'Mem_ID', False, row_filter=row_filter)(conn)
+
+    def payments_filtered(conn):
+        row_filter = repo.payment_search_filter(work.member(), date_from=date.today() - timedelta(days=365))
+        page('Payment', PAYMENT_COLUMNS, 'Payment_ID', 'Payment_ID', True, row_filter=row_filter)(conn)
+
+    def payments_last_week(conn):
+        row_filter = repo.payment_search_filter(date_from=date.today() - timedelta(days=7))
+        page('Payment', PAYMENT_COLUMNS, 'Payment_ID', 'Payment_date', True, row_filter=row_filter)(conn)
+
+    def member_page_by_name(conn):
+        boundary = work.member_row(conn, MEMBER_COLUMNS)
+        page('Member', MEMBER_COLUMNS, 'Mem_ID', 'Name', False, boundary)(conn)
+
+    feed = None
+
+    def change_feed_poll(conn):
+        # One desk's tick: the entries since its last poll (the check-ins, check-outs and
+        # payments above), then a lookup of the sessions they name
+        nonlocal feed
+        if feed is None:
+            feed = ChangeFeed(max(0, latest_change_id(conn) - 10))
+        keys = changed_keys(feed.poll(conn) or [])
+        if 'Attendance' in keys:
+            repo.open_sessions_by_id(conn, keys['Attendance'])
+
+    return [
+        ('check-in', do_check_in),
+        ('check-out', do_check_out),
+        ('check-in refused (expired)', refused_check_in),
+        ('member details', lambda conn: repo.member_details(conn, work.member())),
+        ('members list: first page', page('Member', MEMBER_COLUMNS, 'Mem_ID', 'Mem_ID', False)),
+        ('members list: page by name', member_page_by_name),
+        ('members list: by total paid', member_page_by_total_paid),
+        ('payments list: newest first', page('Payment', PAYMENT_COLUMNS, 'Payment_ID', 'Payment_date', True)),
+        ('member search: name prefix', member_search),
+        ('payments: member, last year', payments_filtered),
+        ('payments: last 7 days', payments_last_week),
+        ('currently in: full load', lambda conn: (latest_change_id(conn), repo.open_sessions(conn))),
+        ('change feed: poll', change_feed_poll),
+        ('member names (plan combos)', repo.member_names),
+        ('trainers list', repo.list_trainers),
+        ('workout plans list', repo.list_workout_plans),
+        ('plan exercises', lambda conn: repo.plan_exercises(conn, work.rng.choice(work.plan_ids))),
+        ('add payment', lambda conn: repo.add_payment(conn, work.member(), 1500, date.today())),
+        ('status sync (incremental)', maintenance.sync_member_statuses),
+        ('status resync (full)', repo.resync_all_member_statuses),
+        ('payment ledger check', maintenance.check_member_ledger),
+        ('auto check-out', maintenance.close_forgotten_sessions),
+    ]
+
+
+def dataset(conn):
+    counts = {}
+    for table in ('Member', 'Payment', 'Attendance', 'Workout_Plan', 'Plan_Exercises'):
+        counts[table] = repo.fetch_all(conn, f"SELECT COUNT(*) FROM {table}")[0][0]
+    return counts
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(conn, repeats, seed):
+    work = Workload(conn, seed)
+    results = {}
+    try:
+        for name, fn in operations(work):
+            timings = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                fn(conn)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            results[name] = {'runs': repeats, 'best_ms': round(timings[0], 3), 'p50_ms': round(percentile(timings, 0.50), 3),
+                             'p95_ms': round(percentile(timings, 0.95), 3), 'max_ms': round(timings[-1], 3)}
+            print(f"  {name}", file=sys.stderr)
+    finally:
+        work.cleanup(conn)
+    return results
+
+
+def print_report(report, baseline=None):
+    meta = report['meta']
+    sizes = ', '.join(f"{table} {count:,}" for table, count in meta['dataset'].items())
+    print(f"{meta['started_at']}  {meta['backend']}  rev {meta['revision'] or '?'}  {meta['repeats']} runs each")
+    print(f"Data: {sizes}")
+    header = f"{'operation':<30} {'best ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"
+    print(header + (f" {'p50 vs base':>12}" if baseline else ''))
+    for name, stats in report['operations'].items():
+        line = f"{name:<30} {stats['best_ms']:>9.2f} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['max_ms']:>9.2f}"
+        before = (baseline or {}).get('operations', {}).get(name)
+        if before and before['p50_ms']:
+            line += f" {(stats['p50_ms'] / before['p50_ms'] - 1) * 100:>+11.0f}%"
+        elif baseline:
+            line += f" {'new':>12}"
+        print(line)
+    if baseline and baseline['meta']['dataset'] != meta['dataset']:
+        print("Note: the baseline was measured on a different data set.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the application's query paths against generated data.")
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help="Save the results as JSON")
+    parser.add_argument('--compare', metavar='JSON', help="Compare against results saved with --output")
+    parser.add_argument('--sqlite', metavar='PATH', help="Use an embedded SQLite database instead of config.py's")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    conn = sqlite_backend.connect(args.sqlite) if args.sqlite else open_connection()
+    try:
+        report = {'meta': {'started_at': datetime.now().isoformat(timespec='seconds'), 'backend': dialect(conn),
+                           'revision': git_revision(), 'repeats': args.repeats, 'seed': args.seed, 'dataset': dataset(conn)}}
+        report['operations'] = run(conn, args.repeats, args.seed)
+    finally:
+        conn.close()
+
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
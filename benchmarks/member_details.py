@@ -0,0 +1,90 @@
+"""
+Member details attendance history: per-row CalculateWorkoutDuration calls vs.
+the single set-based MEMBER_ATTENDANCE_QUERY used by repository.member_visits.
+
+Seeds a throwaway member with N visits for each N, times both approaches and
+removes the member again. Run from the repository root:
+
+    python benchmarks/member_details.py
+"""
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+
+from repository import MEMBER_ATTENDANCE_QUERY
+from config import DB_CONFIG
+
+BENCH_MEM_ID = 'BENCH_DETAILS'
+VISIT_COUNTS = (10, 100, 500, 1500)
+REPEATS = 5
+
+
+def seed_member(conn, visits):
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM Member WHERE Mem_ID = %s", (BENCH_MEM_ID,))
+    cursor.execute("INSERT INTO Member (Mem_ID, Name, Join_date) VALUES (%s, %s, %s)",
+                   (BENCH_MEM_ID, 'Benchmark Member', date.today()))
+    # A current payment keeps PreventInactiveMemberCheckin happy
+    cursor.execute("INSERT INTO Payment (Mem_ID, amount, Payment_date) VALUES (%s, %s, %s)",
+                   (BENCH_MEM_ID, 1500.00, date.today()))
+    start = datetime.now() - timedelta(days=visits)
+    rows = [(BENCH_MEM_ID, start + timedelta(days=i), start + timedelta(days=i, minutes=45 + i % 60)) for i in range(visits)]
+    cursor.executemany("INSERT INTO Attendance (Mem_ID, check_in, check_out) VALUES (%s, %s, %s)", rows)
+    conn.commit()
+    cursor.close()
+
+
+def legacy_history(conn):
+    """The old approach: one CalculateWorkoutDuration round-trip per visit."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT Attendance_ID, check_in, check_out FROM Attendance WHERE Mem_ID = %s", (BENCH_MEM_ID,))
+    history = []
+    for (att_id, check_in, check_out) in cursor.fetchall():
+        cursor.execute("SELECT CalculateWorkoutDuration(%s)", (att_id,))
+        history.append((att_id, check_in, check_out, cursor.fetchone()[0]))
+    cursor.close()
+    return history
+
+
+def set_based_history(conn):
+    cursor = conn.cursor()
+    cursor.execute(MEMBER_ATTENDANCE_QUERY, (BENCH_MEM_ID, BENCH_MEM_ID))
+    history = cursor.fetchall()
+    cursor.close()
+    return history
+
+
+def best_of(fn, conn):
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        fn(conn)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        print(f"{'visits':>8} {'per-row (ms)':>14} {'set-based (ms)':>16} {'speedup':>9}")
+        for visits in VISIT_COUNTS:
+            seed_member(conn, visits)
+            assert len(legacy_history(conn)) == len(set_based_history(conn)) == visits
+            legacy_ms = best_of(legacy_history, conn)
+            set_ms = best_of(set_based_history, conn)
+            print(f"{visits:>8} {legacy_ms:>14.1f} {set_ms:>16.1f} {legacy_ms / set_ms:>8.1f}x")
+    finally:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM Member WHERE Mem_ID = %s", (BENCH_MEM_ID,))
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+AfterPaymentInsert under bulk load: the original unconditional per-row UPDATE
+vs. the current trigger (as gym_management.sql defines it, ledger summary
+included) vs. deferred mode with one set-based UPDATE per batch (what
+payment_import.py does).
+
+Seeds throwaway members, inserts PAYMENTS rows in batches for each variant and
+removes everything again. The legacy trigger is installed temporarily (the
+current one is put back afterwards), so run this against a scratch database.
+Run from the repository root:
+
+    python benchmarks/payment_trigger.py
+"""
+import os
+import re
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+
+from config import DB_CONFIG
+from payment_import import INSERT_PAYMENT, ImportResult, _insert_batch
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gym_management.sql')
+
+MEMBER_PREFIX = 'BENCH_PAY_'
+MEMBERS = 1000
+PAYMENTS = 100000
+BATCH_SIZE = 1000
+
+LEGACY_TRIGGER = """
+CREATE TRIGGER AfterPaymentInsert
+AFTER INSERT ON Payment
+FOR EACH ROW
+BEGIN
+    UPDATE Member
+    SET Member_Status = 'Active'
+    WHERE Mem_ID = NEW.Mem_ID;
+END"""
+
+
+def shipped_trigger(name='AfterPaymentInsert'):
+    """The trigger as gym_management.sql defines it (its DELIMITER $$ block)."""
+    with open(SCHEMA_FILE, encoding='utf-8') as f:
+        match = re.search(rf"^CREATE TRIGGER {name}\b.*?^END(?=\$\$)", f.read(), re.MULTILINE | re.DOTALL)
+    if match is None:
+        raise SystemExit(f"{name} not found in {SCHEMA_FILE}")
+    return match.group(0)
+
+
+def install_trigger(cursor, definition):
+    cursor.execute("DROP TRIGGER IF EXISTS AfterPaymentInsert")
+    cursor.execute(definition)
+
+
+def seed_members(conn):
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM Member WHERE Mem_ID LIKE %s", (MEMBER_PREFIX + '%',))
+    rows = [(f"{MEMBER_PREFIX}{i}", f"Bench Member {i}", date.today(), 'Inactive') for i in range(MEMBERS)]
+    cursor.executemany("INSERT INTO Member (Mem_ID, Name, Join_date, Member_Status) VALUES (%s, %s, %s, %s)", rows)
+    conn.commit()
+    cursor.close()
+
+
+def insert_payments(conn, deferred):
+    """Inserts PAYMENTS rows in batches; returns (seconds, members left inactive, members with a wrong Total_paid)."""
+    cursor = conn.cursor()
+    cursor.execute("SET @defer_member_status = %s", (1 if deferred else None,))
+    today = date.today()
+    result = ImportResult()
+    started = time.perf_counter()
+    for offset in range(0, PAYMENTS, BATCH_SIZE):
+        batch = [(f"{MEMBER_PREFIX}{i % MEMBERS}", 1500.00, today, 'Completed')
+                 for i in range(offset, min(offset + BATCH_SIZE, PAYMENTS))]
+        if deferred:
+            # Exactly what payment_import.py runs per batch: the inserts plus the set-based member sync
+            _insert_batch(conn, cursor, batch, result)
+        else:
+            cursor.executemany(INSERT_PAYMENT, batch)
+            conn.commit()
+    elapsed = time.perf_counter() - started
+    cursor.execute("SET @defer_member_status = NULL")
+    cursor.execute("SELECT COUNT(*) FROM Member WHERE Mem_ID LIKE %s AND NOT (Member_Status <=> 'Active')",
+                   (MEMBER_PREFIX + '%',))
+    inactive = cursor.fetchone()[0]
+    cursor.execute("""
+        SELECT COUNT(*) FROM Member m
+        WHERE Mem_ID LIKE %s
+          AND Total_paid <> (SELECT COALESCE(SUM(amount), 0) FROM Payment p WHERE p.Mem_ID = m.Mem_ID)
+    """, (MEMBER_PREFIX + '%',))
+    ledger_off = cursor.fetchone()[0]
+    cursor.close()
+    return elapsed, inactive, ledger_off
+
+
+def main():
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    current = shipped_trigger()
+    variants = (
+        ('legacy per-row trigger', LEGACY_TRIGGER, False),
+        ('current trigger', current, False),
+        ('deferred + set-based', current, True),
+    )
+    try:
+        print(f"{PAYMENTS} payments for {MEMBERS} members, batches of {BATCH_SIZE}")
+        print(f"{'variant':<24} {'seconds':>9} {'rows/s':>10} {'left inactive':>14} {'ledger off':>11}")
+        for name, trigger, deferred in variants:
+            install_trigger(cursor, trigger)
+            seed_members(conn)
+            elapsed, inactive, ledger_off = insert_payments(conn, deferred)
+            print(f"{name:<24} {elapsed:>9.2f} {PAYMENTS / elapsed:>10.0f} {inactive:>14} {ledger_off:>11}")
+    finally:
+        # Put back the real trigger, whatever variant was installed last
+        install_trigger(cursor, current)
+        cursor.execute("DELETE FROM Member WHERE Mem_ID LIKE %s", (MEMBER_PREFIX + '%',))
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
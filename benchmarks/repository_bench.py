@@ -0,0 +1,138 @@
+"""
+Timings for every repository.py operation against a seeded database, so a
+change to a query can be measured without clicking through the GUI.
+
+Seeds throwaway members (with payments, visits and a workout plan each), a
+trainer and a few exercises, runs each operation --repeats times and reports the
+best and median wall time, then removes everything it added. Uses the
+database configured in config.py, or an embedded SQLite one with --sqlite
+(":memory:" runs entirely in-process). Run from the repository root:
+
+    python benchmarks/repository_bench.py [--members 2000] [--repeats 20] [--sqlite :memory:]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import repository as repo
+import sqlite_backend
+from changefeed import ChangeFeed, changed_keys, latest_change_id
+from db import open_connection
+
+PREFIX = 'BENCH_REPO_'
+VISITS_PER_MEMBER = 20
+EXERCISE_COUNT = 5
+
+
+def seed(conn, members):
+    cursor = conn.cursor()
+    remove(conn)
+    mem_ids = [f"{PREFIX}{i}" for i in range(members)]
+    cursor.executemany("INSERT INTO Member (Mem_ID, Name, Join_date) VALUES (%s, %s, %s)",
+                       [(mem_id, f"Repo Member {i}", date.today()) for i, mem_id in enumerate(mem_ids)])
+    cursor.executemany("INSERT INTO Payment (Mem_ID, amount, Payment_date) VALUES (%s, %s, %s)",
+                       [(mem_id, 1500.00, date.today()) for mem_id in mem_ids])
+
+    start = datetime.now() - timedelta(days=VISITS_PER_MEMBER)
+    visits = [(mem_id, start + timedelta(days=d), start + timedelta(days=d, minutes=50))
+              for mem_id in mem_ids for d in range(VISITS_PER_MEMBER)]
+    for i in range(0, len(visits), 5000):
+        cursor.executemany("INSERT INTO Attendance (Mem_ID, check_in, check_out) VALUES (%s, %s, %s)", visits[i:i + 5000])
+    # Every tenth member is still inside, for the "currently in" list
+    cursor.executemany("INSERT INTO Attendance (Mem_ID, check_in) VALUES (%s, %s)",
+                       [(mem_id, datetime.now()) for mem_id in mem_ids[::10]])
+
+    cursor.execute("INSERT INTO Trainers (Name, Salary, Date_hired) VALUES (%s, %s, %s)", (PREFIX + 'Trainer', 30000, date.today()))
+    trainer_id = cursor.lastrowid
+    cursor.executemany("INSERT INTO Exercises (Exercise_name) VALUES (%s)",
+                       [(f"{PREFIX}Exercise {i}",) for i in range(EXERCISE_COUNT)])
+    cursor.execute("SELECT Exercise_ID FROM Exercises WHERE Exercise_name LIKE %s", (PREFIX + '%',))
+    exercise_ids = [ex_id for (ex_id,) in cursor.fetchall()]
+    cursor.executemany("INSERT INTO Workout_Plan (Mem_ID, Trainer_ID, Start_date) VALUES (%s, %s, %s)",
+                       [(mem_id, trainer_id, date.today()) for mem_id in mem_ids])
+    cursor.execute("SELECT Plan_ID FROM Workout_Plan WHERE Trainer_ID = %s ORDER BY Plan_ID LIMIT 1", (trainer_id,))
+    plan_id = cursor.fetchone()[0]
+    cursor.executemany("INSERT INTO Plan_Exercises (Plan_ID, Exercise_ID, reps_sets_info) VALUES (%s, %s, %s)",
+                       [(plan_id, ex_id, '3x10') for ex_id in exercise_ids[1:]])
+    conn.commit()
+    cursor.close()
+    return mem_ids, trainer_id, plan_id, exercise_ids[0]
+
+
+def remove(conn):
+    cursor = conn.cursor()
+    # Payments, visits and plans go with the members; plans also cascade from the trainer
+    cursor.execute("DELETE FROM Member WHERE Mem_ID LIKE %s", (PREFIX + '%',))
+    cursor.execute("DELETE FROM Trainers WHERE Name LIKE %s", (PREFIX + '%',))
+    cursor.execute("DELETE FROM Exercises WHERE Exercise_name LIKE %s", (PREFIX + '%',))
+    conn.commit()
+    cursor.close()
+
+
+def operations(conn, mem_ids, trainer_id, plan_id, spare_exercise_id):
+    """(name, callable(conn)) for each operation; add/delete pairs leave the data set as it was."""
+    probe = mem_ids[len(mem_ids) // 2]
+    inside = [session.attendance_id for session in repo.open_sessions(conn)]
+    # Starts a few entries back, so the first poll has the latest changes to look up
+    feed = ChangeFeed(max(0, latest_change_id(conn) - 10))
+
+    def change_feed_poll(conn):
+        keys = changed_keys(feed.poll(conn) or [])
+        if 'Attendance' in keys:
+            repo.open_sessions_by_id(conn, keys['Attendance'])
+
+    return [
+        ('open_sessions', repo.open_sessions),
+        ('change feed poll', change_feed_poll),
+        ('open_sessions_by_id (all open)', lambda conn: repo.open_sessions_by_id(conn, inside)),
+        ('member_visits', lambda conn: repo.member_visits(conn, probe)),
+        ('member_details', lambda conn: repo.member_details(conn, probe)),
+        ('member_names', repo.member_names),
+        ('member_signature', repo.member_signature),
+        ('add + delete member', lambda conn: (repo.add_member(conn, PREFIX + 'tmp', 'Temp', None, None, date.today()),
+                                              repo.delete_member(conn, PREFIX + 'tmp'))),
+        ('add_payment', lambda conn: repo.add_payment(conn, probe, 1500.00, date.today())),
+        ('list_trainers', repo.list_trainers),
+        ('trainer_names', repo.trainer_names),
+        ('list_workout_plans', repo.list_workout_plans),
+        ('create_workout_plan', lambda conn: repo.create_workout_plan(conn, probe, trainer_id, date.today())),
+        ('plan_exercises', lambda conn: repo.plan_exercises(conn, plan_id)),
+        ('add + remove plan exercise', lambda conn: (repo.add_plan_exercise(conn, plan_id, spare_exercise_id, '3x12'),
+                                                     repo.remove_plan_exercise(conn, plan_id, spare_exercise_id))),
+        ('exercise_names', repo.exercise_names),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the repository.py operations against seeded data.")
+    parser.add_argument('--members', type=int, default=2000)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--sqlite', metavar='PATH', help="Use an embedded SQLite database instead of config.py's")
+    args = parser.parse_args(argv)
+
+    conn = sqlite_backend.connect(args.sqlite) if args.sqlite else open_connection()
+    try:
+        ops = operations(conn, *seed(conn, args.members))
+        print(f"{args.members} members, {args.members * VISITS_PER_MEMBER} visits; {args.repeats} runs each")
+        print(f"{'operation':<30} {'best ms':>9} {'p50 ms':>9}")
+        for name, fn in ops:
+            fn(conn) # Warm-up
+            timings = []
+            for _ in range(args.repeats):
+                started = time.perf_counter()
+                fn(conn)
+                timings.append((time.perf_counter() - started) * 1000)
+            print(f"{name:<30} {min(timings):>9.2f} {statistics.median(timings):>9.2f}")
+    finally:
+        remove(conn)
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Change feed, so each desk picks up the check-ins, payments, members and plans
+entered at the other desks without reloading whole lists.
+
+Triggers on Member, Payment, Attendance and Workout_Plan add one Change_Log
+entry (table, primary key, 'I'/'U'/'D') per row they touch. A ChangeFeed reads
+the entries past the last Change_ID it has handed out, one primary-key range
+query per poll, and the GUI re-reads just the rows they name (see
+GymApp.poll_changes). Entries older than CHANGE_LOG_RETENTION_HOURS are pruned
+by a maintenance task.
+
+Change_IDs are handed out when an entry is written, not when its transaction
+commits, so on MySQL a poll can see entry 101 before entry 100 is committed. A
+missing Change_ID is looked for again on every poll for GAP_TIMEOUT seconds
+before it is taken to have been rolled back.
+"""
+import time
+from typing import NamedTuple
+
+from db import dialect
+from repository import fetch_all
+
+CHANGE_FEED_BATCH = 1000 # Entries read per poll; a desk further behind than this reloads instead
+GAP_TIMEOUT = 30.0
+CHANGE_LOG_RETENTION_HOURS = 24
+# Each batch is its own short transaction, so the triggers never wait long on the pruning
+PRUNE_BATCH_SIZE = 5000
+PRUNE_MAX_BATCHES = 20 # per run; anything left is picked up by the next run
+
+CHANGES_QUERY = """
+    SELECT Change_ID, Table_name, Row_key, Operation FROM Change_Log
+    WHERE Change_ID > %s
+    ORDER BY Change_ID
+    LIMIT %s
+"""
+
+PRUNE_CHANGE_LOG = """
+    DELETE FROM Change_Log
+    WHERE Changed_at < DATE_SUB(NOW(), INTERVAL %s HOUR)
+    ORDER BY Changed_at, Change_ID
+    LIMIT %s
+"""
+
+# SQLite has no DELETE ... LIMIT
+PRUNE_CHANGE_LOG_SQLITE = """
+    DELETE FROM Change_Log
+    WHERE Change_ID IN (
+        SELECT Change_ID FROM Change_Log
+        WHERE Changed_at < DATE_SUB(NOW(), INTERVAL %s HOUR)
+        ORDER BY Changed_at, Change_ID
+        LIMIT %s
+    )
+"""
+
+
+class Change(NamedTuple):
+    change_id: int
+    table: str
+    key: str
+    operation: str # 'I', 'U' or 'D'
+
+
+def latest_change_id(conn) -> int:
+    """Highest Change_ID so far (0 for an empty log); a new feed starts here."""
+    return fetch_all(conn, "SELECT COALESCE(MAX(Change_ID), 0) FROM Change_Log")[0][0]
+
+
+def changed_keys(changes):
+    """{table: [keys]} of the rows the changes name, each key once, in order of first change."""
+    keys = {}
+    for change in changes:
+        keys.setdefault(change.table, {})[change.key] = None
+    return {table: list(table_keys) for table, table_keys in keys.items()}
+
+
+class ChangeFeed:
+    """
+    Follows Change_Log from a Change_ID on. poll() is not thread-safe; the GUI
+    runs it as a keyed job, so one poll at a time.
+    """
+
+    def __init__(self, last_id, batch_size=CHANGE_FEED_BATCH, gap_timeout=GAP_TIMEOUT,
+                 max_idle=CHANGE_LOG_RETENTION_HOURS * 3600 / 2):
+        self.last_id = last_id # Every entry up to here has been handed out
+        self.batch_size = batch_size
+        self.gap_timeout = gap_timeout
+        self.max_idle = max_idle
+        self._seen = set()  # Entries past a gap that have been handed out
+        self._gaps = {}     # Missing Change_ID -> when it was first missed
+        self._polled_at = time.monotonic()
+
+    def poll(self, conn):
+        """
+        The changes committed since the last poll, in Change_ID order. Returns
+        None when the feed cannot tell what changed (more than batch_size
+        entries waiting, or no poll for so long that entries may have been
+        pruned): it then restarts from the latest entry, and the caller should
+        reload its views.
+        """
+        now = time.monotonic()
+        idle = now - self._polled_at
+        self._polled_at = now
+        rows = fetch_all(conn, CHANGES_QUERY, (self.last_id, self.batch_size))
+        if len(rows) >= self.batch_size or idle > self.max_idle:
+            self.restart(conn)
+            return None
+
+        changes = []
+        expected = self.last_id + 1
+        for row in rows:
+            change = Change(*row)
+            for missing in range(expected, change.change_id):
+                self._gaps.setdefault(missing, now)
+            expected = change.change_id + 1
+            self._gaps.pop(change.change_id, None)
+            if change.change_id not in self._seen:
+                self._seen.add(change.change_id)
+                changes.append(change)
+
+        for missing, since in list(self._gaps.items()):
+            if now - since > self.gap_timeout:
+                del self._gaps[missing] # Rolled back (or an id MySQL skipped)
+        # Stop short of the oldest entry still missing, so it is read once committed
+        self.last_id = min(self._gaps) - 1 if self._gaps else expected - 1
+        self._seen = {change_id for change_id in self._seen if change_id > self.last_id}
+        return changes
+
+    def restart(self, conn):
+        """Skips to the latest entry, forgetting anything still missing."""
+        self.last_id = latest_change_id(conn)
+        self._seen.clear()
+        self._gaps.clear()
+
+
+def prune_change_log(conn, retention_hours=CHANGE_LOG_RETENTION_HOURS, batch_size=PRUNE_BATCH_SIZE,
+                     max_batches=PRUNE_MAX_BATCHES):
+    """Deletes change log entries older than retention_hours, in bounded batches; returns the number deleted."""
+    query = PRUNE_CHANGE_LOG_SQLITE if dialect(conn) == 'sqlite' else PRUNE_CHANGE_LOG
+    pruned = 0
+    cursor = conn.cursor()
+    try:
+        for _ in range(max_batches):
+            cursor.execute(query, (retention_hours, batch_size))
+            conn.commit()
+            pruned += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                break
+    finally:
+        cursor.close()
+    return pruned
@@ -0,0 +1,103 @@
+"""
+Check-in / check-out logic shared by the GUI's Check-In/Out tab and the kiosk
+service (checkin_service.py).
+
+With `prepared=True` the statements run on server-side prepared cursors cached
+per pooled connection (see PooledConnection.session_state), so a busy kiosk
+only pays for parsing each statement once per connection.
+"""
+from datetime import datetime
+
+import mysql.connector
+
+MEMBER_NAME_QUERY = "SELECT Name FROM Member WHERE Mem_ID = %s"
+
+INSERT_CHECKIN = "INSERT INTO Attendance (Mem_ID, check_in) VALUES (%s, %s)"
+
+# Latest open check-in for a member, locked for the check-out update
+# (served by idx_attendance_member_open).
+OPEN_CHECKIN_QUERY = """
+    SELECT Attendance_ID
+    FROM Attendance
+    WHERE Mem_ID = %s AND check_out IS NULL
+    ORDER BY check_in DESC
+    LIMIT 1
+    FOR UPDATE
+"""
+
+CLOSE_CHECKIN = "UPDATE Attendance SET check_out = %s WHERE Attendance_ID = %s"
+
+# SQLSTATE raised by the PreventInactiveMemberCheckin trigger
+MEMBERSHIP_EXPIRED_SQLSTATE = '45000'
+
+
+class CheckInError(Exception):
+    """A scan that was understood but refused; `reason` is a short machine-readable code."""
+
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason
+
+
+def check_in(conn, mem_id, prepared=False):
+    """Checks a member in; returns (attendance id, member name, check-in time)."""
+    check_in_time = datetime.now()
+    cursor = _cursor(conn, MEMBER_NAME_QUERY, prepared)
+    try:
+        cursor.execute(MEMBER_NAME_QUERY, (mem_id,))
+        row = next(iter(cursor.fetchall()), None) # fetchall: prepared cursors are unbuffered
+    finally:
+        _done(cursor, prepared)
+    if row is None:
+        raise CheckInError('unknown_member', f"No member with ID {mem_id}.")
+
+    cursor = _cursor(conn, INSERT_CHECKIN, prepared)
+    try:
+        cursor.execute(INSERT_CHECKIN, (mem_id, check_in_time))
+        att_id = cursor.lastrowid
+        conn.commit()
+    except mysql.connector.Error as err:
+        conn.rollback()
+        if err.sqlstate == MEMBERSHIP_EXPIRED_SQLSTATE:
+            raise CheckInError('membership_expired', "Check-in failed: Membership is expired. Please make a payment.") from err
+        raise
+    finally:
+        _done(cursor, prepared)
+    return att_id, row[0], check_in_time
+
+
+def check_out(conn, mem_id, prepared=False):
+    """Closes the member's latest open session; returns its attendance id."""
+    cursor = _cursor(conn, OPEN_CHECKIN_QUERY, prepared)
+    try:
+        cursor.execute(OPEN_CHECKIN_QUERY, (mem_id,))
+        row = next(iter(cursor.fetchall()), None)
+    finally:
+        _done(cursor, prepared)
+    if row is None:
+        conn.rollback()
+        raise CheckInError('not_checked_in', f"No active check-in found for Member {mem_id} to check out.")
+
+    cursor = _cursor(conn, CLOSE_CHECKIN, prepared)
+    try:
+        cursor.execute(CLOSE_CHECKIN, (datetime.now(), row[0]))
+        conn.commit()
+    finally:
+        _done(cursor, prepared)
+    return row[0]
+
+
+def _cursor(conn, sql, prepared):
+    if not prepared:
+        return conn.cursor()
+    cursors = conn.session_state.setdefault('prepared_cursors', {})
+    cursor = cursors.get(sql)
+    if cursor is None:
+        cursor = cursors[sql] = conn.cursor(prepared=True)
+    return cursor
+
+
+def _done(cursor, prepared):
+    # Prepared cursors stay open for reuse on this connection
+    if not prepared:
+        cursor.close()
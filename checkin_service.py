@@ -0,0 +1,166 @@
+"""
+Lightweight HTTP check-in endpoint for door kiosks and barcode scanners.
+
+Runs the same check-in/check-out logic as the GUI (checkin.py) on a pool of
+long-lived connections with prepared statements, one thread per request:
+
+    python checkin_service.py [--host 127.0.0.1] [--port 8765] [--pool-size 8]
+
+    POST /checkin/<Mem_ID>    -> 200 {"ok": true, "attendance_id": ..., "name": ..., "check_in": ...}
+    POST /checkout/<Mem_ID>   -> 200 {"ok": true, "attendance_id": ...}
+    GET  /stats               -> request counts, p50/p99 latency, pool counters
+
+Refused scans answer 404 (unknown member / not checked in) or 403 (membership
+expired) with {"ok": false, "error": <reason>, "message": ...}; 503 means no
+database connection became free in time. benchmarks/checkin_load.py drives it
+with a burst of scans and reports the latency percentiles.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import mysql.connector
+from mysql.connector import errors
+
+from checkin import CheckInError, check_in, check_out
+from db import ConnectionPool, configured_backend
+
+REFUSED_STATUS = {'unknown_member': 404, 'not_checked_in': 404, 'membership_expired': 403}
+
+LATENCY_WINDOW = 10000 # Most recent requests kept for the percentiles
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class LatencyStats:
+    """Thread-safe request counters and a sliding window of latencies (ms) per action."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = {}  # action -> deque of ms
+        self._counts = {}     # (action, status code) -> count
+
+    def record(self, action, status, millis):
+        with self._lock:
+            self._latencies.setdefault(action, deque(maxlen=LATENCY_WINDOW)).append(millis)
+            self._counts[(action, status)] = self._counts.get((action, status), 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            latencies = {action: sorted(values) for action, values in self._latencies.items()}
+            counts = dict(self._counts)
+        report = {}
+        for action, values in latencies.items():
+            report[action] = {
+                'requests': {str(status): n for (a, status), n in counts.items() if a == action},
+                'p50_ms': round(percentile(values, 0.50), 2),
+                'p99_ms': round(percentile(values, 0.99), 2),
+                'max_ms': round(values[-1], 2),
+            }
+        return report
+
+
+class CheckInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' # Keep-alive, so scanners don't reconnect for every scan
+    server_version = 'GymCheckIn/1.0'
+
+    def do_POST(self):
+        started = time.perf_counter()
+        # Read off any body first, so it is not taken for the next request on a kept-alive connection
+        self._discard_body()
+        parts = [unquote(part) for part in self.path.strip('/').split('/')]
+        if len(parts) != 2 or parts[0] not in ('checkin', 'checkout') or not parts[1].strip():
+            self._reply(404, {'ok': False, 'error': 'not_found', 'message': "Use POST /checkin/<Mem_ID> or /checkout/<Mem_ID>."})
+            return
+        action, mem_id = parts[0], parts[1].strip()
+
+        status, body = self._handle(action, mem_id)
+        self._reply(status, body)
+        self.server.stats.record(action, status, (time.perf_counter() - started) * 1000)
+
+    def do_GET(self):
+        if self.path.rstrip('/') != '/stats':
+            self._reply(404, {'ok': False, 'error': 'not_found', 'message': "Unknown path."})
+            return
+        self._reply(200, {'ok': True, 'latency': self.server.stats.snapshot(), 'pool': self.server.pool.stats()})
+
+    def _handle(self, action, mem_id):
+        try:
+            with self.server.pool.connect() as conn:
+                if action == 'checkin':
+                    att_id, name, check_in_time = check_in(conn, mem_id, prepared=True)
+                    return 200, {'ok': True, 'attendance_id': att_id, 'name': name, 'check_in': check_in_time.isoformat(timespec='seconds')}
+                att_id = check_out(conn, mem_id, prepared=True)
+                return 200, {'ok': True, 'attendance_id': att_id}
+        except CheckInError as err:
+            return REFUSED_STATUS.get(err.reason, 400), {'ok': False, 'error': err.reason, 'message': str(err)}
+        except errors.PoolError as err:
+            return 503, {'ok': False, 'error': 'busy', 'message': str(err)}
+        except mysql.connector.Error as err:
+            self.log_error("%s %s failed: %s", action, mem_id, err)
+            return 500, {'ok': False, 'error': 'database_error', 'message': str(err)}
+
+    def _discard_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class CheckInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, pool, verbose=False):
+        super().__init__(address, CheckInHandler)
+        self.pool = pool
+        self.stats = LatencyStats()
+        self.verbose = verbose
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP check-in endpoint for kiosks and barcode scanners.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--pool-size', type=int, default=8)
+    parser.add_argument('--pool-timeout', type=float, default=2.0,
+                        help="Seconds a scan may wait for a free connection before answering 503")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args(argv)
+
+    connect, settings = configured_backend()
+    pool = ConnectionPool(settings, size=args.pool_size, timeout=args.pool_timeout, connect=connect)
+    server = CheckInServer((args.host, args.port), pool, verbose=args.verbose)
+    print(f"Check-in service listening on http://{args.host}:{args.port} (pool size {args.pool_size})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close_all()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,15 @@
+# Database settings shared by the GUI (app.py) and the headless tools.
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "your_mysql_user", 
+    "password": "your_mysql_password", 
+    "database": "gym_management"
+}
+
+# "mysql" uses the server above. "sqlite" keeps everything in a local file
+# instead (see sqlite_backend.py): no server to run, for a single-desk install
+# or for running the benchmarks in-process.
+DB_BACKEND = "mysql"
+SQLITE_CONFIG = {
+    "database": "gym_management.db"
+}
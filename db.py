@@ -0,0 +1,204 @@
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+from mysql.connector import errors
+
+
+def configured_backend():
+    """(connect function, its keyword arguments) for the DB_BACKEND chosen in config.py."""
+    import config
+
+    backend = getattr(config, 'DB_BACKEND', 'mysql')
+    if backend == 'mysql':
+        return mysql.connector.connect, config.DB_CONFIG
+    if backend == 'sqlite':
+        import sqlite_backend
+        return sqlite_backend.connect, config.SQLITE_CONFIG
+    raise ValueError(f"Unknown DB_BACKEND {backend!r} in config.py (expected 'mysql' or 'sqlite').")
+
+
+def open_connection():
+    """A single, unpooled connection to the configured database (for the command-line tools)."""
+    connect, settings = configured_backend()
+    return connect(**settings)
+
+
+def dialect(conn):
+    """'mysql' or 'sqlite', for the few statements that have to be written per backend."""
+    return getattr(conn, 'dialect', 'mysql')
+
+
+class PooledConnection:
+    """Wraps a pooled MySQL connection so that close() hands it back to the pool."""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise errors.OperationalError("Connection has already been returned to the pool.")
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self.__getattr__('cursor')(*args, **kwargs)
+        if self._pool.cursor_wrapper is not None:
+            cursor = self._pool.cursor_wrapper(cursor)
+        return cursor
+
+    @property
+    def session_state(self):
+        """
+        A dict that lives as long as the underlying server session, for things
+        like prepared cursors. It is cleared whenever the pool reconnects.
+        """
+        if self._conn is None:
+            raise errors.OperationalError("Connection has already been returned to the pool.")
+        return self._pool._state_for(self._conn)
+
+    def close(self):
+        """Returns the underlying connection to the pool instead of closing it."""
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.release(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    A bounded, thread-safe pool of long-lived MySQL connections.
+
+    Connections are opened lazily up to `size` with `connect(**config)`
+    (mysql.connector.connect unless another backend's is given, see
+    configured_backend). A connection that has been idle for longer than
+    `ping_after` seconds is pinged (and reconnected if stale) before it is
+    handed out. When every connection is checked out, callers wait
+    up to `timeout` seconds for one to be released.
+
+    If `cursor_wrapper` is set, every cursor handed out by a pooled connection
+    is passed through it (the app uses this for query statistics, see
+    querystats.py).
+    """
+
+    def __init__(self, config, size=4, timeout=10, ping_after=30, connect=None):
+        self.config = config
+        self.connect_function = connect or mysql.connector.connect # connect(**config)
+        self.size = size
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self.cursor_wrapper = None # cursor_wrapper(cursor) -> cursor
+
+        self._idle = deque()  # (connection, last_used) pairs, most recent on the right
+        self._opened = 0
+        self._session_state = {}  # id(connection) -> dict, see PooledConnection.session_state
+        self._cond = threading.Condition()
+        self._counters = {'checkouts': 0, 'hits': 0, 'misses': 0, 'waits': 0, 'reconnects': 0, 'discarded': 0}
+
+    def connect(self):
+        """Checks out a connection; call close() on the result to return it."""
+        conn, last_used = self._checkout()
+        try:
+            self._ensure_alive(conn, last_used)
+        except mysql.connector.Error:
+            self._discard(conn)
+            raise
+        return PooledConnection(self, conn)
+
+    def _checkout(self):
+        with self._cond:
+            self._counters['checkouts'] += 1
+            waited = False
+            deadline = time.monotonic() + self.timeout
+            while True:
+                if self._idle:
+                    if not waited:
+                        self._counters['hits'] += 1
+                    return self._idle.pop()
+                if self._opened < self.size:
+                    self._opened += 1
+                    self._counters['misses'] += 1
+                    break
+                if not waited:
+                    self._counters['waits'] += 1
+                    waited = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise errors.PoolError(f"No connection available after waiting {self.timeout}s (pool size {self.size}).")
+                self._cond.wait(remaining)
+
+        # Open the new connection outside the lock so other callers are not blocked on the handshake.
+        try:
+            return self.connect_function(**self.config), None
+        except mysql.connector.Error:
+            with self._cond:
+                self._opened -= 1
+                self._cond.notify()
+            raise
+
+    def _ensure_alive(self, conn, last_used):
+        """Pings connections that have sat idle for a while, reconnecting stale ones."""
+        if last_used is None or time.monotonic() - last_used < self.ping_after:
+            return
+        try:
+            conn.ping(reconnect=False)
+        except mysql.connector.Error:
+            with self._cond:
+                self._session_state.pop(id(conn), None)
+            conn.reconnect(attempts=2, delay=0)
+            with self._cond:
+                self._counters['reconnects'] += 1
+
+    def release(self, conn):
+        """Returns a connection to the pool, rolling back anything left uncommitted."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except mysql.connector.Error:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except mysql.connector.Error:
+            pass
+        with self._cond:
+            self._opened -= 1
+            self._counters['discarded'] += 1
+            self._session_state.pop(id(conn), None)
+            self._cond.notify()
+
+    def _state_for(self, conn):
+        with self._cond:
+            return self._session_state.setdefault(id(conn), {})
+
+    def stats(self):
+        """Returns a snapshot of the pool counters."""
+        with self._cond:
+            snapshot = dict(self._counters)
+            snapshot['open'] = self._opened
+            snapshot['idle'] = len(self._idle)
+        return snapshot
+
+    def close_all(self):
+        """Closes every idle connection (used on application shutdown)."""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._opened -= len(idle)
+            for conn, _ in idle:
+                self._session_state.pop(id(conn), None)
+        for conn, _ in idle:
+            try:
+                conn.close()
+            except mysql.connector.Error:
+                pass
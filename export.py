@@ -0,0 +1,239 @@
+"""
+Streaming export of payments and attendance to CSV or Parquet (accounting extracts).
+
+Rows are read with an unbuffered cursor in chunks of --chunk-size and written
+out chunk by chunk (one Parquet row group per chunk), so memory use stays flat
+however many rows there are. The file is written under a temporary name and
+only renamed into place once the export is complete. Parquet needs pyarrow
+(`pip install pyarrow`); CSV has no extra dependencies.
+
+Usage:
+    python export.py payments payments.csv [--from 2024-01-01] [--to 2024-01-31]
+    python export.py attendance attendance-2024-01.parquet --month 2024-01
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import mysql.connector
+
+from db import open_connection
+
+CHUNK_SIZE = 10000
+FORMATS = ('csv', 'parquet')
+
+
+class ExportSource:
+    """
+    One exportable table and its archive: the SELECT (with a {table}
+    placeholder), the column the date range applies to, and its output columns.
+    """
+
+    def __init__(self, name, query, tables, date_column, order_by, columns):
+        self.name = name
+        self.query = query
+        self.tables = tables  # Archive first: archived rows all predate the recent ones
+        self.date_column = date_column
+        self.order_by = order_by
+        self.columns = columns  # [(header, Parquet type name)] in SELECT order
+
+    def statements(self, date_from=None, date_to=None):
+        """The export queries (one per table, in output order) and their params for an inclusive date range."""
+        return [self.statement(table, date_from, date_to) for table in self.tables]
+
+    def statement(self, table, date_from=None, date_to=None):
+        """The export query of one table and its params for an inclusive date range (either end may be open)."""
+        conditions, params = [], []
+        if date_from is not None:
+            conditions.append(f"{self.date_column} >= %s")
+            params.append(date_from)
+        if date_to is not None:
+            # < the next day, so DATETIME columns include the whole last day
+            conditions.append(f"{self.date_column} < %s")
+            params.append(date_to + timedelta(days=1))
+        query = self.query.format(table=table)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        return f"{query} ORDER BY {self.order_by}", tuple(params)
+
+
+SOURCES = {
+    # In idx_payment_date (idx_payment_archive_date) order, so a date range is read straight off the index without sorting
+    'payments': ExportSource(
+        'payments',
+        "SELECT Payment_ID, Mem_ID, amount, Payment_date, Payment_status FROM {table}",
+        tables=('Payment_Archive', 'Payment'), date_column='Payment_date', order_by='Payment_date, Payment_ID',
+        columns=[('Payment_ID', 'int64'), ('Mem_ID', 'string'), ('amount', 'decimal'),
+                 ('Payment_date', 'date'), ('Payment_status', 'string')]),
+    'attendance': ExportSource(
+        'attendance',
+        "SELECT Attendance_ID, Mem_ID, check_in, check_out, TIMESTAMPDIFF(MINUTE, check_in, check_out) FROM {table}",
+        tables=('Attendance_Archive', 'Attendance'), date_column='check_in', order_by='Attendance_ID',
+        columns=[('Attendance_ID', 'int64'), ('Mem_ID', 'string'), ('check_in', 'timestamp'),
+                 ('check_out', 'timestamp'), ('duration_minutes', 'int64')]),
+}
+
+
+class ExportResult:
+    """Outcome of an export: row count, destination and throughput."""
+
+    def __init__(self, source, path):
+        self.source = source
+        self.path = path
+        self.rows = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        return f"Exported {self.rows} {self.source} rows to {self.path} ({self.elapsed:.2f}s, {self.rows_per_second:.0f} rows/s)."
+
+
+def format_for(path):
+    """'parquet' for a .parquet path, otherwise 'csv'."""
+    return 'parquet' if path.lower().endswith('.parquet') else 'csv'
+
+
+def export_table(conn, source, path, fmt=None, date_from=None, date_to=None, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Streams one of the SOURCES ('payments' or 'attendance'), archived rows
+    included, into a CSV or Parquet file, optionally limited to an inclusive
+    date range. The archived rows come first, each part in the source's order.
+
+    `progress(rows)` is called after every chunk. Bad arguments (unknown source
+    or format, missing pyarrow) raise ValueError before anything is read; on
+    any error the destination file is left untouched.
+    """
+    if source not in SOURCES:
+        raise ValueError(f"Unknown export {source!r} (expected one of: {', '.join(SOURCES)})")
+    fmt = fmt or format_for(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r} (expected csv or parquet)")
+    spec = SOURCES[source]
+    writer_class = _ParquetWriter if fmt == 'parquet' else _CSVWriter
+    writer = writer_class(path + '.part', spec.columns)
+
+    result = ExportResult(source, path)
+    started = time.perf_counter()
+    try:
+        # Archived rows, then recent ones. Both are read in the same transaction, so
+        # (under InnoDB's repeatable read) a batch archived in between is neither
+        # missed nor exported twice.
+        for query, params in spec.statements(date_from, date_to):
+            # Unbuffered: rows arrive as they are fetched instead of the whole result up front
+            cursor = conn.cursor(buffered=False)
+            try:
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    writer.write(rows)
+                    result.rows += len(rows)
+                    if progress:
+                        progress(result.rows)
+            finally:
+                try:
+                    cursor.close()
+                except mysql.connector.Error:
+                    pass # Rows left unread after a failure; the pool discards the connection
+        writer.close()
+    except BaseException:
+        writer.discard()
+        raise
+
+    os.replace(path + '.part', path)
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+class _CSVWriter:
+    def __init__(self, path, columns):
+        self.path = path
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([name for (name, _) in columns])
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+    def discard(self):
+        self._file.close()
+        os.remove(self.path)
+
+
+class _ParquetWriter:
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet export needs pyarrow (pip install pyarrow); CSV works without it.") from None
+        types = {'int64': pa.int64(), 'string': pa.string(), 'decimal': pa.decimal128(8, 2),
+                 'date': pa.date32(), 'timestamp': pa.timestamp('us')}
+        self._pa = pa
+        self.path = path
+        self._schema = pa.schema([(name, types[kind]) for (name, kind) in columns])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows):
+        arrays = [self._pa.array(values, type=field.type) for values, field in zip(zip(*rows), self._schema)]
+        self._writer.write_batch(self._pa.RecordBatch.from_arrays(arrays, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+    def discard(self):
+        try:
+            self._writer.close()
+        finally:
+            os.remove(self.path)
+
+
+def parse_date(text):
+    return datetime.strptime(text, '%Y-%m-%d').date()
+
+
+def month_range(text):
+    """(first day, last day) of a YYYY-MM month."""
+    first = datetime.strptime(text, '%Y-%m').date()
+    next_month = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+    return first, next_month - timedelta(days=1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export payments or attendance to CSV or Parquet.")
+    parser.add_argument('source', choices=sorted(SOURCES))
+    parser.add_argument('path', help="Output file; .parquet writes Parquet, anything else CSV")
+    parser.add_argument('--from', dest='date_from', type=parse_date, help="First day to include (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='date_to', type=parse_date, help="Last day to include (YYYY-MM-DD)")
+    parser.add_argument('--month', type=month_range, help="Shorthand for --from/--to covering one month (YYYY-MM)")
+    parser.add_argument('--format', choices=FORMATS, help="Override the format implied by the file name")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+    if args.month:
+        args.date_from, args.date_to = args.month
+
+    conn = open_connection()
+    try:
+        result = export_table(conn, args.source, args.path, args.format, args.date_from, args.date_to, args.chunk_size,
+                              progress=lambda rows: print(f"  {rows} rows", file=sys.stderr))
+    except ValueError as err:
+        parser.error(str(err))
+    finally:
+        conn.close()
+
+    print(result.summary())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -16,6 +16,15 @@ DROP TABLE IF EXISTS Workout_Plan;
 DROP TABLE IF EXISTS Member;
 DROP TABLE IF EXISTS Trainers;
 DROP TABLE IF EXISTS Exercises;
+DROP TABLE IF EXISTS Sync_Watermark;
+DROP TABLE IF EXISTS Maintenance_Run;
+DROP TABLE IF EXISTS Occupancy_Hourly;
+DROP TABLE IF EXISTS Occupancy_Daily;
+DROP TABLE IF EXISTS Rollup_Watermark;
+DROP TABLE IF EXISTS Rollup_Open_Session;
+DROP TABLE IF EXISTS Change_Log;
+DROP TABLE IF EXISTS Payment_Archive;
+DROP TABLE IF EXISTS Attendance_Archive;
 
 -- Re-enable foreign key checks
 SET FOREIGN_KEY_CHECKS = 1;
@@ -49,7 +58,19 @@ CREATE TABLE Member (
     Phone_no VARCHAR(15) UNIQUE,
     Join_date DATE NOT NULL,
     Age INT,
-    Member_Status VARCHAR(20) DEFAULT 'Inactive' -- Can be 'Active' or 'Inactive'
+    Member_Status VARCHAR(20) DEFAULT 'Inactive', -- Can be 'Active' or 'Inactive'
+    Valid_until DATE, -- Membership expiry (last payment + 31 days), kept current by the Payment triggers
+    -- Payment ledger summary, also kept current by the Payment triggers (checked by maintenance.py)
+    Total_paid DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    Payment_count INT NOT NULL DEFAULT 0,
+    First_payment DATE,
+    Last_payment DATE,
+    -- Memberships running out between two status syncs (SyncMemberStatuses)
+    INDEX idx_member_valid_until (Valid_until),
+    -- Name prefix search in the Members and Payments tabs (Mem_ID and Phone_no are indexed already)
+    INDEX idx_member_name (Name),
+    -- Members tab sorted by Total Paid (keyset pages on Total_paid, Mem_ID)
+    INDEX idx_member_total_paid (Total_paid, Mem_ID)
 );
 
 -- Workout Plan Table: Links a member to a trainer for a specific plan.
@@ -70,7 +91,11 @@ CREATE TABLE Payment (
     amount DECIMAL(8, 2) NOT NULL,
     Payment_date DATE NOT NULL,
     Payment_status VARCHAR(20) DEFAULT 'Completed',
-    FOREIGN KEY (Mem_ID) REFERENCES Member(Mem_ID) ON DELETE CASCADE
+    FOREIGN KEY (Mem_ID) REFERENCES Member(Mem_ID) ON DELETE CASCADE,
+    -- Latest payment per member (PreventInactiveMemberCheckin, UpdateAllMemberStatuses)
+    INDEX idx_payment_member_date (Mem_ID, Payment_date),
+    -- Date range filter in the Payments tab
+    INDEX idx_payment_date (Payment_date)
 );
 
 -- Attendance Table: Logs member check-in and check-out times.
@@ -79,7 +104,11 @@ CREATE TABLE Attendance (
     Mem_ID VARCHAR(20) NOT NULL,
     check_in DATETIME NOT NULL,
     check_out DATETIME,
-    FOREIGN KEY (Mem_ID) REFERENCES Member(Mem_ID) ON DELETE CASCADE
+    FOREIGN KEY (Mem_ID) REFERENCES Member(Mem_ID) ON DELETE CASCADE,
+    -- A member's open session, newest first (check-out)
+    INDEX idx_attendance_member_open (Mem_ID, check_out, check_in),
+    -- Everyone currently checked in (Check-In/Out tab)
+    INDEX idx_attendance_open (check_out)
 );
 
 -- Plan_Exercises Linking Table: Defines which exercises are in which plan.
@@ -92,6 +121,100 @@ CREATE TABLE Plan_Exercises (
     FOREIGN KEY (Exercise_ID) REFERENCES Exercises(Exercise_ID) ON DELETE CASCADE
 );
 
+-- Sync_Watermark Table: How far each incremental background job has got.
+CREATE TABLE Sync_Watermark (
+    Sync_Name VARCHAR(50) PRIMARY KEY,
+    Synced_through DATE NOT NULL
+);
+
+-- Maintenance_Run Table: History of scheduled maintenance runs (see maintenance.py).
+CREATE TABLE Maintenance_Run (
+    Run_ID INT PRIMARY KEY AUTO_INCREMENT,
+    Task VARCHAR(50) NOT NULL,
+    Started_at DATETIME NOT NULL,
+    Finished_at DATETIME NOT NULL,
+    Duration_ms INT NOT NULL,
+    Rows_affected INT NOT NULL DEFAULT 0,
+    Status VARCHAR(20) NOT NULL, -- 'OK' or 'Failed'
+    Message VARCHAR(255)
+);
+
+-- Occupancy_Hourly / Occupancy_Daily Tables: Check-ins and time spent on the floor per
+-- hour and per day, rolled up incrementally from Attendance (see occupancy.py).
+-- Occupied_seconds / 3600 is the average number of people in the gym over the hour.
+CREATE TABLE Occupancy_Hourly (
+    Hour_start DATETIME PRIMARY KEY,
+    Check_ins INT NOT NULL DEFAULT 0,
+    Occupied_seconds INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE Occupancy_Daily (
+    Day DATE PRIMARY KEY,
+    Check_ins INT NOT NULL DEFAULT 0,
+    Occupied_seconds BIGINT NOT NULL DEFAULT 0
+);
+
+-- Rollup_Watermark Table: Highest Attendance_ID each rollup has processed.
+CREATE TABLE Rollup_Watermark (
+    Rollup_Name VARCHAR(50) PRIMARY KEY,
+    Last_ID INT NOT NULL
+);
+
+-- Rollup_Open_Session Table: Sessions still open when the rollup reached them; added once checked out.
+CREATE TABLE Rollup_Open_Session (
+    Attendance_ID INT PRIMARY KEY
+);
+
+-- Payment_Archive / Attendance_Archive Tables: Closed periods moved out of Payment and
+-- Attendance by archive.py, so the tables the door check, the lists and the triggers
+-- work on only hold recent history. Same columns; the ids are kept (AUTO_INCREMENT
+-- counters are persisted from MySQL 8.0, so they are never handed out again).
+CREATE TABLE Payment_Archive (
+    Payment_ID INT PRIMARY KEY,
+    Mem_ID VARCHAR(20) NOT NULL,
+    amount DECIMAL(8, 2) NOT NULL,
+    Payment_date DATE NOT NULL,
+    Payment_status VARCHAR(20) DEFAULT 'Completed',
+    FOREIGN KEY (Mem_ID) REFERENCES Member(Mem_ID) ON DELETE CASCADE,
+    INDEX idx_payment_archive_member_date (Mem_ID, Payment_date),
+    INDEX idx_payment_archive_date (Payment_date)
+);
+
+CREATE TABLE Attendance_Archive (
+    Attendance_ID INT PRIMARY KEY,
+    Mem_ID VARCHAR(20) NOT NULL,
+    check_in DATETIME NOT NULL,
+    check_out DATETIME NOT NULL,
+    FOREIGN KEY (Mem_ID) REFERENCES Member(Mem_ID) ON DELETE CASCADE,
+    -- A member's visit history (member details)
+    INDEX idx_attendance_archive_member (Mem_ID, check_in)
+);
+
+-- Payment_History / Attendance_History Views: Recent and archived rows together.
+CREATE OR REPLACE VIEW Payment_History AS
+    SELECT Payment_ID, Mem_ID, amount, Payment_date, Payment_status FROM Payment
+    UNION ALL
+    SELECT Payment_ID, Mem_ID, amount, Payment_date, Payment_status FROM Payment_Archive;
+
+CREATE OR REPLACE VIEW Attendance_History AS
+    SELECT Attendance_ID, Mem_ID, check_in, check_out FROM Attendance
+    UNION ALL
+    SELECT Attendance_ID, Mem_ID, check_in, check_out FROM Attendance_Archive;
+
+-- Change_Log Table: One entry per row inserted, updated or deleted in Member, Payment,
+-- Attendance and Workout_Plan, written by the Log* triggers, so each desk can pick up
+-- the changes made at the others by reading the entries past the last Change_ID it has
+-- seen (changefeed.py). Entries older than a day are pruned by maintenance.py.
+CREATE TABLE Change_Log (
+    Change_ID BIGINT PRIMARY KEY AUTO_INCREMENT,
+    Table_name VARCHAR(20) NOT NULL,
+    Row_key VARCHAR(20) NOT NULL,
+    Operation CHAR(1) NOT NULL, -- 'I'nsert, 'U'pdate or 'D'elete
+    Changed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    -- Pruning
+    INDEX idx_change_log_changed_at (Changed_at)
+);
+
 
 -- ====================================================================
 -- SECTION 3: SAMPLE DATA (WITH UPDATED DATES)
@@ -185,78 +308,289 @@ END$$
 DELIMITER ;
 
 -- Function 2: Get the total sum of payments for a specific member.
+-- Reads the ledger summary the Payment triggers keep on the Member row, so it is
+-- a primary-key lookup however many payments the member has made.
 DROP FUNCTION IF EXISTS GetTotalMemberPayments;
 DELIMITER $$
 CREATE FUNCTION GetTotalMemberPayments(p_mem_id VARCHAR(20))
-RETURNS DECIMAL(10, 2)
-DETERMINISTIC
+RETURNS DECIMAL(12, 2)
+READS SQL DATA
 BEGIN
-    DECLARE v_total_payment DECIMAL(10, 2);
+    DECLARE v_total_payment DECIMAL(12, 2);
 
-    SELECT SUM(amount) INTO v_total_payment
-    FROM Payment
+    SELECT Total_paid INTO v_total_payment
+    FROM Member
     WHERE Mem_ID = p_mem_id;
 
     RETURN IFNULL(v_total_payment, 0.00);
 END$$
 DELIMITER ;
 
+-- Function 3: The date a payment made on p_payment_date keeps the membership valid until.
+DROP FUNCTION IF EXISTS MembershipValidUntil;
+DELIMITER $$
+CREATE FUNCTION MembershipValidUntil(p_payment_date DATE)
+RETURNS DATE
+DETERMINISTIC
+BEGIN
+    RETURN DATE_ADD(p_payment_date, INTERVAL 31 DAY);
+END$$
+DELIMITER ;
+
 
 -- ====================================================================
 -- SECTION 5: TRIGGERS AND PROCEDURES
 -- ====================================================================
 
--- Trigger 1: Instantly marks a member as 'Active' right after a payment is inserted.
+-- Stored Procedure 3 (defined first, as the triggers below call it): Recomputes one
+-- member's ledger summary, Valid_until and status from their whole payment history,
+-- recent and archived, for the Payment delete and update triggers and the ledger
+-- check. Both halves are lookups on the member's (Mem_ID, Payment_date) index.
+DROP PROCEDURE IF EXISTS RecomputeMemberLedger;
+DELIMITER $$
+CREATE PROCEDURE RecomputeMemberLedger(IN p_mem_id VARCHAR(20))
+BEGIN
+    UPDATE Member m JOIN (
+        SELECT COALESCE(SUM(amount), 0) AS total_paid, COUNT(*) AS payment_count,
+               MIN(Payment_date) AS first_payment, MAX(Payment_date) AS last_payment
+        FROM (
+            SELECT amount, Payment_date FROM Payment WHERE Mem_ID = p_mem_id
+            UNION ALL
+            SELECT amount, Payment_date FROM Payment_Archive WHERE Mem_ID = p_mem_id
+        ) AS h
+    ) AS p
+    SET m.Total_paid = p.total_paid, m.Payment_count = p.payment_count,
+        m.First_payment = p.first_payment, m.Last_payment = p.last_payment,
+        m.Valid_until = MembershipValidUntil(p.last_payment),
+        m.Member_Status = IF(MembershipValidUntil(p.last_payment) >= CURDATE(), 'Active', 'Inactive')
+    WHERE m.Mem_ID = p_mem_id;
+END$$
+DELIMITER ;
+
+-- Trigger 1: Adds the payment to the member's ledger summary (Total_paid,
+-- Payment_count, First/Last_payment), extends Valid_until, and instantly marks
+-- the member 'Active' if that makes the membership valid today.
+-- Like every status write below, the status is derived from Valid_until, so the
+-- only thing that can make it stale is time passing (see SyncMemberStatuses).
+-- Bulk loaders can SET @defer_member_status = 1 to skip the per-row update and
+-- sync the affected members with one set-based UPDATE per batch instead
+-- (see payment_import.py).
 DROP TRIGGER IF EXISTS AfterPaymentInsert;
 DELIMITER $$
 CREATE TRIGGER AfterPaymentInsert
 AFTER INSERT ON Payment
 FOR EACH ROW
 BEGIN
-    UPDATE Member
-    SET Member_Status = 'Active'
-    WHERE Mem_ID = NEW.Mem_ID;
+    DECLARE v_valid_until DATE DEFAULT MembershipValidUntil(NEW.Payment_date);
+
+    IF COALESCE(@defer_member_status, 0) = 0 THEN
+        -- Single-table UPDATE assigns left to right, so the status sees the new Valid_until
+        UPDATE Member
+        SET Total_paid = Total_paid + NEW.amount,
+            Payment_count = Payment_count + 1,
+            First_payment = LEAST(COALESCE(First_payment, NEW.Payment_date), NEW.Payment_date),
+            Last_payment = GREATEST(COALESCE(Last_payment, NEW.Payment_date), NEW.Payment_date),
+            Valid_until = GREATEST(COALESCE(Valid_until, v_valid_until), v_valid_until),
+            Member_Status = IF(Valid_until >= CURDATE(), 'Active', 'Inactive')
+        WHERE Mem_ID = NEW.Mem_ID;
+    END IF;
+END$$
+DELIMITER ;
+
+-- Trigger 1b: Takes a deleted payment back out of the ledger summary, and pulls
+-- Valid_until (and the status) back when it was based on that payment.
+-- Payments moved to Payment_Archive by archive.py (which sets @archiving = 1)
+-- are still part of the member's history, so they are left alone.
+DROP TRIGGER IF EXISTS AfterPaymentDelete;
+DELIMITER $$
+CREATE TRIGGER AfterPaymentDelete
+AFTER DELETE ON Payment
+FOR EACH ROW
+BEGIN
+    IF COALESCE(@archiving, 0) = 0 THEN
+        CALL RecomputeMemberLedger(OLD.Mem_ID);
+    END IF;
+END$$
+DELIMITER ;
+
+-- Trigger 1c: Recomputes the ledger summary and Valid_until when a payment is
+-- moved to another date or member or its amount is corrected.
+DROP TRIGGER IF EXISTS AfterPaymentUpdate;
+DELIMITER $$
+CREATE TRIGGER AfterPaymentUpdate
+AFTER UPDATE ON Payment
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.Mem_ID <=> NEW.Mem_ID AND OLD.Payment_date <=> NEW.Payment_date AND OLD.amount <=> NEW.amount) THEN
+        CALL RecomputeMemberLedger(OLD.Mem_ID);
+        IF NOT (OLD.Mem_ID <=> NEW.Mem_ID) THEN
+            CALL RecomputeMemberLedger(NEW.Mem_ID);
+        END IF;
+    END IF;
 END$$
 DELIMITER ;
 
 -- Trigger 2: Prevents check-in if membership is expired.
+-- A single primary-key lookup, however long the member's payment history is.
 DROP TRIGGER IF EXISTS PreventInactiveMemberCheckin;
 DELIMITER $$
 CREATE TRIGGER PreventInactiveMemberCheckin
 BEFORE INSERT ON Attendance
 FOR EACH ROW
 BEGIN
-    DECLARE v_last_payment_date DATE;
+    DECLARE v_valid_until DATE;
 
-    SELECT MAX(Payment_date) INTO v_last_payment_date
-    FROM Payment
+    SELECT Valid_until INTO v_valid_until
+    FROM Member
     WHERE Mem_ID = NEW.Mem_ID;
 
-    IF v_last_payment_date IS NULL OR v_last_payment_date < DATE_SUB(CURDATE(), INTERVAL 31 DAY) THEN
+    IF v_valid_until IS NULL OR v_valid_until < CURDATE() THEN
         SIGNAL SQLSTATE '45000'
         SET MESSAGE_TEXT = 'Check-in failed: Membership is expired. Please make a payment.';
     END IF;
 END$$
 DELIMITER ;
 
--- Stored Procedure 1: Updates the status for ALL members based on their last payment.
+-- Triggers 3a-3d: Record every change to Member, Payment, Attendance and Workout_Plan
+-- in Change_Log for the change feed (changefeed.py). Member updates are only recorded
+-- when something the desks show changed, so a no-op status resync adds nothing.
+DROP TRIGGER IF EXISTS LogMemberInsert;
+CREATE TRIGGER LogMemberInsert AFTER INSERT ON Member FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Member', NEW.Mem_ID, 'I');
+
+DROP TRIGGER IF EXISTS LogMemberUpdate;
+DELIMITER $$
+CREATE TRIGGER LogMemberUpdate
+AFTER UPDATE ON Member
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.Mem_ID <=> NEW.Mem_ID AND OLD.Name <=> NEW.Name AND OLD.Phone_no <=> NEW.Phone_no
+            AND OLD.Join_date <=> NEW.Join_date AND OLD.Age <=> NEW.Age AND OLD.Member_Status <=> NEW.Member_Status
+            AND OLD.Valid_until <=> NEW.Valid_until AND OLD.Total_paid <=> NEW.Total_paid) THEN
+        INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Member', NEW.Mem_ID, 'U');
+    END IF;
+END$$
+DELIMITER ;
+
+-- Foreign key cascades do not fire triggers in MySQL, so the payments, visits and plans
+-- a member's deletion takes with it are recorded here, before the cascade runs.
+DROP TRIGGER IF EXISTS LogMemberDelete;
+DELIMITER $$
+CREATE TRIGGER LogMemberDelete
+BEFORE DELETE ON Member
+FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Log (Table_name, Row_key, Operation)
+        SELECT 'Payment', Payment_ID, 'D' FROM Payment WHERE Mem_ID = OLD.Mem_ID;
+    INSERT INTO Change_Log (Table_name, Row_key, Operation)
+        SELECT 'Attendance', Attendance_ID, 'D' FROM Attendance WHERE Mem_ID = OLD.Mem_ID;
+    INSERT INTO Change_Log (Table_name, Row_key, Operation)
+        SELECT 'Workout_Plan', Plan_ID, 'D' FROM Workout_Plan WHERE Mem_ID = OLD.Mem_ID;
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Member', OLD.Mem_ID, 'D');
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS LogPaymentInsert;
+CREATE TRIGGER LogPaymentInsert AFTER INSERT ON Payment FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Payment', NEW.Payment_ID, 'I');
+
+DROP TRIGGER IF EXISTS LogPaymentUpdate;
+CREATE TRIGGER LogPaymentUpdate AFTER UPDATE ON Payment FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Payment', NEW.Payment_ID, 'U');
+
+DROP TRIGGER IF EXISTS LogPaymentDelete;
+CREATE TRIGGER LogPaymentDelete AFTER DELETE ON Payment FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Payment', OLD.Payment_ID, 'D');
+
+DROP TRIGGER IF EXISTS LogAttendanceInsert;
+CREATE TRIGGER LogAttendanceInsert AFTER INSERT ON Attendance FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Attendance', NEW.Attendance_ID, 'I');
+
+DROP TRIGGER IF EXISTS LogAttendanceUpdate;
+CREATE TRIGGER LogAttendanceUpdate AFTER UPDATE ON Attendance FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Attendance', NEW.Attendance_ID, 'U');
+
+DROP TRIGGER IF EXISTS LogAttendanceDelete;
+CREATE TRIGGER LogAttendanceDelete AFTER DELETE ON Attendance FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Attendance', OLD.Attendance_ID, 'D');
+
+DROP TRIGGER IF EXISTS LogWorkoutPlanInsert;
+CREATE TRIGGER LogWorkoutPlanInsert AFTER INSERT ON Workout_Plan FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Workout_Plan', NEW.Plan_ID, 'I');
+
+DROP TRIGGER IF EXISTS LogWorkoutPlanUpdate;
+CREATE TRIGGER LogWorkoutPlanUpdate AFTER UPDATE ON Workout_Plan FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Workout_Plan', NEW.Plan_ID, 'U');
+
+DROP TRIGGER IF EXISTS LogWorkoutPlanDelete;
+CREATE TRIGGER LogWorkoutPlanDelete AFTER DELETE ON Workout_Plan FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Workout_Plan', OLD.Plan_ID, 'D');
+
+-- Deleting a trainer cascades to their plans, which are recorded here for the same reason
+DROP TRIGGER IF EXISTS LogTrainerDelete;
+CREATE TRIGGER LogTrainerDelete BEFORE DELETE ON Trainers FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation)
+        SELECT 'Workout_Plan', Plan_ID, 'D' FROM Workout_Plan WHERE Trainer_ID = OLD.Trainer_ID;
+
+-- Stored Procedure 1: Updates the status for ALL members based on their Valid_until date.
+-- A full resync; the app normally runs the incremental SyncMemberStatuses instead.
 DROP PROCEDURE IF EXISTS UpdateAllMemberStatuses;
 DELIMITER $$
 CREATE PROCEDURE UpdateAllMemberStatuses()
 BEGIN
-    -- Set members with a recent payment to 'Active'
-    UPDATE Member m JOIN (
-        SELECT Mem_ID, MAX(Payment_date) AS last_payment FROM Payment GROUP BY Mem_ID
-    ) AS p ON m.Mem_ID = p.Mem_ID
-    SET m.Member_Status = 'Active'
-    WHERE p.last_payment >= DATE_SUB(CURDATE(), INTERVAL 31 DAY);
-
-    -- Set all other members to 'Inactive'
-    UPDATE Member m LEFT JOIN (
-        SELECT Mem_ID, MAX(Payment_date) AS last_payment FROM Payment GROUP BY Mem_ID
-    ) AS p ON m.Mem_ID = p.Mem_ID
-    SET m.Member_Status = 'Inactive'
-    WHERE p.last_payment IS NULL OR p.last_payment < DATE_SUB(CURDATE(), INTERVAL 31 DAY);
+    -- Active while the membership is valid, 'Inactive' otherwise (or if never paid)
+    UPDATE Member
+    SET Member_Status = IF(Valid_until >= CURDATE(), 'Active', 'Inactive')
+    WHERE NOT (Member_Status <=> IF(Valid_until >= CURDATE(), 'Active', 'Inactive'));
+
+    INSERT INTO Sync_Watermark (Sync_Name, Synced_through) VALUES ('member_status', CURDATE())
+    ON DUPLICATE KEY UPDATE Synced_through = CURDATE();
+END$$
+DELIMITER ;
+
+-- Stored Procedure 2: Incremental status sync. Statuses are derived from Valid_until
+-- whenever it is written, so since the last run only memberships whose Valid_until
+-- fell in [last run, today) can have expired. Returns the number of members changed.
+DROP PROCEDURE IF EXISTS SyncMemberStatuses;
+DELIMITER $$
+CREATE PROCEDURE SyncMemberStatuses(OUT p_changed INT)
+BEGIN
+    DECLARE v_synced_through DATE;
+
+    SELECT Synced_through INTO v_synced_through
+    FROM Sync_Watermark
+    WHERE Sync_Name = 'member_status'
+    FOR UPDATE;
+
+    IF v_synced_through IS NULL THEN
+        -- Never synced: one full pass
+        UPDATE Member
+        SET Member_Status = IF(Valid_until >= CURDATE(), 'Active', 'Inactive')
+        WHERE NOT (Member_Status <=> IF(Valid_until >= CURDATE(), 'Active', 'Inactive'));
+        SET p_changed = ROW_COUNT();
+    ELSE
+        -- Range scan on idx_member_valid_until
+        UPDATE Member
+        SET Member_Status = 'Inactive'
+        WHERE Valid_until >= v_synced_through AND Valid_until < CURDATE()
+          AND NOT (Member_Status <=> 'Inactive');
+        SET p_changed = ROW_COUNT();
+    END IF;
+
+    INSERT INTO Sync_Watermark (Sync_Name, Synced_through) VALUES ('member_status', CURDATE())
+    ON DUPLICATE KEY UPDATE Synced_through = CURDATE();
 END$$
 DELIMITER ;
 
+-- The sample data above was inserted before the Payment triggers existed.
+-- Backfill the ledger summary, Valid_until and the statuses derived from it.
+UPDATE Member m JOIN (
+    SELECT Mem_ID, SUM(amount) AS total_paid, COUNT(*) AS payment_count,
+           MIN(Payment_date) AS first_payment, MAX(Payment_date) AS last_payment
+    FROM Payment GROUP BY Mem_ID
+) AS p ON m.Mem_ID = p.Mem_ID
+SET m.Total_paid = p.total_paid, m.Payment_count = p.payment_count,
+    m.First_payment = p.first_payment, m.Last_payment = p.last_payment,
+    m.Valid_until = MembershipValidUntil(p.last_payment);
+CALL UpdateAllMemberStatuses();
+
@@ -0,0 +1,334 @@
+-- ====================================================================
+-- Embedded (SQLite) version of gym_management.sql, for DB_BACKEND = "sqlite".
+--
+-- sqlite_backend.py runs this automatically the first time it opens an empty
+-- database file, and again on files made by an older version of it (every
+-- statement is idempotent, and triggers are dropped and recreated), so there
+-- is no separate setup or migration step. Columns added to existing tables
+-- are added by sqlite_backend.SCHEMA_UPGRADES before this runs.
+-- It mirrors the MySQL schema, indexes and triggers. The MySQL functions are registered on every
+-- connection by sqlite_backend.py (MembershipValidUntil, CURDATE, ...), and
+-- the procedures are implemented there in Python (UpdateAllMemberStatuses,
+-- SyncMemberStatuses, RecomputeMemberLedger).
+-- ====================================================================
+
+BEGIN;
+
+-- ====================================================================
+-- SCHEMA (TABLE CREATION)
+-- ====================================================================
+
+CREATE TABLE IF NOT EXISTS Trainers (
+    Trainer_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Name VARCHAR(100) NOT NULL,
+    Salary DECIMAL(10, 2) NOT NULL,
+    Date_hired DATE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Exercises (
+    Exercise_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Exercise_name VARCHAR(100) NOT NULL UNIQUE,
+    equipment VARCHAR(100),
+    instruction TEXT
+);
+
+CREATE TABLE IF NOT EXISTS Member (
+    Mem_ID VARCHAR(20) PRIMARY KEY,
+    Name VARCHAR(100) NOT NULL,
+    Phone_no VARCHAR(15) UNIQUE,
+    Join_date DATE NOT NULL,
+    Age INT,
+    Member_Status VARCHAR(20) DEFAULT 'Inactive',
+    Valid_until DATE,
+    Total_paid DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    Payment_count INT NOT NULL DEFAULT 0,
+    First_payment DATE,
+    Last_payment DATE
+);
+CREATE INDEX IF NOT EXISTS idx_member_valid_until ON Member (Valid_until);
+-- Prefix searches (LIKE) only use an index with SQLite's case-insensitive collation
+CREATE INDEX IF NOT EXISTS idx_member_name ON Member (Name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_member_id_search ON Member (Mem_ID COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_member_phone_search ON Member (Phone_no COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_member_total_paid ON Member (Total_paid, Mem_ID);
+
+CREATE TABLE IF NOT EXISTS Workout_Plan (
+    Plan_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Mem_ID VARCHAR(20) NOT NULL,
+    Trainer_ID INT NOT NULL,
+    Start_date DATE NOT NULL,
+    End_date DATE,
+    FOREIGN KEY (Mem_ID) REFERENCES Member(Mem_ID) ON DELETE CASCADE,
+    FOREIGN KEY (Trainer_ID) REFERENCES Trainers(Trainer_ID) ON DELETE CASCADE
+);
+-- MySQL indexes foreign keys by itself; SQLite needs them spelled out for the cascades
+CREATE INDEX IF NOT EXISTS idx_workout_plan_member ON Workout_Plan (Mem_ID);
+CREATE INDEX IF NOT EXISTS idx_workout_plan_trainer ON Workout_Plan (Trainer_ID);
+
+CREATE TABLE IF NOT EXISTS Payment (
+    Payment_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Mem_ID VARCHAR(20) NOT NULL,
+    amount DECIMAL(8, 2) NOT NULL,
+    Payment_date DATE NOT NULL,
+    Payment_status VARCHAR(20) DEFAULT 'Completed',
+    FOREIGN KEY (Mem_ID) REFERENCES Member(Mem_ID) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_payment_member_date ON Payment (Mem_ID, Payment_date);
+CREATE INDEX IF NOT EXISTS idx_payment_date ON Payment (Payment_date);
+
+CREATE TABLE IF NOT EXISTS Attendance (
+    Attendance_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Mem_ID VARCHAR(20) NOT NULL,
+    check_in DATETIME NOT NULL,
+    check_out DATETIME,
+    FOREIGN KEY (Mem_ID) REFERENCES Member(Mem_ID) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_attendance_member_open ON Attendance (Mem_ID, check_out, check_in);
+CREATE INDEX IF NOT EXISTS idx_attendance_open ON Attendance (check_out);
+
+CREATE TABLE IF NOT EXISTS Plan_Exercises (
+    Plan_ID INT NOT NULL,
+    Exercise_ID INT NOT NULL,
+    reps_sets_info VARCHAR(50),
+    PRIMARY KEY (Plan_ID, Exercise_ID),
+    FOREIGN KEY (Plan_ID) REFERENCES Workout_Plan(Plan_ID) ON DELETE CASCADE,
+    FOREIGN KEY (Exercise_ID) REFERENCES Exercises(Exercise_ID) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_plan_exercises_exercise ON Plan_Exercises (Exercise_ID);
+
+CREATE TABLE IF NOT EXISTS Sync_Watermark (
+    Sync_Name VARCHAR(50) PRIMARY KEY,
+    Synced_through DATE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Maintenance_Run (
+    Run_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Task VARCHAR(50) NOT NULL,
+    Started_at DATETIME NOT NULL,
+    Finished_at DATETIME NOT NULL,
+    Duration_ms INT NOT NULL,
+    Rows_affected INT NOT NULL DEFAULT 0,
+    Status VARCHAR(20) NOT NULL,
+    Message VARCHAR(255)
+);
+
+CREATE TABLE IF NOT EXISTS Occupancy_Hourly (
+    Hour_start DATETIME PRIMARY KEY,
+    Check_ins INT NOT NULL DEFAULT 0,
+    Occupied_seconds INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS Occupancy_Daily (
+    Day DATE PRIMARY KEY,
+    Check_ins INT NOT NULL DEFAULT 0,
+    Occupied_seconds BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS Rollup_Watermark (
+    Rollup_Name VARCHAR(50) PRIMARY KEY,
+    Last_ID INT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Rollup_Open_Session (
+    Attendance_ID INTEGER PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS Payment_Archive (
+    Payment_ID INTEGER PRIMARY KEY,
+    Mem_ID VARCHAR(20) NOT NULL,
+    amount DECIMAL(8, 2) NOT NULL,
+    Payment_date DATE NOT NULL,
+    Payment_status VARCHAR(20) DEFAULT 'Completed',
+    FOREIGN KEY (Mem_ID) REFERENCES Member(Mem_ID) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_payment_archive_member_date ON Payment_Archive (Mem_ID, Payment_date);
+CREATE INDEX IF NOT EXISTS idx_payment_archive_date ON Payment_Archive (Payment_date);
+
+CREATE TABLE IF NOT EXISTS Attendance_Archive (
+    Attendance_ID INTEGER PRIMARY KEY,
+    Mem_ID VARCHAR(20) NOT NULL,
+    check_in DATETIME NOT NULL,
+    check_out DATETIME NOT NULL,
+    FOREIGN KEY (Mem_ID) REFERENCES Member(Mem_ID) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_attendance_archive_member ON Attendance_Archive (Mem_ID, check_in);
+
+-- SQLite pushes a WHERE on these down into both halves of the UNION ALL
+CREATE VIEW IF NOT EXISTS Payment_History AS
+    SELECT Payment_ID, Mem_ID, amount, Payment_date, Payment_status FROM Payment
+    UNION ALL
+    SELECT Payment_ID, Mem_ID, amount, Payment_date, Payment_status FROM Payment_Archive;
+
+CREATE VIEW IF NOT EXISTS Attendance_History AS
+    SELECT Attendance_ID, Mem_ID, check_in, check_out FROM Attendance
+    UNION ALL
+    SELECT Attendance_ID, Mem_ID, check_in, check_out FROM Attendance_Archive;
+
+-- Changed_at is written by the triggers with NOW() (local time, like MySQL's
+-- CURRENT_TIMESTAMP), as a column default cannot call it
+CREATE TABLE IF NOT EXISTS Change_Log (
+    Change_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Table_name VARCHAR(20) NOT NULL,
+    Row_key VARCHAR(20) NOT NULL,
+    Operation CHAR(1) NOT NULL,
+    Changed_at DATETIME NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_change_log_changed_at ON Change_Log (Changed_at);
+
+
+-- ====================================================================
+-- TRIGGERS
+-- SQLite evaluates every SET expression against the old row (MySQL assigns
+-- left to right), so the status repeats the new Valid_until expression.
+-- ====================================================================
+
+-- Trigger 1: see AfterPaymentInsert in gym_management.sql. Totals are rounded
+-- to cents, as SQLite adds DECIMALs as floating point.
+DROP TRIGGER IF EXISTS AfterPaymentInsert;
+CREATE TRIGGER AfterPaymentInsert
+AFTER INSERT ON Payment
+FOR EACH ROW
+WHEN COALESCE(session_variable('defer_member_status'), 0) = 0
+BEGIN
+    UPDATE Member
+    SET Total_paid = ROUND(Total_paid + NEW.amount, 2),
+        Payment_count = Payment_count + 1,
+        First_payment = MIN(COALESCE(First_payment, NEW.Payment_date), NEW.Payment_date),
+        Last_payment = MAX(COALESCE(Last_payment, NEW.Payment_date), NEW.Payment_date),
+        Valid_until = MAX(COALESCE(Valid_until, MembershipValidUntil(NEW.Payment_date)), MembershipValidUntil(NEW.Payment_date)),
+        Member_Status = IIF(MAX(COALESCE(Valid_until, MembershipValidUntil(NEW.Payment_date)), MembershipValidUntil(NEW.Payment_date)) >= CURDATE(),
+                            'Active', 'Inactive')
+    WHERE Mem_ID = NEW.Mem_ID;
+END;
+
+-- Trigger 1b: see AfterPaymentDelete in gym_management.sql. Both this and 1c
+-- do what the RecomputeMemberLedger procedure does there.
+DROP TRIGGER IF EXISTS AfterPaymentDelete;
+CREATE TRIGGER AfterPaymentDelete
+AFTER DELETE ON Payment
+FOR EACH ROW
+WHEN COALESCE(session_variable('archiving'), 0) = 0
+BEGIN
+    UPDATE Member
+    SET Total_paid = (SELECT COALESCE(ROUND(SUM(h.amount), 2), 0) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID),
+        Payment_count = (SELECT COUNT(*) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID),
+        First_payment = (SELECT MIN(h.Payment_date) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID),
+        Last_payment = (SELECT MAX(h.Payment_date) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID),
+        Valid_until = (SELECT MembershipValidUntil(MAX(h.Payment_date)) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID),
+        Member_Status = IIF((SELECT MembershipValidUntil(MAX(h.Payment_date)) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID) >= CURDATE(),
+                            'Active', 'Inactive')
+    WHERE Mem_ID = OLD.Mem_ID;
+END;
+
+-- Trigger 1c: see AfterPaymentUpdate in gym_management.sql.
+DROP TRIGGER IF EXISTS AfterPaymentUpdate;
+CREATE TRIGGER AfterPaymentUpdate
+AFTER UPDATE OF Mem_ID, Payment_date, amount ON Payment
+FOR EACH ROW
+WHEN OLD.Mem_ID IS NOT NEW.Mem_ID OR OLD.Payment_date IS NOT NEW.Payment_date OR OLD.amount IS NOT NEW.amount
+BEGIN
+    UPDATE Member
+    SET Total_paid = (SELECT COALESCE(ROUND(SUM(h.amount), 2), 0) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID),
+        Payment_count = (SELECT COUNT(*) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID),
+        First_payment = (SELECT MIN(h.Payment_date) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID),
+        Last_payment = (SELECT MAX(h.Payment_date) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID),
+        Valid_until = (SELECT MembershipValidUntil(MAX(h.Payment_date)) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID),
+        Member_Status = IIF((SELECT MembershipValidUntil(MAX(h.Payment_date)) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID) >= CURDATE(),
+                            'Active', 'Inactive')
+    WHERE Mem_ID IN (OLD.Mem_ID, NEW.Mem_ID);
+END;
+
+-- Trigger 2: see PreventInactiveMemberCheckin in gym_management.sql. RAISE(ABORT)
+-- is reported with SQLSTATE 45000, like the MySQL SIGNAL.
+DROP TRIGGER IF EXISTS PreventInactiveMemberCheckin;
+CREATE TRIGGER PreventInactiveMemberCheckin
+BEFORE INSERT ON Attendance
+FOR EACH ROW
+WHEN COALESCE((SELECT Valid_until FROM Member WHERE Mem_ID = NEW.Mem_ID), '') < CURDATE()
+BEGIN
+    SELECT RAISE(ABORT, 'Check-in failed: Membership is expired. Please make a payment.');
+END;
+
+-- Triggers 3a-3d: see the Log* triggers in gym_management.sql. Foreign key
+-- cascades fire triggers in SQLite, so a deleted member's payments, visits and
+-- plans (and a deleted trainer's plans) are recorded by their own triggers.
+DROP TRIGGER IF EXISTS LogMemberInsert;
+CREATE TRIGGER LogMemberInsert AFTER INSERT ON Member FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Log (Table_name, Row_key, Operation, Changed_at) VALUES ('Member', NEW.Mem_ID, 'I', NOW());
+END;
+
+DROP TRIGGER IF EXISTS LogMemberUpdate;
+CREATE TRIGGER LogMemberUpdate
+AFTER UPDATE ON Member
+FOR EACH ROW
+WHEN NOT (OLD.Mem_ID IS NEW.Mem_ID AND OLD.Name IS NEW.Name AND OLD.Phone_no IS NEW.Phone_no
+          AND OLD.Join_date IS NEW.Join_date AND OLD.Age IS NEW.Age AND OLD.Member_Status IS NEW.Member_Status
+          AND OLD.Valid_until IS NEW.Valid_until AND OLD.Total_paid IS NEW.Total_paid)
+BEGIN
+    INSERT INTO Change_Log (Table_name, Row_key, Operation, Changed_at) VALUES ('Member', NEW.Mem_ID, 'U', NOW());
+END;
+
+DROP TRIGGER IF EXISTS LogMemberDelete;
+CREATE TRIGGER LogMemberDelete AFTER DELETE ON Member FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Log (Table_name, Row_key, Operation, Changed_at) VALUES ('Member', OLD.Mem_ID, 'D', NOW());
+END;
+
+DROP TRIGGER IF EXISTS LogPaymentInsert;
+CREATE TRIGGER LogPaymentInsert AFTER INSERT ON Payment FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Log (Table_name, Row_key, Operation, Changed_at) VALUES ('Payment', NEW.Payment_ID, 'I', NOW());
+END;
+
+DROP TRIGGER IF EXISTS LogPaymentUpdate;
+CREATE TRIGGER LogPaymentUpdate AFTER UPDATE ON Payment FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Log (Table_name, Row_key, Operation, Changed_at) VALUES ('Payment', NEW.Payment_ID, 'U', NOW());
+END;
+
+DROP TRIGGER IF EXISTS LogPaymentDelete;
+CREATE TRIGGER LogPaymentDelete AFTER DELETE ON Payment FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Log (Table_name, Row_key, Operation, Changed_at) VALUES ('Payment', OLD.Payment_ID, 'D', NOW());
+END;
+
+DROP TRIGGER IF EXISTS LogAttendanceInsert;
+CREATE TRIGGER LogAttendanceInsert AFTER INSERT ON Attendance FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Log (Table_name, Row_key, Operation, Changed_at) VALUES ('Attendance', NEW.Attendance_ID, 'I', NOW());
+END;
+
+DROP TRIGGER IF EXISTS LogAttendanceUpdate;
+CREATE TRIGGER LogAttendanceUpdate AFTER UPDATE ON Attendance FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Log (Table_name, Row_key, Operation, Changed_at) VALUES ('Attendance', NEW.Attendance_ID, 'U', NOW());
+END;
+
+DROP TRIGGER IF EXISTS LogAttendanceDelete;
+CREATE TRIGGER LogAttendanceDelete AFTER DELETE ON Attendance FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Log (Table_name, Row_key, Operation, Changed_at) VALUES ('Attendance', OLD.Attendance_ID, 'D', NOW());
+END;
+
+DROP TRIGGER IF EXISTS LogWorkoutPlanInsert;
+CREATE TRIGGER LogWorkoutPlanInsert AFTER INSERT ON Workout_Plan FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Log (Table_name, Row_key, Operation, Changed_at) VALUES ('Workout_Plan', NEW.Plan_ID, 'I', NOW());
+END;
+
+DROP TRIGGER IF EXISTS LogWorkoutPlanUpdate;
+CREATE TRIGGER LogWorkoutPlanUpdate AFTER UPDATE ON Workout_Plan FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Log (Table_name, Row_key, Operation, Changed_at) VALUES ('Workout_Plan', NEW.Plan_ID, 'U', NOW());
+END;
+
+DROP TRIGGER IF EXISTS LogWorkoutPlanDelete;
+CREATE TRIGGER LogWorkoutPlanDelete AFTER DELETE ON Workout_Plan FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Log (Table_name, Row_key, Operation, Changed_at) VALUES ('Workout_Plan', OLD.Plan_ID, 'D', NOW());
+END;
+
+PRAGMA user_version = 6;
+
+COMMIT;
@@ -0,0 +1,118 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobExecutor:
+    """
+    Runs blocking work on a small thread pool and hands results back to Tk.
+
+    Worker threads never touch widgets: finished jobs are queued and drained on
+    the Tk main loop with `after()`, where the success/error callbacks run.
+    Jobs submitted with a `key` are coalesced: while a job with that key is
+    queued or running, further submissions only mark it dirty, and it is re-run
+    once more when it finishes so the UI ends up showing the latest data.
+    `on_busy_change(busy)` is told when the first job starts and the last one
+    finishes; `quiet` jobs (background polling) do not count.
+    """
+
+    def __init__(self, root, workers=4, poll_ms=30, on_busy_change=None):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.on_busy_change = on_busy_change
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='db-job')
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._keyed = {}  # key -> latest (work, on_success, on_error, quiet) waiting to re-run, or None
+        self._outstanding = 0
+        self._outstanding_busy = 0  # Of those, the ones that are not quiet
+        self._polling = False
+        self._closed = False
+
+    def submit(self, work, on_success=None, on_error=None, key=None, quiet=False):
+        """Schedules work() off the main thread; callbacks run on the Tk thread."""
+        if self._closed:
+            return
+        if key is not None:
+            with self._lock:
+                if key in self._keyed:
+                    # Already queued or running: remember the newest request and run it once afterwards.
+                    self._keyed[key] = (work, on_success, on_error, quiet)
+                    return
+                self._keyed[key] = None
+        self._start(work, on_success, on_error, quiet, key)
+
+    def _start(self, work, on_success, on_error, quiet, key):
+        self._outstanding += 1
+        if not quiet:
+            self._outstanding_busy += 1
+            if self._outstanding_busy == 1:
+                self._notify_busy(True)
+        self._executor.submit(self._run, work, on_success, on_error, quiet, key)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._drain)
+
+    def _run(self, work, on_success, on_error, quiet, key):
+        try:
+            result = work()
+        except Exception as err:
+            self._results.put((False, err, on_success, on_error, quiet, key))
+        else:
+            self._results.put((True, result, on_success, on_error, quiet, key))
+
+    def _drain(self):
+        """Delivers finished jobs to their callbacks on the Tk thread."""
+        if self._closed:
+            return
+        while True:
+            try:
+                ok, value, on_success, on_error, quiet, key = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding -= 1
+            try:
+                if ok:
+                    if on_success:
+                        on_success(value)
+                elif on_error:
+                    on_error(value)
+                else:
+                    raise value
+            except Exception as err:
+                # Keep draining: one failing callback must not stall every other job.
+                self.root.report_callback_exception(type(err), err, err.__traceback__)
+            finally:
+                if key is not None:
+                    self._finish_keyed(key)
+                if not quiet:
+                    self._outstanding_busy -= 1
+                    if not self._outstanding_busy:
+                        self._notify_busy(False)
+
+        if self._outstanding:
+            self.root.after(self.poll_ms, self._drain)
+        else:
+            self._polling = False
+
+    def _finish_keyed(self, key):
+        with self._lock:
+            rerun = self._keyed.pop(key, None)
+            if rerun is not None:
+                self._keyed[key] = None
+        if rerun is not None:
+            self._start(*rerun, key)
+
+    def _notify_busy(self, busy):
+        if self.on_busy_change:
+            self.on_busy_change(busy)
+
+    @property
+    def busy(self):
+        return self._outstanding > 0
+
+    def shutdown(self):
+        """Stops accepting work; jobs already running are allowed to finish."""
+        self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,99 @@
+from operator import itemgetter
+
+
+def sync_rows(tree, shown, wanted, format_row):
+    """
+    Makes `tree` show the `wanted` rows ({iid: raw row}, in display order),
+    given the rows it shows now (`shown`, same form; the tree must hold exactly
+    those items). Rows that are gone are deleted, new ones inserted, rows out
+    of place moved, and only rows whose data changed are formatted again
+    (`format_row(row)` returns (values, tags)). Selection and focus stay on
+    the rows that remain.
+    """
+    stale = [iid for iid in shown if iid not in wanted]
+    if stale:
+        tree.delete(*stale)
+    remaining = [iid for iid in shown if iid in wanted]  # Their order in the tree
+    moved = set()
+    position = 0
+    for index, (iid, row) in enumerate(wanted.items()):
+        # The first `index` items already are wanted[:index]; the rest of the
+        # tree is `remaining[position:]`, minus anything moved up
+        while position < len(remaining) and remaining[position] in moved:
+            position += 1
+        if iid not in shown:
+            values, tags = format_row(row)
+            tree.insert('', index, iid=iid, values=values, tags=tags)
+            continue
+        if position < len(remaining) and remaining[position] == iid:
+            position += 1
+        else:
+            tree.move(iid, '', index)
+            moved.add(iid)
+        if shown[iid] != row:
+            values, tags = format_row(row)
+            tree.item(iid, values=values, tags=tags)
+
+
+def sync_rows_in_view(tree, shown, wanted, format_row):
+    """sync_rows, keeping the row at the top of the view there (unless it was removed)."""
+    # Treeview scroll fractions are item index / item count
+    first = tree.yview()[0]
+    order = list(shown)
+    anchor = order[min(round(first * len(order)), len(order) - 1)] if first > 0 and order else None
+
+    sync_rows(tree, shown, wanted, format_row)
+
+    if anchor in wanted:
+        tree.yview_moveto(list(wanted).index(anchor) / len(wanted))
+
+
+class KeyedListView:
+    """
+    A Treeview of rows keyed by primary key (`key(row)`, the first column by
+    default), for the lists that are small enough to load whole.
+
+    set_rows() (a reload) and upsert()/remove() (single-row changes) only
+    record what should be shown. The difference from what is on screen is
+    applied in one idle callback (see sync_rows), so a refresh after adding or
+    deleting one row costs a handful of Tk calls rather than one per row, and
+    several changes in a row are applied together. The selection and the row
+    at the top of the view are kept.
+    """
+
+    def __init__(self, tree, format_row, key=itemgetter(0)):
+        self.tree = tree
+        self.format_row = format_row
+        self.key = key
+        self._rows = {}   # iid -> raw row, what should be shown
+        self._shown = {}  # iid -> raw row, what the tree shows
+        self._idle = None
+
+    def set_rows(self, rows):
+        """Shows exactly `rows`, in that order."""
+        self._rows = {str(self.key(row)): row for row in rows}
+        self._schedule()
+
+    def upsert(self, row):
+        """Updates the row with row's key in place, or adds row at the end."""
+        self._rows[str(self.key(row))] = row
+        self._schedule()
+
+    def remove(self, key):
+        if self._rows.pop(str(key), None) is not None:
+            self._schedule()
+
+    def rows(self):
+        """The rows listed (including changes not drawn yet), in order."""
+        return list(self._rows.values())
+
+    def _schedule(self):
+        if self._idle is None:
+            self._idle = self.tree.after_idle(self._apply)
+
+    def _apply(self):
+        self._idle = None
+        if not self.tree.winfo_exists():
+            return # Window closed in the meantime
+        sync_rows_in_view(self.tree, self._shown, self._rows, self.format_row)
+        self._shown = dict(self._rows)
@@ -0,0 +1,259 @@
+"""
+Periodic maintenance: the incremental member status sync, auto check-out of
+forgotten sessions, the occupancy rollups (occupancy.py), a check of the
+members' payment ledger summaries, the archival of closed periods
+(archive.py) and the pruning of the change log (changefeed.py), with every
+run (timing, rows changed, outcome) recorded in the Maintenance_Run table.
+
+The GUI runs these on its job executor (see GymApp.maintenance_tick). They can
+also run headless, e.g. as a service on the database host:
+
+    python maintenance.py                 # keep running, each task on its interval
+    python maintenance.py --once          # run every task once and exit
+    python maintenance.py --checkout-after-hours 10
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+
+import mysql.connector
+
+from archive import archive_closed_periods
+from changefeed import prune_change_log
+from db import dialect
+from occupancy import rollup_occupancy
+
+# Sessions open longer than this are assumed forgotten and closed at check_in + this many hours.
+AUTO_CHECKOUT_AFTER_HOURS = 12
+# Each batch is its own short transaction so check-ins never wait long on row locks.
+CHECKOUT_BATCH_SIZE = 500
+CHECKOUT_MAX_BATCHES = 20 # per run; anything left is picked up by the next run
+CHECKOUT_BATCH_PAUSE = 0.05
+
+STATUS_SYNC_INTERVAL = 15 * 60
+AUTO_CHECKOUT_INTERVAL = 10 * 60
+OCCUPANCY_ROLLUP_INTERVAL = 10 * 60
+LEDGER_CHECK_INTERVAL = 24 * 60 * 60
+ARCHIVE_INTERVAL = 24 * 60 * 60
+CHANGE_LOG_PRUNE_INTERVAL = 60 * 60
+
+LEDGER_REPAIR_CHUNK = 500 # Members recomputed per transaction
+
+CLOSE_FORGOTTEN_SESSIONS = """
+    UPDATE Attendance
+    SET check_out = DATE_ADD(check_in, INTERVAL %s HOUR)
+    WHERE check_out IS NULL AND check_in < DATE_SUB(NOW(), INTERVAL %s HOUR)
+    ORDER BY Attendance_ID
+    LIMIT %s
+"""
+
+# SQLite has no UPDATE ... LIMIT (and MySQL no LIMIT in an IN subquery)
+CLOSE_FORGOTTEN_SESSIONS_SQLITE = """
+    UPDATE Attendance
+    SET check_out = DATE_ADD(check_in, INTERVAL %s HOUR)
+    WHERE Attendance_ID IN (
+        SELECT Attendance_ID FROM Attendance
+        WHERE check_out IS NULL AND check_in < DATE_SUB(NOW(), INTERVAL %s HOUR)
+        ORDER BY Attendance_ID
+        LIMIT %s
+    )
+"""
+
+# Members whose ledger summary (kept by the Payment triggers) disagrees with their
+# payment history, recent and archived, grouped per member in one pass
+LEDGER_MISMATCHES = """
+    SELECT m.Mem_ID
+    FROM Member m
+    LEFT JOIN (
+        SELECT Mem_ID, SUM(amount) AS total_paid, COUNT(*) AS payment_count,
+               MIN(Payment_date) AS first_payment, MAX(Payment_date) AS last_payment
+        FROM Payment_History GROUP BY Mem_ID
+    ) AS p ON p.Mem_ID = m.Mem_ID
+    WHERE NOT (m.Total_paid = ROUND(COALESCE(p.total_paid, 0), 2)
+               AND m.Payment_count = COALESCE(p.payment_count, 0)
+               AND m.First_payment <=> p.first_payment
+               AND m.Last_payment <=> p.last_payment)
+"""
+
+INSERT_RUN = """
+    INSERT INTO Maintenance_Run (Task, Started_at, Finished_at, Duration_ms, Rows_affected, Status, Message)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+RECENT_RUNS_QUERY = """
+    SELECT Run_ID, Task, Started_at, Duration_ms, Rows_affected, Status, Message
+    FROM Maintenance_Run
+    ORDER BY Run_ID DESC
+    LIMIT %s
+"""
+
+
+def sync_member_statuses(conn):
+    """Runs the incremental SyncMemberStatuses procedure; returns the number of members changed."""
+    cursor = conn.cursor()
+    try:
+        (changed,) = cursor.callproc('SyncMemberStatuses', (0,))
+        conn.commit()
+        return changed
+    finally:
+        cursor.close()
+
+
+def close_forgotten_sessions(conn, after_hours=AUTO_CHECKOUT_AFTER_HOURS, batch_size=CHECKOUT_BATCH_SIZE,
+                             max_batches=CHECKOUT_MAX_BATCHES):
+    """Closes sessions left open for more than after_hours, in bounded batches; returns the number closed."""
+    query = CLOSE_FORGOTTEN_SESSIONS_SQLITE if dialect(conn) == 'sqlite' else CLOSE_FORGOTTEN_SESSIONS
+    closed = 0
+    cursor = conn.cursor()
+    try:
+        for batch in range(max_batches):
+            if batch:
+                time.sleep(CHECKOUT_BATCH_PAUSE)
+            cursor.execute(query, (after_hours, after_hours, batch_size))
+            conn.commit()
+            closed += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                break
+    finally:
+        cursor.close()
+    return closed
+
+
+def check_member_ledger(conn, repair_chunk=LEDGER_REPAIR_CHUNK):
+    """
+    Verifies every member's ledger summary (Total_paid, Payment_count,
+    First/Last_payment) against their payment history and recomputes the ones
+    that disagree (RecomputeMemberLedger); returns how many did. Normally 0:
+    anything else means payments were written with the triggers bypassed or
+    deferred and never synced.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(LEDGER_MISMATCHES)
+        mem_ids = [mem_id for (mem_id,) in cursor.fetchall()]
+        for i, mem_id in enumerate(mem_ids, 1):
+            cursor.callproc('RecomputeMemberLedger', (mem_id,))
+            if i % repair_chunk == 0:
+                conn.commit()
+        conn.commit()
+    finally:
+        cursor.close()
+    return len(mem_ids)
+
+
+class MaintenanceTask:
+    """A named maintenance action, `action(conn)` returning the number of rows it changed."""
+
+    def __init__(self, name, label, interval, action):
+        self.name = name # Recorded in Maintenance_Run.Task
+        self.label = label
+        self.interval = interval
+        self.action = action
+
+
+def default_tasks(checkout_after_hours=AUTO_CHECKOUT_AFTER_HOURS):
+    return [
+        MaintenanceTask('status_sync', "Member status sync", STATUS_SYNC_INTERVAL, sync_member_statuses),
+        MaintenanceTask('auto_checkout', "Auto check-out", AUTO_CHECKOUT_INTERVAL,
+                        lambda conn: close_forgotten_sessions(conn, after_hours=checkout_after_hours)),
+        MaintenanceTask('occupancy_rollup', "Occupancy rollup", OCCUPANCY_ROLLUP_INTERVAL, rollup_occupancy),
+        MaintenanceTask('ledger_check', "Payment ledger check", LEDGER_CHECK_INTERVAL, check_member_ledger),
+        MaintenanceTask('archive', "Archive closed periods", ARCHIVE_INTERVAL, archive_closed_periods),
+        MaintenanceTask('change_log_prune', "Change log pruning", CHANGE_LOG_PRUNE_INTERVAL, prune_change_log),
+    ]
+
+
+class MaintenanceScheduler:
+    """Keeps track of when each task is next due; the caller decides how to run them."""
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+        now = time.monotonic()
+        self._next_run = {task.name: now for task in tasks}
+
+    def due(self):
+        """Returns the tasks that are due now and schedules their next run."""
+        now = time.monotonic()
+        due = [task for task in self.tasks if self._next_run[task.name] <= now]
+        for task in due:
+            self._next_run[task.name] = now + task.interval
+        return due
+
+    def seconds_until_next(self):
+        return max(0.0, min(self._next_run.values()) - time.monotonic())
+
+
+def run_task(conn, task):
+    """
+    Runs one task and records it in Maintenance_Run. Database errors are
+    recorded as a failed run rather than raised. Returns the history row
+    (task, started_at, finished_at, duration_ms, rows, status, message).
+    """
+    started_at = datetime.now()
+    started = time.perf_counter()
+    try:
+        rows, status, message = task.action(conn), 'OK', ''
+    except mysql.connector.Error as err:
+        try:
+            conn.rollback()
+        except mysql.connector.Error:
+            pass
+        rows, status, message = 0, 'Failed', str(err)[:255]
+    duration_ms = int((time.perf_counter() - started) * 1000)
+    record = (task.name, started_at, datetime.now(), duration_ms, rows, status, message)
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(INSERT_RUN, record)
+        conn.commit()
+    except mysql.connector.Error:
+        pass # History is best effort; a broken connection already failed the task
+    finally:
+        cursor.close()
+    return record
+
+
+def recent_runs(conn, limit=10):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(RECENT_RUNS_QUERY, (limit,))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the periodic gym database maintenance tasks.")
+    parser.add_argument('--once', action='store_true', help="Run every task once and exit")
+    parser.add_argument('--checkout-after-hours', type=int, default=AUTO_CHECKOUT_AFTER_HOURS,
+                        help="Auto check-out sessions open longer than this (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    from db import ConnectionPool, configured_backend
+
+    # A one-connection pool gives the long-running loop pings and reconnects for free.
+    connect, settings = configured_backend()
+    pool = ConnectionPool(settings, size=1, connect=connect)
+    scheduler = MaintenanceScheduler(default_tasks(args.checkout_after_hours))
+    try:
+        while True:
+            for task in scheduler.due():
+                try:
+                    with pool.connect() as conn:
+                        (name, started_at, _, duration_ms, rows, status, message) = run_task(conn, task)
+                except mysql.connector.Error as err:
+                    print(f"{datetime.now():%Y-%m-%d %H:%M:%S} {task.name}: could not connect: {err}", file=sys.stderr)
+                    continue
+                print(f"{started_at:%Y-%m-%d %H:%M:%S} {name}: {status}, {rows} rows, {duration_ms} ms {message}".rstrip())
+            if args.once:
+                return 0
+            time.sleep(min(scheduler.seconds_until_next(), 30))
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        pool.close_all()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,19 @@
+-- Upgrades an existing gym_management database to the conditional
+-- AfterPaymentInsert trigger (same definition as gym_management.sql).
+-- Safe to re-run.
+USE gym_management;
+
+DROP TRIGGER IF EXISTS AfterPaymentInsert;
+DELIMITER $$
+CREATE TRIGGER AfterPaymentInsert
+AFTER INSERT ON Payment
+FOR EACH ROW
+BEGIN
+    IF COALESCE(@defer_member_status, 0) = 0 THEN
+        UPDATE Member
+        SET Member_Status = 'Active'
+        WHERE Mem_ID = NEW.Mem_ID
+          AND NOT (Member_Status <=> 'Active');
+    END IF;
+END$$
+DELIMITER ;
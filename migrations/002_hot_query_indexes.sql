@@ -0,0 +1,15 @@
+-- Adds the secondary indexes behind the hot check-in/check-out and payment
+-- lookups (same definitions as gym_management.sql). Each new composite index
+-- starts with Mem_ID, so it can also back the Mem_ID foreign key; the old
+-- single-column FK index is left in place and can be dropped by hand.
+-- Verify the plans afterwards with: python benchmarks/explain_hot_queries.py
+USE gym_management;
+
+ALTER TABLE Payment
+    ADD INDEX idx_payment_member_date (Mem_ID, Payment_date);
+
+ALTER TABLE Attendance
+    ADD INDEX idx_attendance_member_open (Mem_ID, check_out, check_in),
+    ADD INDEX idx_attendance_open (check_out);
+
+ANALYZE TABLE Payment, Attendance;
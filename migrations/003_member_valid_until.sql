@@ -0,0 +1,113 @@
+-- Adds Member.Valid_until, maintained by the Payment triggers, and switches the
+-- check-in trigger and UpdateAllMemberStatuses over to it (same definitions as
+-- gym_management.sql). Safe to re-run except for the ADD COLUMN.
+USE gym_management;
+
+ALTER TABLE Member
+    ADD COLUMN Valid_until DATE;
+
+-- Function 3: The date a payment made on p_payment_date keeps the membership valid until.
+DROP FUNCTION IF EXISTS MembershipValidUntil;
+DELIMITER $$
+CREATE FUNCTION MembershipValidUntil(p_payment_date DATE)
+RETURNS DATE
+DETERMINISTIC
+BEGIN
+    RETURN DATE_ADD(p_payment_date, INTERVAL 31 DAY);
+END$$
+DELIMITER ;
+
+-- Trigger 1: Instantly marks a member as 'Active' right after a payment is inserted
+-- and extends Valid_until.
+-- Only writes when something actually changes, so repeat payments from an
+-- already-active member don't touch (or lock) the Member row.
+-- Bulk loaders can SET @defer_member_status = 1 to skip the per-row update and
+-- sync the affected members with one set-based UPDATE per batch instead
+-- (see payment_import.py).
+DROP TRIGGER IF EXISTS AfterPaymentInsert;
+DELIMITER $$
+CREATE TRIGGER AfterPaymentInsert
+AFTER INSERT ON Payment
+FOR EACH ROW
+BEGIN
+    DECLARE v_valid_until DATE DEFAULT MembershipValidUntil(NEW.Payment_date);
+
+    IF COALESCE(@defer_member_status, 0) = 0 THEN
+        UPDATE Member
+        SET Member_Status = 'Active',
+            Valid_until = GREATEST(COALESCE(Valid_until, v_valid_until), v_valid_until)
+        WHERE Mem_ID = NEW.Mem_ID
+          AND (NOT (Member_Status <=> 'Active') OR Valid_until IS NULL OR Valid_until < v_valid_until);
+    END IF;
+END$$
+DELIMITER ;
+
+-- Trigger 1b: Pulls Valid_until back when the payment it was based on is deleted.
+DROP TRIGGER IF EXISTS AfterPaymentDelete;
+DELIMITER $$
+CREATE TRIGGER AfterPaymentDelete
+AFTER DELETE ON Payment
+FOR EACH ROW
+BEGIN
+    UPDATE Member
+    SET Valid_until = (SELECT MembershipValidUntil(MAX(Payment_date)) FROM Payment WHERE Mem_ID = OLD.Mem_ID)
+    WHERE Mem_ID = OLD.Mem_ID
+      AND Valid_until <= MembershipValidUntil(OLD.Payment_date);
+END$$
+DELIMITER ;
+
+-- Trigger 1c: Recomputes Valid_until when a payment is moved to another date or member.
+DROP TRIGGER IF EXISTS AfterPaymentUpdate;
+DELIMITER $$
+CREATE TRIGGER AfterPaymentUpdate
+AFTER UPDATE ON Payment
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.Mem_ID <=> NEW.Mem_ID AND OLD.Payment_date <=> NEW.Payment_date) THEN
+        UPDATE Member m
+        SET m.Valid_until = (SELECT MembershipValidUntil(MAX(p.Payment_date)) FROM Payment p WHERE p.Mem_ID = m.Mem_ID)
+        WHERE m.Mem_ID IN (OLD.Mem_ID, NEW.Mem_ID);
+    END IF;
+END$$
+DELIMITER ;
+
+-- Trigger 2: Prevents check-in if membership is expired.
+-- A single primary-key lookup, however long the member's payment history is.
+DROP TRIGGER IF EXISTS PreventInactiveMemberCheckin;
+DELIMITER $$
+CREATE TRIGGER PreventInactiveMemberCheckin
+BEFORE INSERT ON Attendance
+FOR EACH ROW
+BEGIN
+    DECLARE v_valid_until DATE;
+
+    SELECT Valid_until INTO v_valid_until
+    FROM Member
+    WHERE Mem_ID = NEW.Mem_ID;
+
+    IF v_valid_until IS NULL OR v_valid_until < CURDATE() THEN
+        SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Check-in failed: Membership is expired. Please make a payment.';
+    END IF;
+END$$
+DELIMITER ;
+
+-- Stored Procedure 1: Updates the status for ALL members based on their Valid_until date.
+DROP PROCEDURE IF EXISTS UpdateAllMemberStatuses;
+DELIMITER $$
+CREATE PROCEDURE UpdateAllMemberStatuses()
+BEGIN
+    -- Active while the membership is valid, 'Inactive' otherwise (or if never paid)
+    UPDATE Member
+    SET Member_Status = IF(Valid_until >= CURDATE(), 'Active', 'Inactive');
+END$$
+DELIMITER ;
+
+-- Backfill from the existing payment history, then resync statuses.
+UPDATE Member m JOIN (
+    SELECT Mem_ID, MAX(Payment_date) AS last_payment FROM Payment GROUP BY Mem_ID
+) AS p ON m.Mem_ID = p.Mem_ID
+SET m.Valid_until = MembershipValidUntil(p.last_payment);
+
+
+CALL UpdateAllMemberStatuses();
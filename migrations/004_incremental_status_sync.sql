@@ -0,0 +1,125 @@
+-- Incremental member status sync: derives the status from Valid_until on every
+-- write, adds the Sync_Watermark table and SyncMemberStatuses (same definitions
+-- as gym_management.sql), then runs one full resync to set the watermark.
+USE gym_management;
+
+ALTER TABLE Member
+    ADD INDEX idx_member_valid_until (Valid_until);
+
+-- Sync_Watermark Table: How far each incremental background job has got.
+CREATE TABLE IF NOT EXISTS Sync_Watermark (
+    Sync_Name VARCHAR(50) PRIMARY KEY,
+    Synced_through DATE NOT NULL
+);
+
+-- Trigger 1: Extends Valid_until right after a payment is inserted and instantly
+-- marks the member 'Active' if that makes the membership valid today.
+-- Like every status write below, the status is derived from Valid_until, so the
+-- only thing that can make it stale is time passing (see SyncMemberStatuses).
+-- Only writes when something actually changes, so repeat payments from an
+-- already-active member don't touch (or lock) the Member row.
+-- Bulk loaders can SET @defer_member_status = 1 to skip the per-row update and
+-- sync the affected members with one set-based UPDATE per batch instead
+-- (see payment_import.py).
+DROP TRIGGER IF EXISTS AfterPaymentInsert;
+DELIMITER $$
+CREATE TRIGGER AfterPaymentInsert
+AFTER INSERT ON Payment
+FOR EACH ROW
+BEGIN
+    DECLARE v_valid_until DATE DEFAULT MembershipValidUntil(NEW.Payment_date);
+
+    IF COALESCE(@defer_member_status, 0) = 0 THEN
+        -- Single-table UPDATE assigns left to right, so the status sees the new Valid_until
+        UPDATE Member
+        SET Valid_until = GREATEST(COALESCE(Valid_until, v_valid_until), v_valid_until),
+            Member_Status = IF(Valid_until >= CURDATE(), 'Active', 'Inactive')
+        WHERE Mem_ID = NEW.Mem_ID
+          AND (Valid_until IS NULL OR Valid_until < v_valid_until
+               OR NOT (Member_Status <=> IF(Valid_until >= CURDATE(), 'Active', 'Inactive')));
+    END IF;
+END$$
+DELIMITER ;
+
+-- Trigger 1b: Pulls Valid_until (and the status) back when the payment it was based on is deleted.
+DROP TRIGGER IF EXISTS AfterPaymentDelete;
+DELIMITER $$
+CREATE TRIGGER AfterPaymentDelete
+AFTER DELETE ON Payment
+FOR EACH ROW
+BEGIN
+    UPDATE Member
+    SET Valid_until = (SELECT MembershipValidUntil(MAX(Payment_date)) FROM Payment WHERE Mem_ID = OLD.Mem_ID),
+        Member_Status = IF(Valid_until >= CURDATE(), 'Active', 'Inactive')
+    WHERE Mem_ID = OLD.Mem_ID
+      AND Valid_until <= MembershipValidUntil(OLD.Payment_date);
+END$$
+DELIMITER ;
+
+-- Trigger 1c: Recomputes Valid_until when a payment is moved to another date or member.
+DROP TRIGGER IF EXISTS AfterPaymentUpdate;
+DELIMITER $$
+CREATE TRIGGER AfterPaymentUpdate
+AFTER UPDATE ON Payment
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.Mem_ID <=> NEW.Mem_ID AND OLD.Payment_date <=> NEW.Payment_date) THEN
+        UPDATE Member m
+        SET m.Valid_until = (SELECT MembershipValidUntil(MAX(p.Payment_date)) FROM Payment p WHERE p.Mem_ID = m.Mem_ID),
+            m.Member_Status = IF(m.Valid_until >= CURDATE(), 'Active', 'Inactive')
+        WHERE m.Mem_ID IN (OLD.Mem_ID, NEW.Mem_ID);
+    END IF;
+END$$
+DELIMITER ;
+
+-- Stored Procedure 1: Updates the status for ALL members based on their Valid_until date.
+-- A full resync; the app normally runs the incremental SyncMemberStatuses instead.
+DROP PROCEDURE IF EXISTS UpdateAllMemberStatuses;
+DELIMITER $$
+CREATE PROCEDURE UpdateAllMemberStatuses()
+BEGIN
+    -- Active while the membership is valid, 'Inactive' otherwise (or if never paid)
+    UPDATE Member
+    SET Member_Status = IF(Valid_until >= CURDATE(), 'Active', 'Inactive')
+    WHERE NOT (Member_Status <=> IF(Valid_until >= CURDATE(), 'Active', 'Inactive'));
+
+    INSERT INTO Sync_Watermark (Sync_Name, Synced_through) VALUES ('member_status', CURDATE())
+    ON DUPLICATE KEY UPDATE Synced_through = CURDATE();
+END$$
+DELIMITER ;
+
+-- Stored Procedure 2: Incremental status sync. Statuses are derived from Valid_until
+-- whenever it is written, so since the last run only memberships whose Valid_until
+-- fell in [last run, today) can have expired. Returns the number of members changed.
+DROP PROCEDURE IF EXISTS SyncMemberStatuses;
+DELIMITER $$
+CREATE PROCEDURE SyncMemberStatuses(OUT p_changed INT)
+BEGIN
+    DECLARE v_synced_through DATE;
+
+    SELECT Synced_through INTO v_synced_through
+    FROM Sync_Watermark
+    WHERE Sync_Name = 'member_status'
+    FOR UPDATE;
+
+    IF v_synced_through IS NULL THEN
+        -- Never synced: one full pass
+        UPDATE Member
+        SET Member_Status = IF(Valid_until >= CURDATE(), 'Active', 'Inactive')
+        WHERE NOT (Member_Status <=> IF(Valid_until >= CURDATE(), 'Active', 'Inactive'));
+        SET p_changed = ROW_COUNT();
+    ELSE
+        -- Range scan on idx_member_valid_until
+        UPDATE Member
+        SET Member_Status = 'Inactive'
+        WHERE Valid_until >= v_synced_through AND Valid_until < CURDATE()
+          AND NOT (Member_Status <=> 'Inactive');
+        SET p_changed = ROW_COUNT();
+    END IF;
+
+    INSERT INTO Sync_Watermark (Sync_Name, Synced_through) VALUES ('member_status', CURDATE())
+    ON DUPLICATE KEY UPDATE Synced_through = CURDATE();
+END$$
+DELIMITER ;
+
+CALL UpdateAllMemberStatuses();
@@ -0,0 +1,15 @@
+-- Run history for the scheduled maintenance tasks (same definition as
+-- gym_management.sql).
+USE gym_management;
+
+-- Maintenance_Run Table: History of scheduled maintenance runs (see maintenance.py).
+CREATE TABLE IF NOT EXISTS Maintenance_Run (
+    Run_ID INT PRIMARY KEY AUTO_INCREMENT,
+    Task VARCHAR(50) NOT NULL,
+    Started_at DATETIME NOT NULL,
+    Finished_at DATETIME NOT NULL,
+    Duration_ms INT NOT NULL,
+    Rows_affected INT NOT NULL DEFAULT 0,
+    Status VARCHAR(20) NOT NULL, -- 'OK' or 'Failed'
+    Message VARCHAR(255)
+);
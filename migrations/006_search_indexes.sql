@@ -0,0 +1,13 @@
+-- Indexes behind the Members search and the Payments filters (same
+-- definitions as gym_management.sql): name prefix lookups and payment date
+-- ranges. Mem_ID and Phone_no prefixes use the existing primary key and
+-- unique index.
+USE gym_management;
+
+ALTER TABLE Member
+    ADD INDEX idx_member_name (Name);
+
+ALTER TABLE Payment
+    ADD INDEX idx_payment_date (Payment_date);
+
+ANALYZE TABLE Member, Payment;
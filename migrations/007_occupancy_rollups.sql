@@ -0,0 +1,30 @@
+-- Occupancy rollup tables for the Occupancy dashboard (same definitions as
+-- gym_management.sql). They start empty; the first rollup run (maintenance,
+-- or `python occupancy.py`) fills them from the existing attendance history.
+USE gym_management;
+
+-- Occupancy_Hourly / Occupancy_Daily Tables: Check-ins and time spent on the floor per
+-- hour and per day, rolled up incrementally from Attendance (see occupancy.py).
+-- Occupied_seconds / 3600 is the average number of people in the gym over the hour.
+CREATE TABLE IF NOT EXISTS Occupancy_Hourly (
+    Hour_start DATETIME PRIMARY KEY,
+    Check_ins INT NOT NULL DEFAULT 0,
+    Occupied_seconds INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS Occupancy_Daily (
+    Day DATE PRIMARY KEY,
+    Check_ins INT NOT NULL DEFAULT 0,
+    Occupied_seconds BIGINT NOT NULL DEFAULT 0
+);
+
+-- Rollup_Watermark Table: Highest Attendance_ID each rollup has processed.
+CREATE TABLE IF NOT EXISTS Rollup_Watermark (
+    Rollup_Name VARCHAR(50) PRIMARY KEY,
+    Last_ID INT NOT NULL
+);
+
+-- Rollup_Open_Session Table: Sessions still open when the rollup reached them; added once checked out.
+CREATE TABLE IF NOT EXISTS Rollup_Open_Session (
+    Attendance_ID INT PRIMARY KEY
+);
@@ -0,0 +1,113 @@
+-- Maintained per-member payment ledger summary (Total_paid, Payment_count,
+-- First/Last_payment) on the Member row, kept current by the Payment triggers,
+-- and GetTotalMemberPayments switched over to it (same definitions as
+-- gym_management.sql). Run with the application stopped, so no payment lands
+-- between the backfill and the new triggers. Safe to re-run except for the
+-- ADD COLUMN.
+USE gym_management;
+
+ALTER TABLE Member
+    ADD COLUMN Total_paid DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    ADD COLUMN Payment_count INT NOT NULL DEFAULT 0,
+    ADD COLUMN First_payment DATE,
+    ADD COLUMN Last_payment DATE,
+    ADD INDEX idx_member_total_paid (Total_paid, Mem_ID);
+
+-- Function 2: Get the total sum of payments for a specific member.
+-- Reads the ledger summary the Payment triggers keep on the Member row, so it is
+-- a primary-key lookup however many payments the member has made.
+DROP FUNCTION IF EXISTS GetTotalMemberPayments;
+DELIMITER $$
+CREATE FUNCTION GetTotalMemberPayments(p_mem_id VARCHAR(20))
+RETURNS DECIMAL(12, 2)
+READS SQL DATA
+BEGIN
+    DECLARE v_total_payment DECIMAL(12, 2);
+
+    SELECT Total_paid INTO v_total_payment
+    FROM Member
+    WHERE Mem_ID = p_mem_id;
+
+    RETURN IFNULL(v_total_payment, 0.00);
+END$$
+DELIMITER ;
+
+-- Trigger 1: Adds the payment to the member's ledger summary (Total_paid,
+-- Payment_count, First/Last_payment), extends Valid_until, and instantly marks
+-- the member 'Active' if that makes the membership valid today.
+-- Like every status write below, the status is derived from Valid_until, so the
+-- only thing that can make it stale is time passing (see SyncMemberStatuses).
+-- Bulk loaders can SET @defer_member_status = 1 to skip the per-row update and
+-- sync the affected members with one set-based UPDATE per batch instead
+-- (see payment_import.py).
+DROP TRIGGER IF EXISTS AfterPaymentInsert;
+DELIMITER $$
+CREATE TRIGGER AfterPaymentInsert
+AFTER INSERT ON Payment
+FOR EACH ROW
+BEGIN
+    DECLARE v_valid_until DATE DEFAULT MembershipValidUntil(NEW.Payment_date);
+
+    IF COALESCE(@defer_member_status, 0) = 0 THEN
+        -- Single-table UPDATE assigns left to right, so the status sees the new Valid_until
+        UPDATE Member
+        SET Total_paid = Total_paid + NEW.amount,
+            Payment_count = Payment_count + 1,
+            First_payment = LEAST(COALESCE(First_payment, NEW.Payment_date), NEW.Payment_date),
+            Last_payment = GREATEST(COALESCE(Last_payment, NEW.Payment_date), NEW.Payment_date),
+            Valid_until = GREATEST(COALESCE(Valid_until, v_valid_until), v_valid_until),
+            Member_Status = IF(Valid_until >= CURDATE(), 'Active', 'Inactive')
+        WHERE Mem_ID = NEW.Mem_ID;
+    END IF;
+END$$
+DELIMITER ;
+
+-- Trigger 1b: Takes a deleted payment back out of the ledger summary, and pulls
+-- Valid_until (and the status) back when it was based on that payment.
+-- First/Last_payment come from idx_payment_member_date.
+DROP TRIGGER IF EXISTS AfterPaymentDelete;
+DELIMITER $$
+CREATE TRIGGER AfterPaymentDelete
+AFTER DELETE ON Payment
+FOR EACH ROW
+BEGIN
+    UPDATE Member
+    SET Total_paid = Total_paid - OLD.amount,
+        Payment_count = Payment_count - 1,
+        First_payment = (SELECT MIN(Payment_date) FROM Payment WHERE Mem_ID = OLD.Mem_ID),
+        Last_payment = (SELECT MAX(Payment_date) FROM Payment WHERE Mem_ID = OLD.Mem_ID),
+        Valid_until = IF(Valid_until <= MembershipValidUntil(OLD.Payment_date), MembershipValidUntil(Last_payment), Valid_until),
+        Member_Status = IF(Valid_until >= CURDATE(), 'Active', 'Inactive')
+    WHERE Mem_ID = OLD.Mem_ID;
+END$$
+DELIMITER ;
+
+-- Trigger 1c: Recomputes the ledger summary and Valid_until when a payment is
+-- moved to another date or member or its amount is corrected.
+DROP TRIGGER IF EXISTS AfterPaymentUpdate;
+DELIMITER $$
+CREATE TRIGGER AfterPaymentUpdate
+AFTER UPDATE ON Payment
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.Mem_ID <=> NEW.Mem_ID AND OLD.Payment_date <=> NEW.Payment_date AND OLD.amount <=> NEW.amount) THEN
+        UPDATE Member m
+        SET m.Total_paid = (SELECT COALESCE(SUM(p.amount), 0) FROM Payment p WHERE p.Mem_ID = m.Mem_ID),
+            m.Payment_count = (SELECT COUNT(*) FROM Payment p WHERE p.Mem_ID = m.Mem_ID),
+            m.First_payment = (SELECT MIN(p.Payment_date) FROM Payment p WHERE p.Mem_ID = m.Mem_ID),
+            m.Last_payment = (SELECT MAX(p.Payment_date) FROM Payment p WHERE p.Mem_ID = m.Mem_ID),
+            m.Valid_until = MembershipValidUntil(m.Last_payment),
+            m.Member_Status = IF(m.Valid_until >= CURDATE(), 'Active', 'Inactive')
+        WHERE m.Mem_ID IN (OLD.Mem_ID, NEW.Mem_ID);
+    END IF;
+END$$
+DELIMITER ;
+
+-- Backfill from the existing payment history.
+UPDATE Member m JOIN (
+    SELECT Mem_ID, SUM(amount) AS total_paid, COUNT(*) AS payment_count,
+           MIN(Payment_date) AS first_payment, MAX(Payment_date) AS last_payment
+    FROM Payment GROUP BY Mem_ID
+) AS p ON m.Mem_ID = p.Mem_ID
+SET m.Total_paid = p.total_paid, m.Payment_count = p.payment_count,
+    m.First_payment = p.first_payment, m.Last_payment = p.last_payment;
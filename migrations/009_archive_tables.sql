@@ -0,0 +1,104 @@
+-- Archive tier for Payment and Attendance: Payment_Archive / Attendance_Archive,
+-- the Payment_History / Attendance_History views over recent and archived rows,
+-- and the RecomputeMemberLedger procedure the Payment delete/update triggers now
+-- call, so a member's ledger summary covers archived payments too (same
+-- definitions as gym_management.sql). archive.py moves the rows. Needs MySQL 8.0
+-- or later: the archived rows keep their ids, and only 8.0 persists the
+-- AUTO_INCREMENT counters across a restart, so they are never handed out again.
+-- Safe to re-run except for the CREATE TABLEs.
+USE gym_management;
+
+-- Payment_Archive / Attendance_Archive Tables: Closed periods moved out of Payment and
+-- Attendance by archive.py, so the tables the door check, the lists and the triggers
+-- work on only hold recent history. Same columns; the ids are kept (AUTO_INCREMENT
+-- counters are persisted from MySQL 8.0, so they are never handed out again).
+CREATE TABLE Payment_Archive (
+    Payment_ID INT PRIMARY KEY,
+    Mem_ID VARCHAR(20) NOT NULL,
+    amount DECIMAL(8, 2) NOT NULL,
+    Payment_date DATE NOT NULL,
+    Payment_status VARCHAR(20) DEFAULT 'Completed',
+    FOREIGN KEY (Mem_ID) REFERENCES Member(Mem_ID) ON DELETE CASCADE,
+    INDEX idx_payment_archive_member_date (Mem_ID, Payment_date),
+    INDEX idx_payment_archive_date (Payment_date)
+);
+
+CREATE TABLE Attendance_Archive (
+    Attendance_ID INT PRIMARY KEY,
+    Mem_ID VARCHAR(20) NOT NULL,
+    check_in DATETIME NOT NULL,
+    check_out DATETIME NOT NULL,
+    FOREIGN KEY (Mem_ID) REFERENCES Member(Mem_ID) ON DELETE CASCADE,
+    -- A member's visit history (member details)
+    INDEX idx_attendance_archive_member (Mem_ID, check_in)
+);
+
+-- Payment_History / Attendance_History Views: Recent and archived rows together.
+CREATE OR REPLACE VIEW Payment_History AS
+    SELECT Payment_ID, Mem_ID, amount, Payment_date, Payment_status FROM Payment
+    UNION ALL
+    SELECT Payment_ID, Mem_ID, amount, Payment_date, Payment_status FROM Payment_Archive;
+
+CREATE OR REPLACE VIEW Attendance_History AS
+    SELECT Attendance_ID, Mem_ID, check_in, check_out FROM Attendance
+    UNION ALL
+    SELECT Attendance_ID, Mem_ID, check_in, check_out FROM Attendance_Archive;
+
+-- Stored Procedure 3 (defined first, as the triggers below call it): Recomputes one
+-- member's ledger summary, Valid_until and status from their whole payment history,
+-- recent and archived, for the Payment delete and update triggers and the ledger
+-- check. Both halves are lookups on the member's (Mem_ID, Payment_date) index.
+DROP PROCEDURE IF EXISTS RecomputeMemberLedger;
+DELIMITER $$
+CREATE PROCEDURE RecomputeMemberLedger(IN p_mem_id VARCHAR(20))
+BEGIN
+    UPDATE Member m JOIN (
+        SELECT COALESCE(SUM(amount), 0) AS total_paid, COUNT(*) AS payment_count,
+               MIN(Payment_date) AS first_payment, MAX(Payment_date) AS last_payment
+        FROM (
+            SELECT amount, Payment_date FROM Payment WHERE Mem_ID = p_mem_id
+            UNION ALL
+            SELECT amount, Payment_date FROM Payment_Archive WHERE Mem_ID = p_mem_id
+        ) AS h
+    ) AS p
+    SET m.Total_paid = p.total_paid, m.Payment_count = p.payment_count,
+        m.First_payment = p.first_payment, m.Last_payment = p.last_payment,
+        m.Valid_until = MembershipValidUntil(p.last_payment),
+        m.Member_Status = IF(MembershipValidUntil(p.last_payment) >= CURDATE(), 'Active', 'Inactive')
+    WHERE m.Mem_ID = p_mem_id;
+END$$
+DELIMITER ;
+
+-- Trigger 1b: Takes a deleted payment back out of the ledger summary, and pulls
+-- Valid_until (and the status) back when it was based on that payment.
+-- Payments moved to Payment_Archive by archive.py (which sets @archiving = 1)
+-- are still part of the member's history, so they are left alone.
+DROP TRIGGER IF EXISTS AfterPaymentDelete;
+DELIMITER $$
+CREATE TRIGGER AfterPaymentDelete
+AFTER DELETE ON Payment
+FOR EACH ROW
+BEGIN
+    IF COALESCE(@archiving, 0) = 0 THEN
+        CALL RecomputeMemberLedger(OLD.Mem_ID);
+    END IF;
+END$$
+DELIMITER ;
+
+-- Trigger 1c: Recomputes the ledger summary and Valid_until when a payment is
+-- moved to another date or member or its amount is corrected.
+DROP TRIGGER IF EXISTS AfterPaymentUpdate;
+DELIMITER $$
+CREATE TRIGGER AfterPaymentUpdate
+AFTER UPDATE ON Payment
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.Mem_ID <=> NEW.Mem_ID AND OLD.Payment_date <=> NEW.Payment_date AND OLD.amount <=> NEW.amount) THEN
+        CALL RecomputeMemberLedger(OLD.Mem_ID);
+        IF NOT (OLD.Mem_ID <=> NEW.Mem_ID) THEN
+            CALL RecomputeMemberLedger(NEW.Mem_ID);
+        END IF;
+    END IF;
+END$$
+DELIMITER ;
+
@@ -0,0 +1,100 @@
+-- Change feed: the Change_Log table and the Log* triggers that fill it, so each desk
+-- picks up the changes made at the others by reading the entries past the last
+-- Change_ID it has seen (changefeed.py; same definitions as gym_management.sql).
+-- Safe to re-run except for the CREATE TABLE.
+USE gym_management;
+
+-- Change_Log Table: One entry per row inserted, updated or deleted in Member, Payment,
+-- Attendance and Workout_Plan, written by the Log* triggers, so each desk can pick up
+-- the changes made at the others by reading the entries past the last Change_ID it has
+-- seen (changefeed.py). Entries older than a day are pruned by maintenance.py.
+CREATE TABLE Change_Log (
+    Change_ID BIGINT PRIMARY KEY AUTO_INCREMENT,
+    Table_name VARCHAR(20) NOT NULL,
+    Row_key VARCHAR(20) NOT NULL,
+    Operation CHAR(1) NOT NULL, -- 'I'nsert, 'U'pdate or 'D'elete
+    Changed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    -- Pruning
+    INDEX idx_change_log_changed_at (Changed_at)
+);
+
+-- Record every change to Member, Payment, Attendance and Workout_Plan
+-- in Change_Log for the change feed (changefeed.py). Member updates are only recorded
+-- when something the desks show changed, so a no-op status resync adds nothing.
+DROP TRIGGER IF EXISTS LogMemberInsert;
+CREATE TRIGGER LogMemberInsert AFTER INSERT ON Member FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Member', NEW.Mem_ID, 'I');
+
+DROP TRIGGER IF EXISTS LogMemberUpdate;
+DELIMITER $$
+CREATE TRIGGER LogMemberUpdate
+AFTER UPDATE ON Member
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.Mem_ID <=> NEW.Mem_ID AND OLD.Name <=> NEW.Name AND OLD.Phone_no <=> NEW.Phone_no
+            AND OLD.Join_date <=> NEW.Join_date AND OLD.Age <=> NEW.Age AND OLD.Member_Status <=> NEW.Member_Status
+            AND OLD.Valid_until <=> NEW.Valid_until AND OLD.Total_paid <=> NEW.Total_paid) THEN
+        INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Member', NEW.Mem_ID, 'U');
+    END IF;
+END$$
+DELIMITER ;
+
+-- Foreign key cascades do not fire triggers in MySQL, so the payments, visits and plans
+-- a member's deletion takes with it are recorded here, before the cascade runs.
+DROP TRIGGER IF EXISTS LogMemberDelete;
+DELIMITER $$
+CREATE TRIGGER LogMemberDelete
+BEFORE DELETE ON Member
+FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Log (Table_name, Row_key, Operation)
+        SELECT 'Payment', Payment_ID, 'D' FROM Payment WHERE Mem_ID = OLD.Mem_ID;
+    INSERT INTO Change_Log (Table_name, Row_key, Operation)
+        SELECT 'Attendance', Attendance_ID, 'D' FROM Attendance WHERE Mem_ID = OLD.Mem_ID;
+    INSERT INTO Change_Log (Table_name, Row_key, Operation)
+        SELECT 'Workout_Plan', Plan_ID, 'D' FROM Workout_Plan WHERE Mem_ID = OLD.Mem_ID;
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Member', OLD.Mem_ID, 'D');
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS LogPaymentInsert;
+CREATE TRIGGER LogPaymentInsert AFTER INSERT ON Payment FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Payment', NEW.Payment_ID, 'I');
+
+DROP TRIGGER IF EXISTS LogPaymentUpdate;
+CREATE TRIGGER LogPaymentUpdate AFTER UPDATE ON Payment FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Payment', NEW.Payment_ID, 'U');
+
+DROP TRIGGER IF EXISTS LogPaymentDelete;
+CREATE TRIGGER LogPaymentDelete AFTER DELETE ON Payment FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Payment', OLD.Payment_ID, 'D');
+
+DROP TRIGGER IF EXISTS LogAttendanceInsert;
+CREATE TRIGGER LogAttendanceInsert AFTER INSERT ON Attendance FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Attendance', NEW.Attendance_ID, 'I');
+
+DROP TRIGGER IF EXISTS LogAttendanceUpdate;
+CREATE TRIGGER LogAttendanceUpdate AFTER UPDATE ON Attendance FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Attendance', NEW.Attendance_ID, 'U');
+
+DROP TRIGGER IF EXISTS LogAttendanceDelete;
+CREATE TRIGGER LogAttendanceDelete AFTER DELETE ON Attendance FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Attendance', OLD.Attendance_ID, 'D');
+
+DROP TRIGGER IF EXISTS LogWorkoutPlanInsert;
+CREATE TRIGGER LogWorkoutPlanInsert AFTER INSERT ON Workout_Plan FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Workout_Plan', NEW.Plan_ID, 'I');
+
+DROP TRIGGER IF EXISTS LogWorkoutPlanUpdate;
+CREATE TRIGGER LogWorkoutPlanUpdate AFTER UPDATE ON Workout_Plan FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Workout_Plan', NEW.Plan_ID, 'U');
+
+DROP TRIGGER IF EXISTS LogWorkoutPlanDelete;
+CREATE TRIGGER LogWorkoutPlanDelete AFTER DELETE ON Workout_Plan FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation) VALUES ('Workout_Plan', OLD.Plan_ID, 'D');
+
+-- Deleting a trainer cascades to their plans, which are recorded here for the same reason
+DROP TRIGGER IF EXISTS LogTrainerDelete;
+CREATE TRIGGER LogTrainerDelete BEFORE DELETE ON Trainers FOR EACH ROW
+    INSERT INTO Change_Log (Table_name, Row_key, Operation)
+        SELECT 'Workout_Plan', Plan_ID, 'D' FROM Workout_Plan WHERE Trainer_ID = OLD.Trainer_ID;
@@ -0,0 +1,215 @@
+"""
+Hourly and daily occupancy rollups of the Attendance table, for the Occupancy
+dashboard (peak hours, visits per day) without scanning raw history.
+
+Each finished visit is added once to Occupancy_Hourly and Occupancy_Daily: a
+check-in to the hour/day it started in, and the time on the floor to every
+hour/day it spans. Runs are incremental. Rollup_Watermark holds the highest
+Attendance_ID looked at so far; sessions still open at that point are kept in
+Rollup_Open_Session and added once they are checked out. Visits moved to
+Attendance_Archive (archive.py) keep their IDs and are read from there, so a
+rebuild still covers the whole history, as does a pending session archived
+before the run that would have added it. Deleting attendance rows (e.g. with
+their member) does not take them back out of the rollups.
+
+Runs as a maintenance task (see maintenance.py); `python occupancy.py` catches
+up in one go and `--rebuild` starts over from the raw tables.
+"""
+import argparse
+import sys
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from db import dialect
+
+ROLLUP_NAME = 'occupancy'
+# Each batch of sessions is its own transaction
+ROLLUP_BATCH_SIZE = 5000
+ROLLUP_MAX_BATCHES = 50 # per run; anything left is picked up by the next run
+
+WATERMARK_QUERY = "SELECT Last_ID FROM Rollup_Watermark WHERE Rollup_Name = %s FOR UPDATE"
+
+NEW_SESSIONS_QUERY = """
+    SELECT Attendance_ID, check_in, check_out FROM Attendance
+    WHERE Attendance_ID > %s
+    ORDER BY Attendance_ID
+    LIMIT %s
+"""
+
+# Archived visits past the watermark: all of them on a rebuild, otherwise the
+# odd visit archived before a run got to it. Archived visits are always finished.
+NEW_ARCHIVED_SESSIONS_QUERY = """
+    SELECT Attendance_ID, check_in, check_out FROM Attendance_Archive
+    WHERE Attendance_ID > %s
+    ORDER BY Attendance_ID
+    LIMIT %s
+"""
+
+# Sessions that were open at an earlier run and have been checked out since
+# (and possibly archived already)
+CLOSED_PENDING_QUERY = """
+    SELECT a.Attendance_ID, a.check_in, a.check_out
+    FROM Rollup_Open_Session r
+    JOIN Attendance a ON a.Attendance_ID = r.Attendance_ID
+    WHERE a.check_out IS NOT NULL
+    UNION ALL
+    SELECT a.Attendance_ID, a.check_in, a.check_out
+    FROM Rollup_Open_Session r
+    JOIN Attendance_Archive a ON a.Attendance_ID = r.Attendance_ID
+"""
+
+# Pending sessions whose attendance row has been deleted (not archived)
+DROP_ORPHANED_PENDING = """
+    DELETE FROM Rollup_Open_Session
+    WHERE NOT EXISTS (SELECT 1 FROM Attendance a WHERE a.Attendance_ID = Rollup_Open_Session.Attendance_ID)
+      AND NOT EXISTS (SELECT 1 FROM Attendance_Archive a WHERE a.Attendance_ID = Rollup_Open_Session.Attendance_ID)
+"""
+
+ADD_HOURLY = """
+    INSERT INTO Occupancy_Hourly (Hour_start, Check_ins, Occupied_seconds) VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE Check_ins = Check_ins + VALUES(Check_ins), Occupied_seconds = Occupied_seconds + VALUES(Occupied_seconds)
+"""
+ADD_DAILY = """
+    INSERT INTO Occupancy_Daily (Day, Check_ins, Occupied_seconds) VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE Check_ins = Check_ins + VALUES(Check_ins), Occupied_seconds = Occupied_seconds + VALUES(Occupied_seconds)
+"""
+
+# SQLite spells the upsert ON CONFLICT ... DO UPDATE
+ADD_HOURLY_SQLITE = """
+    INSERT INTO Occupancy_Hourly (Hour_start, Check_ins, Occupied_seconds) VALUES (%s, %s, %s)
+    ON CONFLICT (Hour_start) DO UPDATE
+    SET Check_ins = Check_ins + excluded.Check_ins, Occupied_seconds = Occupied_seconds + excluded.Occupied_seconds
+"""
+ADD_DAILY_SQLITE = """
+    INSERT INTO Occupancy_Daily (Day, Check_ins, Occupied_seconds) VALUES (%s, %s, %s)
+    ON CONFLICT (Day) DO UPDATE
+    SET Check_ins = Check_ins + excluded.Check_ins, Occupied_seconds = Occupied_seconds + excluded.Occupied_seconds
+"""
+
+
+class Rollup:
+    """Per-hour and per-day [check-ins, seconds on the floor] for a batch of finished sessions."""
+
+    def __init__(self):
+        self.hours = defaultdict(lambda: [0, 0])
+        self.days = defaultdict(lambda: [0, 0])
+
+    def add(self, check_in, check_out):
+        hour = check_in.replace(minute=0, second=0, microsecond=0)
+        self.hours[hour][0] += 1
+        self.days[check_in.date()][0] += 1
+        while hour < check_out:
+            next_hour = hour + timedelta(hours=1)
+            seconds = int((min(next_hour, check_out) - max(hour, check_in)).total_seconds())
+            self.hours[hour][1] += seconds
+            self.days[hour.date()][1] += seconds
+            hour = next_hour
+
+
+def rollup_occupancy(conn, batch_size=ROLLUP_BATCH_SIZE, max_batches=ROLLUP_MAX_BATCHES):
+    """Adds sessions finished since the last run to the rollup tables; returns how many were added."""
+    sqlite = dialect(conn) == 'sqlite'
+    add_hourly, add_daily = (ADD_HOURLY_SQLITE, ADD_DAILY_SQLITE) if sqlite else (ADD_HOURLY, ADD_DAILY)
+    added = 0
+    cursor = conn.cursor()
+    try:
+        for batch in range(max_batches):
+            # Locks the watermark row, so two desks running this at once take turns
+            cursor.execute(WATERMARK_QUERY, (ROLLUP_NAME,))
+            row = cursor.fetchone()
+            if row is None:
+                cursor.execute("INSERT INTO Rollup_Watermark (Rollup_Name, Last_ID) VALUES (%s, 0)", (ROLLUP_NAME,))
+            last_id = row[0] if row else 0
+
+            finished = []
+            if batch == 0:
+                cursor.execute(DROP_ORPHANED_PENDING)
+                cursor.execute(CLOSED_PENDING_QUERY)
+                finished = cursor.fetchall()
+            cursor.execute(NEW_SESSIONS_QUERY, (last_id, batch_size))
+            new = cursor.fetchall()
+            cursor.execute(NEW_ARCHIVED_SESSIONS_QUERY, (last_id, batch_size))
+            archived = cursor.fetchall()
+            if archived:
+                # The first batch_size IDs of both, so the watermark never skips one
+                new = sorted(new + archived)[:batch_size]
+
+            rollup = Rollup()
+            still_open = []
+            for attendance_id, check_in, check_out in new:
+                if check_out is None:
+                    still_open.append((attendance_id,))
+                else:
+                    rollup.add(check_in, check_out)
+            for _, check_in, check_out in finished:
+                rollup.add(check_in, check_out)
+
+            if rollup.hours:
+                cursor.executemany(add_hourly, _rows(rollup.hours))
+                cursor.executemany(add_daily, _rows(rollup.days))
+            if finished:
+                cursor.executemany("DELETE FROM Rollup_Open_Session WHERE Attendance_ID = %s", [(f[0],) for f in finished])
+            if still_open:
+                cursor.executemany("INSERT INTO Rollup_Open_Session (Attendance_ID) VALUES (%s)", still_open)
+            if new:
+                cursor.execute("UPDATE Rollup_Watermark SET Last_ID = %s WHERE Rollup_Name = %s", (new[-1][0], ROLLUP_NAME))
+            conn.commit()
+
+            added += len(finished) + len(new) - len(still_open)
+            if len(new) < batch_size:
+                break
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return added
+
+
+def _rows(totals):
+    return [(key, check_ins, seconds) for key, (check_ins, seconds) in sorted(totals.items())]
+
+
+def clear_rollups(conn):
+    """Empties the rollup tables and resets the watermark, so the next run starts from scratch."""
+    cursor = conn.cursor()
+    try:
+        for table in ('Occupancy_Hourly', 'Occupancy_Daily', 'Rollup_Open_Session'):
+            cursor.execute(f"DELETE FROM {table}")
+        cursor.execute("DELETE FROM Rollup_Watermark WHERE Rollup_Name = %s", (ROLLUP_NAME,))
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def hour_of_day_profile(hourly, days):
+    """Average number of people on the floor in each hour of the day (0-23) over `days` days of hourly rows."""
+    seconds = [0] * 24
+    for row in hourly:
+        seconds[row.hour_start.hour] += row.occupied_seconds
+    return [total / 3600 / max(days, 1) for total in seconds]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bring the occupancy rollups up to date.")
+    parser.add_argument('--rebuild', action='store_true', help="Start over from the raw (and archived) attendance")
+    parser.add_argument('--batch-size', type=int, default=ROLLUP_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    from db import open_connection
+
+    conn = open_connection()
+    started = time.perf_counter()
+    try:
+        if args.rebuild:
+            clear_rollups(conn)
+        total = rollup_occupancy(conn, batch_size=args.batch_size, max_batches=sys.maxsize)
+    finally:
+        conn.close()
+    print(f"Rolled up {total} finished sessions in {time.perf_counter() - started:.1f}s.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,270 @@
+from collections import deque
+
+from list_view import sync_rows, sync_rows_in_view
+from repository import fetch_all
+
+
+def keyset_page_query(table, select_columns, key_column, sort_column, descending, boundary, forward, page_size,
+                      row_filter=None):
+    """
+    Returns (query, params) for the page of `table` after (forward) or before
+    the boundary row, ordered by (sort_column, key_column). boundary is a row
+    of select_columns, or None for the first page. row_filter is an optional
+    (condition, params) pair restricting the rows, e.g. a search.
+    """
+    ascending = forward != descending
+    op, order = ('>', 'ASC') if ascending else ('<', 'DESC')
+
+    query = f"SELECT {', '.join(select_columns)} FROM {table}"
+    conditions, params = [], ()
+    if row_filter is not None:
+        conditions.append(row_filter[0])
+        params += tuple(row_filter[1])
+    if boundary is not None:
+        key_value = boundary[select_columns.index(key_column)]
+        if sort_column == key_column:
+            conditions.append(f"{key_column} {op} %s")
+            params += (key_value,)
+        else:
+            sort_value = boundary[select_columns.index(sort_column)]
+            conditions.append(f"({sort_column} {op} %s OR ({sort_column} = %s AND {key_column} {op} %s))")
+            params += (sort_value, sort_value, key_value)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    if sort_column == key_column:
+        query += f" ORDER BY {key_column} {order}"
+    else:
+        query += f" ORDER BY {sort_column} {order}, {key_column} {order}"
+    query += f" LIMIT {int(page_size)}"
+    return query, params
+
+
+class PagedTable:
+    """
+    Keeps a Treeview backed by a large table responsive by only materializing
+    a sliding window of rows.
+
+    Pages are fetched with keyset pagination on (sort column, key column) as the
+    user scrolls near either end, and whole pages are dropped from the opposite
+    end once more than `max_pages` are loaded. Clicking a sortable column header
+    re-sorts on the server, and set_filter() restricts the rows (searches).
+    `run_job(work, on_success, on_failure)` must run work(conn) in the
+    background and call on_success(result) or on_failure() on the Tk thread;
+    results of a load that a newer reload has superseded are dropped.
+    apply_changes() runs its lookups with `run_background_job` (same
+    signature, default run_job), which must not coalesce them with page loads.
+    """
+
+    def __init__(self, tree, run_job, table, columns, key_column, format_row,
+                 sortable=None, page_size=200, max_pages=3, run_background_job=None):
+        self.tree = tree
+        self.run_job = run_job
+        self.run_background_job = run_background_job or run_job
+        self.table = table
+        self.columns = columns  # [(tree column id, SQL column)] in SELECT order
+        self.sql_columns = dict(columns)
+        self.key_column = key_column
+        self.key_index = [sql for (_, sql) in columns].index(key_column)
+        self.format_row = format_row
+        self.page_size = page_size
+        self.max_pages = max_pages
+
+        self.headings = {col_id: tree.heading(col_id, 'text') for (col_id, _) in columns}
+        self.sort_col = columns[[sql for (_, sql) in columns].index(key_column)][0]
+        self.descending = False
+        self.row_filter = None  # (condition, params), see set_filter
+
+        self._pages = deque()  # Each page: list of raw rows, in display order
+        self._more_below = False
+        self._more_above = False
+        self._loading = False
+        self._generation = 0
+
+        self._scroll_set = tree.scrollbar.set
+        tree.configure(yscrollcommand=self._on_scroll)
+        for col_id in (sortable or ()):
+            tree.heading(col_id, command=lambda c=col_id: self.sort_by(c))
+        self._update_headings()
+
+    # --- Public API ---
+    def reload(self):
+        """
+        Fetches the first page again and drops the other materialized pages.
+        Rows still on the first page stay in the tree (only changes are drawn).
+        """
+        self._generation += 1
+        generation = self._generation
+        self._loading = True
+        query, params = self._page_query(None, forward=True)
+
+        def show(rows):
+            if generation != self._generation:
+                return
+            self._loading = False
+            shown = {self._row_iid(row): row for page in self._pages for row in page}
+            sync_rows(self.tree, shown, {self._row_iid(row): row for row in rows}, self.format_row)
+            self._pages.clear()
+            self._more_above = False
+            self._more_below = len(rows) == self.page_size
+            if rows:
+                self._pages.append(rows)
+
+        self.run_job(lambda conn: fetch_all(conn, query, params), show, self._load_failed)
+
+    def apply_changes(self, keys):
+        """
+        Re-reads the rows with these keys (changed elsewhere, see changefeed.py)
+        and updates the loaded pages to match: changed rows are redrawn (and
+        moved if their sort position changed), deleted rows and rows no longer
+        matching the filter are removed, and new rows are inserted if they sort
+        within the loaded pages (others show up when scrolled to).
+        """
+        keys = [str(key) for key in keys]
+        if not keys or not self._generation:
+            return # Not loaded yet
+        generation = self._generation
+        query, params = self._rows_query(keys)
+
+        def show(rows):
+            if generation != self._generation:
+                return # A reload is on its way and shows them anyway
+            window = [row for page in self._pages for row in page]
+            changed = set(keys)
+            kept = [row for row in window if self._row_iid(row) not in changed]
+            for row in rows:
+                if self._within(row, window):
+                    self._place(kept, row)
+            sync_rows_in_view(self.tree, {self._row_iid(row): row for row in window},
+                              {self._row_iid(row): row for row in kept}, self.format_row)
+            self._pages = deque(kept[i:i + self.page_size] for i in range(0, len(kept), self.page_size))
+
+        self.run_background_job(lambda conn: fetch_all(conn, query, params), show, lambda: None)
+
+    def set_filter(self, row_filter):
+        """Shows only the rows matching row_filter, a (condition, params) pair (None for all rows)."""
+        if row_filter == self.row_filter:
+            return
+        self.row_filter = row_filter
+        self.reload()
+
+    def sort_by(self, col_id):
+        """Sorts on the server by col_id, toggling direction on repeated clicks."""
+        if col_id == self.sort_col:
+            self.descending = not self.descending
+        else:
+            self.sort_col, self.descending = col_id, False
+        self._update_headings()
+        self.reload()
+
+    # --- Paging ---
+    def _on_scroll(self, first, last):
+        self._scroll_set(first, last)
+        if self._loading or not self._pages:
+            return
+        if float(last) >= 0.95 and self._more_below:
+            self._load_adjacent(forward=True)
+        elif float(first) <= 0.05 and self._more_above:
+            self._load_adjacent(forward=False)
+
+    def _load_adjacent(self, forward):
+        generation = self._generation
+        boundary = self._pages[-1][-1] if forward else self._pages[0][0]
+        query, params = self._page_query(boundary, forward)
+        self._loading = True
+
+        def show(rows):
+            if generation != self._generation:
+                return
+            self._loading = False
+            full = len(rows) == self.page_size
+            if forward:
+                self._more_below = full
+                if rows:
+                    anchor = self._row_iid(self._pages[-1][-1])
+                    self._append_page(rows)
+                    self._trim(from_top=True, anchor=anchor)
+            else:
+                self._more_above = full
+                if rows:
+                    anchor = self._row_iid(self._pages[0][0])
+                    self._prepend_page(list(reversed(rows)))
+                    self._trim(from_top=False, anchor=anchor)
+
+        self.run_job(lambda conn: fetch_all(conn, query, params), show, self._load_failed)
+
+    def _load_failed(self):
+        self._loading = False
+
+    def _append_page(self, rows):
+        self._pages.append(rows)
+        for row in rows:
+            self._insert(row, 'end')
+
+    def _prepend_page(self, rows):
+        self._pages.appendleft(rows)
+        for index, row in enumerate(rows):
+            self._insert(row, index)
+
+    def _trim(self, from_top, anchor):
+        """Drops whole pages from the far end so at most max_pages stay materialized."""
+        while len(self._pages) > self.max_pages:
+            page = self._pages.popleft() if from_top else self._pages.pop()
+            self.tree.delete(*[self._row_iid(row) for row in page])
+            if from_top:
+                self._more_above = True
+            else:
+                self._more_below = True
+        if self.tree.exists(anchor):
+            self.tree.see(anchor)
+
+    def _insert(self, row, index):
+        values, tags = self.format_row(row)
+        self.tree.insert('', index, iid=self._row_iid(row), values=values, tags=tags)
+
+    def _row_iid(self, row):
+        return str(row[self.key_index])
+
+    # --- Ordering (as the server sorts, for rows placed by apply_changes) ---
+    def _sort_key(self, row):
+        """(sort value, key) like the ORDER BY: NULLs first, strings case-insensitively like MySQL's collation."""
+        values = (row[[sql for (_, sql) in self.columns].index(self.sql_columns[self.sort_col])], row[self.key_index])
+        return tuple((value is not None, value.casefold() if isinstance(value, str) else value) for value in values)
+
+    def _before(self, row, other):
+        key, other_key = self._sort_key(row), self._sort_key(other)
+        return key > other_key if self.descending else key < other_key
+
+    def _within(self, row, window):
+        """Whether row sorts within the loaded pages (or beyond an end with nothing more to load)."""
+        if not window:
+            return not (self._more_above or self._more_below)
+        if self._more_above and self._before(row, window[0]):
+            return False
+        return not (self._more_below and self._before(window[-1], row))
+
+    def _place(self, rows, row):
+        index = next((i for i, other in enumerate(rows) if self._before(row, other)), len(rows))
+        rows.insert(index, row)
+
+    # --- SQL ---
+    def _page_query(self, boundary, forward):
+        """Builds the keyset query for the page after (or before) the boundary row."""
+        return keyset_page_query(self.table, [sql for (_, sql) in self.columns], self.key_column,
+                                 self.sql_columns[self.sort_col], self.descending, boundary, forward, self.page_size,
+                                 self.row_filter)
+
+    def _rows_query(self, keys):
+        """The rows with the given keys (that still match the filter), as a page query selects them."""
+        query = (f"SELECT {', '.join(sql for (_, sql) in self.columns)} FROM {self.table} "
+                 f"WHERE {self.key_column} IN ({', '.join(['%s'] * len(keys))})")
+        params = tuple(keys)
+        if self.row_filter is not None:
+            query += f" AND {self.row_filter[0]}"
+            params += tuple(self.row_filter[1])
+        return query, params
+
+    def _update_headings(self):
+        for col_id, text in self.headings.items():
+            if col_id == self.sort_col:
+                text = f"{text} {'▼' if self.descending else '▲'}"
+            self.tree.heading(col_id, text=text)
@@ -0,0 +1,226 @@
+"""
+Bulk import of payments from a CSV file (bank/UPI reconciliation exports).
+
+The CSV needs a header row with at least `Mem_ID` and `amount`; `Payment_date`
+(YYYY-MM-DD, defaults to today) and `Payment_status` are optional. The file is
+streamed row by row, Mem_IDs are checked against the Member table loaded once
+up front, and valid rows are inserted with executemany in batches, one
+transaction per batch. The per-row AfterPaymentInsert member update is deferred
+for the session and replaced by one set-based UPDATE per batch.
+
+Usage:
+    python payment_import.py payments.csv [--batch-size 1000] [--rejects rejected.csv]
+"""
+import argparse
+import csv
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+import mysql.connector
+
+from db import dialect, open_connection
+
+INSERT_PAYMENT = "INSERT INTO Payment (Mem_ID, amount, Payment_date, Payment_status) VALUES (%s, %s, %s, %s)"
+MAX_AMOUNT = Decimal('999999.99') # Payment.amount is DECIMAL(8, 2)
+
+# Does what AfterPaymentInsert would have done for every row of the batch, in one statement:
+# recomputes the members' ledger summary from their whole payment history (archived
+# payments included), moves Valid_until up to their latest payment and derives their
+# status from it.
+SYNC_MEMBERS = """
+    UPDATE Member m JOIN (
+        SELECT Mem_ID, SUM(amount) AS total_paid, COUNT(*) AS payment_count,
+               MIN(Payment_date) AS first_payment, MAX(Payment_date) AS last_payment,
+               MembershipValidUntil(MAX(Payment_date)) AS valid_until,
+               IF(MembershipValidUntil(MAX(Payment_date)) >= CURDATE(), 'Active', 'Inactive') AS status
+        FROM (
+            SELECT Mem_ID, amount, Payment_date FROM Payment WHERE Mem_ID IN ({ids})
+            UNION ALL
+            SELECT Mem_ID, amount, Payment_date FROM Payment_Archive WHERE Mem_ID IN ({ids})
+        ) AS h
+        GROUP BY Mem_ID
+    ) AS p ON m.Mem_ID = p.Mem_ID
+    SET m.Total_paid = p.total_paid, m.Payment_count = p.payment_count,
+        m.First_payment = p.first_payment, m.Last_payment = p.last_payment,
+        m.Valid_until = p.valid_until, m.Member_Status = p.status
+"""
+
+# The same for SQLite, which spells a multi-table UPDATE as UPDATE ... FROM
+SYNC_MEMBERS_SQLITE = """
+    UPDATE Member
+    SET Total_paid = p.total_paid, Payment_count = p.payment_count,
+        First_payment = p.first_payment, Last_payment = p.last_payment,
+        Valid_until = p.valid_until, Member_Status = p.status
+    FROM (
+        SELECT Mem_ID, ROUND(SUM(amount), 2) AS total_paid, COUNT(*) AS payment_count,
+               MIN(Payment_date) AS first_payment, MAX(Payment_date) AS last_payment,
+               MembershipValidUntil(MAX(Payment_date)) AS valid_until,
+               IF(MembershipValidUntil(MAX(Payment_date)) >= CURDATE(), 'Active', 'Inactive') AS status
+        FROM (
+            SELECT Mem_ID, amount, Payment_date FROM Payment WHERE Mem_ID IN ({ids})
+            UNION ALL
+            SELECT Mem_ID, amount, Payment_date FROM Payment_Archive WHERE Mem_ID IN ({ids})
+        ) AS h
+        GROUP BY Mem_ID
+    ) AS p
+    WHERE Member.Mem_ID = p.Mem_ID
+"""
+
+
+class ImportResult:
+    """Outcome of an import: counts, rejected rows and throughput."""
+
+    def __init__(self):
+        self.inserted = 0
+        self.rejected = [] # (line number, raw row dict, reason)
+        self.batches = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.inserted / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        return (f"Imported {self.inserted} payments in {self.batches} batches "
+                f"({self.elapsed:.2f}s, {self.rows_per_second:.0f} rows/s); {len(self.rejected)} rows rejected.")
+
+
+def parse_payment_row(row, member_ids, today):
+    """Validates one CSV row, returning (insert params, None) or (None, rejection reason)."""
+    mem_id = (row.get('mem_id') or '').strip()
+    if not mem_id:
+        return None, "Missing Mem_ID"
+    if mem_id not in member_ids:
+        return None, f"Unknown Mem_ID '{mem_id}'"
+
+    try:
+        amount = Decimal((row.get('amount') or '').strip().replace(',', '')).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        return None, f"Invalid amount '{row.get('amount')}'"
+    if amount <= 0 or amount > MAX_AMOUNT:
+        return None, f"Amount out of range: {amount}"
+
+    date_str = (row.get('payment_date') or '').strip()
+    if date_str:
+        try:
+            payment_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        except ValueError:
+            return None, f"Invalid Payment_date '{date_str}' (expected YYYY-MM-DD)"
+    else:
+        payment_date = today
+
+    status = (row.get('payment_status') or '').strip() or 'Completed'
+    return (mem_id, amount, payment_date, status), None
+
+
+def import_payments(conn, csv_file, batch_size=1000, progress=None):
+    """
+    Streams payments from an open CSV file into the Payment table.
+
+    Each batch is committed on its own, so a database error part-way through
+    leaves the earlier batches in place and re-raises. `progress(inserted,
+    rejected)` is called after every batch.
+    """
+    result = ImportResult()
+    started = time.perf_counter()
+
+    reader = csv.DictReader(csv_file)
+    if not reader.fieldnames:
+        raise ValueError("The CSV file is empty.")
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    missing = {'mem_id', 'amount'} - set(reader.fieldnames)
+    if missing:
+        raise ValueError(f"The CSV file is missing required column(s): {', '.join(sorted(missing))}")
+
+    cursor = conn.cursor()
+    cursor.execute("SET @defer_member_status = 1")
+    try:
+        # One pass over Member instead of a lookup per CSV row
+        cursor.execute("SELECT Mem_ID FROM Member")
+        member_ids = {mem_id for (mem_id,) in cursor}
+
+        today = date.today()
+        batch = []
+        for line_no, row in enumerate(reader, start=2):
+            params, reason = parse_payment_row(row, member_ids, today)
+            if reason:
+                result.rejected.append((line_no, row, reason))
+                continue
+            batch.append(params)
+            if len(batch) >= batch_size:
+                _insert_batch(conn, cursor, batch, result)
+                batch = []
+                if progress:
+                    progress(result.inserted, len(result.rejected))
+        if batch:
+            _insert_batch(conn, cursor, batch, result)
+            if progress:
+                progress(result.inserted, len(result.rejected))
+    finally:
+        # Pooled connections are reused: never leave the trigger switched off.
+        # If this fails the connection is broken and its session goes with it.
+        try:
+            cursor.execute("SET @defer_member_status = NULL")
+        except mysql.connector.Error:
+            pass
+        cursor.close()
+
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def _insert_batch(conn, cursor, batch, result):
+    try:
+        cursor.executemany(INSERT_PAYMENT, batch)
+        mem_ids = list({params[0] for params in batch})
+        sync_members = SYNC_MEMBERS_SQLITE if dialect(conn) == 'sqlite' else SYNC_MEMBERS
+        cursor.execute(sync_members.format(ids=', '.join(['%s'] * len(mem_ids))), mem_ids + mem_ids)
+        conn.commit()
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    result.inserted += len(batch)
+    result.batches += 1
+
+
+def write_rejects(result, path):
+    """Writes the rejected rows to a CSV with the line number and reason for each."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['line', 'reason', 'Mem_ID', 'amount', 'Payment_date', 'Payment_status'])
+        for line_no, row, reason in result.rejected:
+            writer.writerow([line_no, reason, row.get('mem_id'), row.get('amount'), row.get('payment_date'), row.get('payment_status')])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import payments from a CSV file.")
+    parser.add_argument('csv_path')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--rejects', help="Write rejected rows (with reasons) to this CSV file")
+    args = parser.parse_args(argv)
+
+    conn = open_connection()
+    try:
+        with open(args.csv_path, newline='', encoding='utf-8-sig') as f:
+            result = import_payments(conn, f, batch_size=args.batch_size,
+                                     progress=lambda inserted, rejected: print(f"  {inserted} inserted, {rejected} rejected", file=sys.stderr))
+    finally:
+        conn.close()
+
+    print(result.summary())
+    if result.rejected:
+        if args.rejects:
+            write_rejects(result, args.rejects)
+            print(f"Rejected rows written to {args.rejects}")
+        else:
+            for line_no, _, reason in result.rejected[:20]:
+                print(f"  line {line_no}: {reason}")
+            if len(result.rejected) > 20:
+                print(f"  ... and {len(result.rejected) - 20} more (use --rejects to save them all)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
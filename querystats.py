@@ -0,0 +1,198 @@
+import json
+import re
+import threading
+import time
+from datetime import datetime
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"%s(?:\s*,\s*%s)+")
+
+
+def normalize(statement):
+    """One line per statement, with IN lists of any length folded together."""
+    return _PLACEHOLDER_LIST.sub("%s, ...", _WHITESPACE.sub(" ", statement).strip())
+
+
+def call_site(work):
+    """
+    A readable label for a job function: 'GymApp.handle_add_payment' for a
+    closure or lambda defined in that method, 'repository.list_trainers' for a
+    module-level function.
+    """
+    name = getattr(work, '__qualname__', None)
+    if name is None:
+        return repr(work)
+    name = name.split('.<locals>')[0]
+    return name if '.' in name else f"{work.__module__}.{name}"
+
+
+class QueryStats:
+    """
+    Thread-safe per-statement timing: call counts, row counts, errors and a
+    latency histogram for each (call-site label, statement) pair.
+
+    Statements are timed by InstrumentedCursor, from execute() until the
+    results have been fetched, and attributed to the label set with
+    `with stats.label(...)` on the calling thread (the app sets it for every
+    background job, see submit_db_job).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._entries = {}  # (label, statement) -> dict, see record()
+        self.since = datetime.now()
+
+    # --- Recording ---
+    def label(self, name):
+        return _Label(self._local, name)
+
+    def current_label(self):
+        return getattr(self._local, 'label', None) or 'unlabelled'
+
+    def record(self, statement, millis, rows, error=False, label=None):
+        key = (label or self.current_label(), normalize(statement))
+        bucket = next((i for i, bound in enumerate(BUCKETS_MS) if millis <= bound), len(BUCKETS_MS))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {'calls': 0, 'errors': 0, 'rows': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                                              'histogram': [0] * (len(BUCKETS_MS) + 1)}
+            entry['calls'] += 1
+            entry['errors'] += bool(error)
+            entry['rows'] += max(rows or 0, 0)
+            entry['total_ms'] += millis
+            entry['max_ms'] = max(entry['max_ms'], millis)
+            entry['histogram'][bucket] += 1
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+            self.since = datetime.now()
+
+    # --- Reporting ---
+    def summaries(self):
+        """One dict per (label, statement), with mean and histogram-estimated p50/p95."""
+        with self._lock:
+            entries = [(key, dict(entry, histogram=list(entry['histogram']))) for key, entry in self._entries.items()]
+        result = []
+        for (label, statement), entry in entries:
+            entry.update(label=label, statement=statement, mean_ms=entry['total_ms'] / entry['calls'],
+                         p50_ms=_estimate(entry, 0.50), p95_ms=_estimate(entry, 0.95))
+            result.append(entry)
+        return result
+
+    def top(self, n=20, by='p95_ms'):
+        """The n entries with the highest `by` (e.g. 'p95_ms', 'total_ms', 'calls')."""
+        return sorted(self.summaries(), key=lambda entry: entry[by], reverse=True)[:n]
+
+    def dump(self, path):
+        """Writes every entry, histogram included, to a JSON file for offline analysis."""
+        report = {
+            'since': self.since.isoformat(timespec='seconds'),
+            'dumped_at': datetime.now().isoformat(timespec='seconds'),
+            'bucket_upper_bounds_ms': list(BUCKETS_MS) + [None],
+            'queries': sorted(self.summaries(), key=lambda entry: entry['total_ms'], reverse=True),
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+def _estimate(entry, fraction):
+    """Upper bound of the histogram bucket holding the given fraction of calls (capped at the max seen)."""
+    target = fraction * entry['calls']
+    seen = 0
+    for bound, count in zip(BUCKETS_MS + (None,), entry['histogram']):
+        seen += count
+        if seen >= target and count:
+            return min(bound, entry['max_ms']) if bound is not None else entry['max_ms']
+    return entry['max_ms']
+
+
+class _Label:
+    def __init__(self, local, name):
+        self._local = local
+        self._name = name
+
+    def __enter__(self):
+        self._previous = getattr(self._local, 'label', None)
+        self._local.label = self._name
+
+    def __exit__(self, exc_type, exc, tb):
+        self._local.label = self._previous
+
+
+class InstrumentedCursor:
+    """
+    Wraps a DB-API cursor so every statement is recorded in a QueryStats.
+
+    A statement's time runs from execute() through the fetches that follow it
+    (unbuffered cursors do the real work while fetching). Statements without
+    a result set are recorded straight away, queries when the next statement
+    starts or the cursor is closed.
+    """
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+        self._pending = None  # [statement, label, elapsed seconds, rows fetched or None]
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def execute(self, operation, params=(), *args, **kwargs):
+        return self._timed(operation, self._cursor.execute, operation, params, *args, **kwargs)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        return self._timed(operation, self._cursor.executemany, operation, seq_params, *args, **kwargs)
+
+    def callproc(self, procname, args=()):
+        return self._timed(f"CALL {procname}", self._cursor.callproc, procname, args)
+
+    def fetchone(self):
+        return self._fetched(self._cursor.fetchone, lambda row: row is not None)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._fetched(lambda: self._cursor.fetchmany(*args, **kwargs), len)
+
+    def fetchall(self):
+        return self._fetched(self._cursor.fetchall, len)
+
+    def close(self):
+        self._flush()
+        return self._cursor.close()
+
+    def _timed(self, statement, method, *args, **kwargs):
+        self._flush()
+        started = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except Exception:
+            self._stats.record(statement, (time.perf_counter() - started) * 1000, 0, error=True)
+            raise
+        self._pending = [statement, self._stats.current_label(), time.perf_counter() - started, None]
+        if getattr(self._cursor, 'description', None) is None:
+            self._flush() # No result set to fetch (INSERT, UPDATE, ...)
+        return result
+
+    def _fetched(self, fetch, count):
+        started = time.perf_counter()
+        result = fetch()
+        if self._pending is not None:
+            self._pending[2] += time.perf_counter() - started
+            self._pending[3] = (self._pending[3] or 0) + count(result)
+        return result
+
+    def _flush(self):
+        if self._pending is None:
+            return
+        statement, label, elapsed, fetched = self._pending
+        self._pending = None
+        rows = fetched if fetched is not None else getattr(self._cursor, 'rowcount', 0)
+        self._stats.record(statement, elapsed * 1000, rows, label=label)
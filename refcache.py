@@ -0,0 +1,90 @@
+import threading
+import time
+
+
+class ReferenceCache:
+    """
+    In-process cache for small reference tables (members, trainers, exercises).
+
+    Each registered entry has a `load(conn)` function that builds the cached
+    value and an optional `signature(conn)` function returning a cheap
+    fingerprint of the underlying table (e.g. row count and max id).
+
+    - invalidate(name) bumps the entry's version and drops the cached value;
+      the app calls it after its own inserts/deletes.
+    - After `check_after` seconds the signature is re-queried; if it still
+      matches, the cached value is kept (changes made at other desks show up
+      as a different signature).
+    - After `max_age` seconds the value is reloaded regardless, which catches
+      edits that do not change the signature.
+    """
+
+    def __init__(self, check_after=30, max_age=600):
+        self.check_after = check_after
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._loaders = {}   # name -> (load, signature)
+        self._entries = {}   # name -> {'value', 'signature', 'loaded_at', 'checked_at'}
+        self._versions = {}  # name -> int, bumped on every invalidation
+        self._counters = {'hits': 0, 'misses': 0, 'revalidations': 0, 'invalidations': 0}
+
+    def register(self, name, load, signature=None):
+        with self._lock:
+            self._loaders[name] = (load, signature)
+            self._versions.setdefault(name, 0)
+
+    def peek(self, name):
+        """Returns the cached value if it can be used without touching the database, else None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or now - entry['checked_at'] >= self.check_after or now - entry['loaded_at'] >= self.max_age:
+                return None
+            self._counters['hits'] += 1
+            return entry['value']
+
+    def get(self, name, conn):
+        """Returns the cached value, revalidating or reloading it with `conn` when needed."""
+        value = self.peek(name)
+        if value is not None:
+            return value
+
+        load, signature = self._loaders[name]
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(name)
+            version = self._versions[name]
+
+        # Cheap change-detection before paying for a full reload
+        if entry is not None and signature is not None and now - entry['loaded_at'] < self.max_age:
+            current = signature(conn)
+            if current == entry['signature']:
+                with self._lock:
+                    if self._entries.get(name) is entry:
+                        entry['checked_at'] = time.monotonic()
+                    self._counters['revalidations'] += 1
+                return entry['value']
+
+        sig = signature(conn) if signature is not None else None
+        value = load(conn)
+        with self._lock:
+            self._counters['misses'] += 1
+            # Don't cache a value that raced with an invalidation; the next read reloads it.
+            if self._versions[name] == version:
+                loaded_at = time.monotonic()
+                self._entries[name] = {'value': value, 'signature': sig,
+                                       'loaded_at': loaded_at, 'checked_at': loaded_at}
+        return value
+
+    def invalidate(self, name):
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+            self._entries.pop(name, None)
+            self._counters['invalidations'] += 1
+
+    def stats(self):
+        """Returns a snapshot of the hit/miss counters plus the version of each entry."""
+        with self._lock:
+            snapshot = dict(self._counters)
+            snapshot['versions'] = dict(self._versions)
+        return snapshot
@@ -0,0 +1,380 @@
+"""
+Data access for the gym database, kept free of Tk so it can be reused,
+profiled and benchmarked on its own (see benchmarks/repository_bench.py).
+
+Every function takes an open connection (pooled or not) as its first argument
+and returns plain records; writes commit before returning. All statements go
+through fetch_all / execute_and_commit, which is the one place to hang
+caching, batching or instrumentation off. Check-in/out lives in checkin.py,
+bulk payment import in payment_import.py and scheduled jobs in maintenance.py.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+from decimal import Decimal
+from typing import NamedTuple, Optional
+
+# Sessions named by the change feed are looked up with IN lists of at most this many ids
+OPEN_SESSIONS_CHUNK = 500
+
+
+# ==================================================================
+# RECORDS
+# ==================================================================
+class OpenSession(NamedTuple):
+    attendance_id: int
+    mem_id: str
+    name: str
+    check_in: datetime
+
+
+class Visit(NamedTuple):
+    attendance_id: int
+    check_in: datetime
+    check_out: Optional[datetime]
+    duration_minutes: Optional[int]
+
+
+class PlanLine(NamedTuple):
+    trainer_name: Optional[str]
+    exercise_name: Optional[str]
+    reps_sets_info: Optional[str]
+
+
+class PaymentSummary(NamedTuple):
+    total_paid: Decimal
+    payment_count: int
+    first_payment: Optional[date]
+    last_payment: Optional[date]
+
+
+class MemberDetails(NamedTuple):
+    payments: PaymentSummary
+    visits: list[Visit]
+    plan_lines: list[PlanLine]
+
+
+class Trainer(NamedTuple):
+    trainer_id: int
+    name: str
+    salary: Decimal
+    date_hired: date
+
+
+class WorkoutPlan(NamedTuple):
+    plan_id: int
+    member_name: str
+    trainer_name: str
+    start_date: date
+    end_date: Optional[date]
+
+
+class PlanExercise(NamedTuple):
+    exercise_name: str
+    reps_sets_info: Optional[str]
+    exercise_id: int
+
+
+class HourlyOccupancy(NamedTuple):
+    hour_start: datetime
+    check_ins: int
+    occupied_seconds: int
+
+
+class DailyOccupancy(NamedTuple):
+    day: date
+    check_ins: int
+    occupied_seconds: int
+
+
+# ==================================================================
+# HELPERS
+# ==================================================================
+def fetch_all(conn, query, params=()):
+    """Runs a SELECT and returns every row."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def execute_and_commit(conn, query, params=()):
+    """Runs a single write statement, commits it and returns the affected row count."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def like_prefix(text) -> str:
+    """A LIKE pattern (for ESCAPE '!') matching values that start with text."""
+    return text.replace('!', '!!').replace('%', '!%').replace('_', '!_') + '%'
+
+
+# ==================================================================
+# ATTENDANCE
+# ==================================================================
+# Sessions still open, for the "currently in" list (served by idx_attendance_open).
+CURRENTLY_IN_QUERY = """
+    SELECT a.Attendance_ID, a.Mem_ID, m.Name, a.check_in
+    FROM Attendance a
+    JOIN Member m ON a.Mem_ID = m.Mem_ID
+    WHERE a.check_out IS NULL
+"""
+
+# Attendance history for the member details window, one row per visit with its
+# duration in minutes (NULL while the member is still checked in). Visits moved to
+# Attendance_Archive (archive.py) are included; each half is a range on the member.
+MEMBER_ATTENDANCE_QUERY = """
+    SELECT Attendance_ID, check_in, check_out, TIMESTAMPDIFF(MINUTE, check_in, check_out)
+    FROM Attendance
+    WHERE Mem_ID = %s
+    UNION ALL
+    SELECT Attendance_ID, check_in, check_out, TIMESTAMPDIFF(MINUTE, check_in, check_out)
+    FROM Attendance_Archive
+    WHERE Mem_ID = %s
+    ORDER BY check_in
+"""
+
+
+def open_sessions(conn) -> list[OpenSession]:
+    """Every open session."""
+    return [OpenSession(*row) for row in fetch_all(conn, CURRENTLY_IN_QUERY)]
+
+
+def open_sessions_by_id(conn, attendance_ids) -> list[OpenSession]:
+    """The sessions among attendance_ids that are still open (for changes read off the change feed)."""
+    attendance_ids = list(attendance_ids)
+    sessions = []
+    for i in range(0, len(attendance_ids), OPEN_SESSIONS_CHUNK):
+        chunk = attendance_ids[i:i + OPEN_SESSIONS_CHUNK]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        rows = fetch_all(conn, CURRENTLY_IN_QUERY + f" AND a.Attendance_ID IN ({placeholders})", chunk)
+        sessions.extend(OpenSession(*row) for row in rows)
+    return sessions
+
+
+def member_visits(conn, mem_id) -> list[Visit]:
+    """A member's whole attendance history (archived visits included) with durations, in one round-trip."""
+    return [Visit(*row) for row in fetch_all(conn, MEMBER_ATTENDANCE_QUERY, (mem_id, mem_id))]
+
+
+# ==================================================================
+# MEMBERS
+# ==================================================================
+def member_names(conn) -> dict[str, str]:
+    """{name: Mem_ID} for the plan combos."""
+    return {name: mem_id for (mem_id, name) in fetch_all(conn, "SELECT Mem_ID, Name FROM Member")}
+
+
+def member_signature(conn) -> tuple:
+    """Cheap fingerprint of the Member table for the reference cache."""
+    return fetch_all(conn, "SELECT COUNT(*), MAX(Mem_ID) FROM Member")[0]
+
+
+def member_search_filter(text):
+    """
+    (condition, params) matching members whose Mem_ID, Name or Phone_no starts
+    with text, for the Members tab search; None for an empty search. Each prefix
+    is a range scan (the primary key, idx_member_name and the Phone_no unique
+    index), so this stays fast however many members there are.
+    """
+    text = text.strip()
+    if not text:
+        return None
+    pattern = like_prefix(text)
+    return ("(Mem_ID LIKE %s ESCAPE '!' OR Name LIKE %s ESCAPE '!' OR Phone_no LIKE %s ESCAPE '!')",
+            (pattern, pattern, pattern))
+
+
+def add_member(conn, mem_id, name, phone_no, age, join_date):
+    query = "INSERT INTO Member (Mem_ID, Name, Phone_no, Age, Join_date) VALUES (%s, %s, %s, %s, %s)"
+    execute_and_commit(conn, query, (mem_id, name, phone_no, age, join_date))
+
+
+def delete_member(conn, mem_id) -> int:
+    """Deletes a member (payments, attendance and plans cascade); returns the rows deleted."""
+    return execute_and_commit(conn, "DELETE FROM Member WHERE Mem_ID = %s", (mem_id,))
+
+
+def member_payment_summary(conn, mem_id) -> PaymentSummary:
+    """The member's ledger summary, kept on the Member row by the Payment triggers (one primary-key lookup)."""
+    rows = fetch_all(conn, "SELECT Total_paid, Payment_count, First_payment, Last_payment FROM Member WHERE Mem_ID = %s", (mem_id,))
+    return PaymentSummary(*rows[0]) if rows else PaymentSummary(Decimal('0.00'), 0, None, None)
+
+
+def member_plan_lines(conn, mem_id) -> list[PlanLine]:
+    """One line per exercise in the member's plans (a plan without exercises gives one line of NULLs)."""
+    query = """
+        SELECT t.Name, e.Exercise_name, pe.reps_sets_info
+        FROM Workout_Plan w
+        LEFT JOIN Trainers t ON w.Trainer_ID = t.Trainer_ID
+        LEFT JOIN Plan_Exercises pe ON w.Plan_ID = pe.Plan_ID
+        LEFT JOIN Exercises e ON pe.Exercise_ID = e.Exercise_ID
+        WHERE w.Mem_ID = %s
+    """
+    return [PlanLine(*row) for row in fetch_all(conn, query, (mem_id,))]
+
+
+def member_details(conn, mem_id) -> MemberDetails:
+    """Everything the member details window shows."""
+    return MemberDetails(member_payment_summary(conn, mem_id), member_visits(conn, mem_id), member_plan_lines(conn, mem_id))
+
+
+def resync_all_member_statuses(conn):
+    """Runs the full UpdateAllMemberStatuses resync."""
+    cursor = conn.cursor()
+    try:
+        cursor.callproc('UpdateAllMemberStatuses')
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+# ==================================================================
+# PAYMENTS
+# ==================================================================
+def payment_search_filter(member='', date_from=None, date_to=None, amount_min=None, amount_max=None):
+    """
+    (condition, params) for the Payments tab filters, None if none are set.
+
+    `member` matches by Mem_ID or name prefix (the member search above, then
+    idx_payment_member_date); a date range alone is served by idx_payment_date.
+    The amount range is applied to the rows those select.
+    """
+    conditions, params = [], []
+    member = member.strip()
+    if member:
+        pattern = like_prefix(member)
+        conditions.append("Mem_ID IN (SELECT Mem_ID FROM Member WHERE Mem_ID LIKE %s ESCAPE '!' OR Name LIKE %s ESCAPE '!')")
+        params += [pattern, pattern]
+    for condition, value in (("Payment_date >= %s", date_from), ("Payment_date <= %s", date_to),
+                             ("amount >= %s", amount_min), ("amount <= %s", amount_max)):
+        if value is not None:
+            conditions.append(condition)
+            params.append(value)
+    if not conditions:
+        return None
+    return " AND ".join(conditions), tuple(params)
+
+
+def add_payment(conn, mem_id, amount, payment_date):
+    """Records one payment; AfterPaymentInsert updates the member's Valid_until and status."""
+    query = "INSERT INTO Payment (Mem_ID, amount, Payment_date) VALUES (%s, %s, %s)"
+    execute_and_commit(conn, query, (mem_id, amount, payment_date))
+
+
+# ==================================================================
+# TRAINERS
+# ==================================================================
+def list_trainers(conn) -> list[Trainer]:
+    return [Trainer(*row) for row in fetch_all(conn, "SELECT Trainer_ID, Name, Salary, Date_hired FROM Trainers")]
+
+
+def trainer_names(conn) -> dict[str, int]:
+    """{name: Trainer_ID} for the plan combos."""
+    return {name: trainer_id for (trainer_id, name) in fetch_all(conn, "SELECT Trainer_ID, Name FROM Trainers")}
+
+
+def trainer_signature(conn) -> tuple:
+    return fetch_all(conn, "SELECT COUNT(*), MAX(Trainer_ID) FROM Trainers")[0]
+
+
+def add_trainer(conn, name, salary, date_hired):
+    query = "INSERT INTO Trainers (Name, Salary, Date_hired) VALUES (%s, %s, %s)"
+    execute_and_commit(conn, query, (name, salary, date_hired))
+
+
+def delete_trainer(conn, trainer_id) -> int:
+    """Deletes a trainer (their workout plans cascade); returns the rows deleted."""
+    return execute_and_commit(conn, "DELETE FROM Trainers WHERE Trainer_ID = %s", (trainer_id,))
+
+
+# ==================================================================
+# WORKOUT PLANS AND EXERCISES
+# ==================================================================
+WORKOUT_PLANS_QUERY = """
+    SELECT w.Plan_ID, m.Name, t.Name, w.Start_date, w.End_date
+    FROM Workout_Plan w
+    JOIN Member m ON w.Mem_ID = m.Mem_ID
+    JOIN Trainers t ON w.Trainer_ID = t.Trainer_ID
+"""
+
+
+def list_workout_plans(conn, plan_ids=None) -> list[WorkoutPlan]:
+    """Every workout plan, or only those with the given Plan_IDs (that still exist)."""
+    if plan_ids is None:
+        rows = fetch_all(conn, WORKOUT_PLANS_QUERY)
+    else:
+        plan_ids = list(plan_ids)
+        if not plan_ids:
+            return []
+        rows = fetch_all(conn, WORKOUT_PLANS_QUERY + f" WHERE w.Plan_ID IN ({', '.join(['%s'] * len(plan_ids))})", plan_ids)
+    return [WorkoutPlan(*row) for row in rows]
+
+
+def create_workout_plan(conn, mem_id, trainer_id, start_date, end_date=None):
+    query = """
+        INSERT INTO Workout_Plan (Mem_ID, Trainer_ID, Start_date, End_date)
+        VALUES (%s, %s, %s, %s)
+    """
+    execute_and_commit(conn, query, (mem_id, trainer_id, start_date, end_date))
+
+
+def plan_exercises(conn, plan_id) -> list[PlanExercise]:
+    query = """
+        SELECT e.Exercise_name, pe.reps_sets_info, e.Exercise_ID
+        FROM Plan_Exercises pe
+        JOIN Exercises e ON pe.Exercise_ID = e.Exercise_ID
+        WHERE pe.Plan_ID = %s
+    """
+    return [PlanExercise(*row) for row in fetch_all(conn, query, (plan_id,))]
+
+
+def add_plan_exercise(conn, plan_id, exercise_id, reps_sets_info):
+    """Adds an exercise to a plan; raises IntegrityError (errno 1062) if it is already there."""
+    query = "INSERT INTO Plan_Exercises (Plan_ID, Exercise_ID, reps_sets_info) VALUES (%s, %s, %s)"
+    execute_and_commit(conn, query, (plan_id, exercise_id, reps_sets_info))
+
+
+def remove_plan_exercise(conn, plan_id, exercise_id) -> int:
+    query = "DELETE FROM Plan_Exercises WHERE Plan_ID = %s AND Exercise_ID = %s"
+    return execute_and_commit(conn, query, (plan_id, exercise_id))
+
+
+def exercise_names(conn) -> dict[str, int]:
+    """{name: Exercise_ID} for the manage-exercises window."""
+    return {name: ex_id for (ex_id, name) in fetch_all(conn, "SELECT Exercise_ID, Exercise_name FROM Exercises")}
+
+
+def exercise_signature(conn) -> tuple:
+    return fetch_all(conn, "SELECT COUNT(*), MAX(Exercise_ID) FROM Exercises")[0]
+
+
+# ==================================================================
+# OCCUPANCY (rollups maintained by occupancy.py)
+# ==================================================================
+def hourly_occupancy(conn, since, until) -> list[HourlyOccupancy]:
+    """Rolled-up hours from the start of day `since` up to (not including) day `until`."""
+    query = """
+        SELECT Hour_start, Check_ins, Occupied_seconds FROM Occupancy_Hourly
+        WHERE Hour_start >= %s AND Hour_start < %s
+        ORDER BY Hour_start
+    """
+    return [HourlyOccupancy(*row) for row in fetch_all(conn, query, (datetime.combine(since, datetime.min.time()),
+                                                                      datetime.combine(until, datetime.min.time())))]
+
+
+def daily_occupancy(conn, since, until) -> list[DailyOccupancy]:
+    """Rolled-up days from `since` up to (not including) `until`, newest first."""
+    query = """
+        SELECT Day, Check_ins, Occupied_seconds FROM Occupancy_Daily
+        WHERE Day >= %s AND Day < %s
+        ORDER BY Day DESC
+    """
+    return [DailyOccupancy(*row) for row in fetch_all(conn, query, (since, until))]
@@ -0,0 +1,381 @@
+"""
+Embedded SQLite backend, selected with DB_BACKEND = "sqlite" in config.py.
+
+For a single-desk install (no MySQL server to run) and for running the
+benchmarks in-process. connect() returns a connection that behaves like a
+mysql.connector one as far as this application uses it:
+
+* `%s` placeholders, and the handful of MySQL-only constructs the queries use
+  (TIMESTAMPDIFF/DATE_ADD units, IF(), <=>, FOR UPDATE), are rewritten on the
+  way in;
+* the stored functions (CalculateWorkoutDuration, GetTotalMemberPayments,
+  MembershipValidUntil) and CURDATE()/NOW() are registered on every
+  connection, and callproc() runs Python versions of the procedures;
+* `SET @name = ...` sets a per-connection session variable, which the
+  triggers read through session_variable(name);
+* errors are raised as mysql.connector errors with the MySQL errno/SQLSTATE,
+  so the existing handlers (duplicate entry 1062, expired membership 45000)
+  work unchanged.
+
+The schema (gym_management_sqlite.sql) is created the first time an empty
+database file is opened. WAL mode lets the GUI, the kiosk service and the
+maintenance runner read while one of them writes.
+"""
+import functools
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from mysql.connector import errors
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gym_management_sqlite.sql')
+SCHEMA_VERSION = 6 # Raise with the script's user_version; older files re-run the (idempotent) script
+
+# Columns added to existing tables, which the script's CREATE TABLE IF NOT EXISTS
+# leaves alone: (schema version, table, column added, statements), run before the
+# script on files older than that version.
+SCHEMA_UPGRADES = [
+    (4, 'Member', 'Total_paid', [
+        "ALTER TABLE Member ADD COLUMN Total_paid DECIMAL(12, 2) NOT NULL DEFAULT 0",
+        "ALTER TABLE Member ADD COLUMN Payment_count INT NOT NULL DEFAULT 0",
+        "ALTER TABLE Member ADD COLUMN First_payment DATE",
+        "ALTER TABLE Member ADD COLUMN Last_payment DATE",
+        """UPDATE Member
+           SET Total_paid = (SELECT COALESCE(ROUND(SUM(amount), 2), 0) FROM Payment p WHERE p.Mem_ID = Member.Mem_ID),
+               Payment_count = (SELECT COUNT(*) FROM Payment p WHERE p.Mem_ID = Member.Mem_ID),
+               First_payment = (SELECT MIN(Payment_date) FROM Payment p WHERE p.Mem_ID = Member.Mem_ID),
+               Last_payment = (SELECT MAX(Payment_date) FROM Payment p WHERE p.Mem_ID = Member.Mem_ID)""",
+    ]),
+]
+
+BUSY_TIMEOUT = 5.0 # Seconds a writer waits for another connection's write to finish
+
+MEMBERSHIP_DAYS = 31 # As MembershipValidUntil in gym_management.sql
+
+# MySQL errno/SQLSTATE for the SQLite errors the application cares about
+_ERROR_CODES = {
+    'SQLITE_CONSTRAINT_TRIGGER': (errors.DatabaseError, 1644, '45000'),     # SIGNAL in a trigger
+    'SQLITE_CONSTRAINT_PRIMARYKEY': (errors.IntegrityError, 1062, '23000'), # Duplicate entry
+    'SQLITE_CONSTRAINT_UNIQUE': (errors.IntegrityError, 1062, '23000'),
+    'SQLITE_CONSTRAINT_FOREIGNKEY': (errors.IntegrityError, 1452, '23000'),
+    'SQLITE_CONSTRAINT_NOTNULL': (errors.IntegrityError, 1048, '23000'),
+}
+
+_TIME_UNITS = {'SECOND': 1, 'MINUTE': 60, 'HOUR': 3600, 'DAY': 86400}
+
+_SET_VARIABLE = re.compile(r"\s*SET\s+@(\w+)\s*=\s*(.+?)\s*;?\s*$", re.IGNORECASE | re.DOTALL)
+
+# Quoted string literals, which the rewrites below leave alone
+_LITERAL = re.compile(r"""('(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*")""")
+
+# MySQL syntax -> SQLite, applied in order outside string literals
+_REWRITES = [
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\s+FOR\s+UPDATE\b", re.IGNORECASE), ""),
+    (re.compile(r"\bTIMESTAMPDIFF\(\s*(\w+)\s*,", re.IGNORECASE), r"TIMESTAMPDIFF('\1',"),
+    (re.compile(r"\bINTERVAL\s+([^\s,()]+)\s+(\w+)", re.IGNORECASE), r"\1, '\2'"),
+    (re.compile(r"\bIF\(", re.IGNORECASE), "IIF("),
+    (re.compile(r"<=>"), " IS "),
+]
+
+# Statements translated recently; IN lists of every length make for an open-ended set
+TRANSLATE_CACHE_SIZE = 512
+
+_schema_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=TRANSLATE_CACHE_SIZE)
+def translate(operation):
+    """Rewrites a MySQL statement for SQLite (cached per statement text)."""
+    # re.split with a group: code and literals alternate, code at the even indexes
+    parts = _LITERAL.split(operation)
+    for i in range(0, len(parts), 2):
+        for pattern, replacement in _REWRITES:
+            parts[i] = pattern.sub(replacement, parts[i])
+    return ''.join(parts)
+
+
+# ==================================================================
+# TYPES
+# ==================================================================
+# Stored as ISO text, which also sorts and compares correctly. DATETIME drops
+# the fractional seconds, as a MySQL DATETIME column does.
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' ', 'seconds'))
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter('DATE', lambda raw: date.fromisoformat(raw.decode()[:10]))
+sqlite3.register_converter('DATETIME', lambda raw: datetime.fromisoformat(raw.decode()))
+sqlite3.register_converter('DECIMAL', lambda raw: Decimal(raw.decode()).quantize(Decimal('0.01')))
+
+
+def _parse(value):
+    # Text when called from SQL, already converted when the UDF reads a DATETIME column itself
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _timestampdiff(unit, start, end):
+    start, end = _parse(start), _parse(end)
+    if start is None or end is None:
+        return None
+    return int((end - start).total_seconds() / _TIME_UNITS[unit.upper()])
+
+
+def _date_add(value, amount, unit):
+    if value is None or amount is None:
+        return None
+    result = datetime.fromisoformat(value) + timedelta(seconds=float(amount) * _TIME_UNITS[unit.upper()])
+    return result.date().isoformat() if len(value) <= 10 else result.isoformat(' ', 'seconds')
+
+
+def _membership_valid_until(payment_date):
+    if payment_date is None:
+        return None
+    return (date.fromisoformat(payment_date[:10]) + timedelta(days=MEMBERSHIP_DAYS)).isoformat()
+
+
+# ==================================================================
+# CONNECTION
+# ==================================================================
+def connect(database, **_):
+    """Opens (creating if needed) the database file; other DB_CONFIG-style keys are ignored."""
+    return SQLiteConnection(database)
+
+
+class SQLiteConnection:
+    dialect = 'sqlite'
+
+    def __init__(self, database):
+        self.database = database
+        self._open()
+
+    def _open(self):
+        try:
+            conn = sqlite3.connect(self.database, timeout=BUSY_TIMEOUT, detect_types=sqlite3.PARSE_DECLTYPES,
+                                   check_same_thread=False) # Pooled connections move between worker threads
+        except sqlite3.Error as err:
+            raise _mysql_error(err) from err
+        self._conn = conn
+        self.variables = {}
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+
+        variables = self.variables
+        conn.create_function('session_variable', 1, lambda name: variables.get(name.lower()))
+        conn.create_function('CURDATE', 0, lambda: date.today().isoformat())
+        conn.create_function('NOW', 0, lambda: datetime.now().isoformat(' ', 'seconds'))
+        conn.create_function('TIMESTAMPDIFF', 3, _timestampdiff, deterministic=True)
+        conn.create_function('DATE_ADD', 3, _date_add, deterministic=True)
+        conn.create_function('DATE_SUB', 3, lambda value, amount, unit: _date_add(value, -float(amount), unit), deterministic=True)
+        conn.create_function('MembershipValidUntil', 1, _membership_valid_until, deterministic=True)
+        # The two stored functions look rows up, like their MySQL versions
+        # (CAST, so the column's DECIMAL converter leaves it a number SQLite can return)
+        conn.create_function('GetTotalMemberPayments', 1, lambda mem_id: (conn.execute(
+            "SELECT CAST(Total_paid AS REAL) FROM Member WHERE Mem_ID = ?", (mem_id,)).fetchone() or (0,))[0])
+        conn.create_function('CalculateWorkoutDuration', 1, lambda att_id: _timestampdiff('MINUTE', *(conn.execute(
+            "SELECT check_in, check_out FROM Attendance WHERE Attendance_ID = ?", (att_id,)).fetchone() or (None, None))))
+
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            with _schema_lock, open(SCHEMA_FILE, encoding='utf-8') as f:
+                _upgrade(conn, version)
+                conn.executescript(f.read()) # Idempotent, so a racing process is harmless
+
+    def cursor(self, prepared=False, buffered=None):
+        # Statements are cached by sqlite3 anyway, so prepared cursors are ordinary ones,
+        # and rows are always read as they are fetched (unbuffered)
+        return SQLiteCursor(self)
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def commit(self):
+        try:
+            self._conn.commit()
+        except sqlite3.Error as err:
+            raise _mysql_error(err) from err
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        try:
+            self._conn.execute("SELECT 1")
+        except sqlite3.Error as err:
+            if not reconnect:
+                raise _mysql_error(err) from err
+            self.reconnect()
+
+    def reconnect(self, attempts=1, delay=0):
+        try:
+            self._conn.close()
+        except sqlite3.Error:
+            pass
+        self._open()
+
+    def close(self):
+        self._conn.close()
+
+
+def _upgrade(conn, version):
+    for upgrade_version, table, column, statements in SCHEMA_UPGRADES:
+        if version >= upgrade_version:
+            continue
+        conn.execute("BEGIN IMMEDIATE") # A racing process waits here, then finds the column added
+        try:
+            columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+            if columns and column not in columns: # No table yet: the script creates it complete
+                for statement in statements:
+                    conn.execute(statement)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+
+class SQLiteCursor:
+    def __init__(self, connection):
+        self._connection = connection
+        self._cursor = connection._conn.cursor()
+        self._rowcount = -1
+
+    @property
+    def rowcount(self):
+        return self._rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def execute(self, operation, params=()):
+        try:
+            match = _SET_VARIABLE.match(operation)
+            if match:
+                value = self._cursor.execute("SELECT " + translate(match.group(2)), tuple(params or ())).fetchone()[0]
+                self._connection.variables[match.group(1).lower()] = value
+                self._rowcount = 0
+                return
+            self._cursor.execute(translate(operation), tuple(params or ()))
+            self._rowcount = self._cursor.rowcount
+        except sqlite3.Error as err:
+            raise _mysql_error(err) from err
+
+    def executemany(self, operation, seq_params):
+        try:
+            self._cursor.executemany(translate(operation), [tuple(params) for params in seq_params])
+            self._rowcount = self._cursor.rowcount
+        except sqlite3.Error as err:
+            raise _mysql_error(err) from err
+
+    def callproc(self, procname, args=()):
+        """Runs one of the PROCEDURES; returns the arguments with OUT parameters filled in, like mysql.connector."""
+        try:
+            procedure = PROCEDURES[procname]
+        except KeyError:
+            raise errors.ProgrammingError(msg=f"PROCEDURE {procname} does not exist", errno=1305, sqlstate='42000') from None
+        try:
+            return procedure(self._cursor, *args)
+        except sqlite3.Error as err:
+            raise _mysql_error(err) from err
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def close(self):
+        self._cursor.close()
+
+
+def _mysql_error(err):
+    error_class, errno, sqlstate = _ERROR_CODES.get(getattr(err, 'sqlite_errorname', None), (None, None, None))
+    if error_class is None:
+        if isinstance(err, sqlite3.IntegrityError):
+            error_class = errors.IntegrityError
+        elif isinstance(err, sqlite3.OperationalError):
+            error_class = errors.OperationalError
+        elif isinstance(err, sqlite3.ProgrammingError):
+            error_class = errors.ProgrammingError
+        else:
+            error_class = errors.DatabaseError
+    return error_class(msg=str(err), errno=errno, sqlstate=sqlstate)
+
+
+# ==================================================================
+# PROCEDURES
+# Same statements as the MySQL procedures in gym_management.sql.
+# ==================================================================
+_SYNC_ALL_STATUSES = """
+    UPDATE Member
+    SET Member_Status = IIF(Valid_until >= CURDATE(), 'Active', 'Inactive')
+    WHERE Member_Status IS NOT IIF(Valid_until >= CURDATE(), 'Active', 'Inactive')
+"""
+
+_MARK_STATUSES_SYNCED = """
+    INSERT INTO Sync_Watermark (Sync_Name, Synced_through) VALUES ('member_status', CURDATE())
+    ON CONFLICT (Sync_Name) DO UPDATE SET Synced_through = excluded.Synced_through
+"""
+
+
+def _update_all_member_statuses(cursor):
+    cursor.execute(_SYNC_ALL_STATUSES)
+    cursor.execute(_MARK_STATUSES_SYNCED)
+    return ()
+
+
+def _sync_member_statuses(cursor, p_changed=None):
+    # No FOR UPDATE needed: SQLite runs one writer at a time, and a second run
+    # reading the same watermark just repeats an update that is already done.
+    row = cursor.execute("SELECT Synced_through FROM Sync_Watermark WHERE Sync_Name = 'member_status'").fetchone()
+    if row is None:
+        cursor.execute(_SYNC_ALL_STATUSES)
+    else:
+        cursor.execute("""
+            UPDATE Member
+            SET Member_Status = 'Inactive'
+            WHERE Valid_until >= ? AND Valid_until < CURDATE()
+              AND Member_Status IS NOT 'Inactive'
+        """, (row[0],))
+    changed = cursor.rowcount
+    cursor.execute(_MARK_STATUSES_SYNCED)
+    return (changed,)
+
+
+_RECOMPUTE_MEMBER_LEDGER = """
+    UPDATE Member
+    SET Total_paid = (SELECT COALESCE(ROUND(SUM(h.amount), 2), 0) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID),
+        Payment_count = (SELECT COUNT(*) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID),
+        First_payment = (SELECT MIN(h.Payment_date) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID),
+        Last_payment = (SELECT MAX(h.Payment_date) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID),
+        Valid_until = (SELECT MembershipValidUntil(MAX(h.Payment_date)) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID),
+        Member_Status = IIF((SELECT MembershipValidUntil(MAX(h.Payment_date)) FROM Payment_History h WHERE h.Mem_ID = Member.Mem_ID) >= CURDATE(),
+                            'Active', 'Inactive')
+    WHERE Mem_ID = ?
+"""
+
+
+def _recompute_member_ledger(cursor, p_mem_id):
+    cursor.execute(_RECOMPUTE_MEMBER_LEDGER, (p_mem_id,))
+    return (p_mem_id,)
+
+
+PROCEDURES = {
+    'UpdateAllMemberStatuses': _update_all_member_statuses,
+    'SyncMemberStatuses': _sync_member_statuses,
+    'RecomputeMemberLedger': _recompute_member_ledger,
+}